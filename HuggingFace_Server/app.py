@@ -1,11 +1,34 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import AutoTokenizer
 import torch
+import os
 import re
 import uuid
 import time
+import heapq
+import math
+import itertools
+from collections import OrderedDict
+import json
 import threading
+import asyncio
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Literal, Optional
+from summary_cache import ChunkCache, SummaryCache, make_cache_key, make_chunk_key
+from job_store import FINISHED, make_job_store
+from engines import assisted_compatible, assisted_length_kwargs, load_assistant, load_engine
+from inference_pool import InferencePool
+from feed_fetcher import FeedFetcher, REPO_ROOT, load_feeds, cache_path, parse_date
+from story_clusters import StoryClusterIndex, near_duplicate
+from digests import DigestStore, BRIEFING_INTRO, BRIEFING_OUTRO, BRIEFING_EMPTY
+from search_index import SearchIndex, read_master_titles, snippet
+from textrank import extractive_summary, select_paragraphs
+from history_store import HistoryStore
+from metrics import Registry, TOKEN_BUCKETS, RATIO_BUCKETS, ESTIMATE_BUCKETS, PROMETHEUS_CONTENT_TYPE, log_event
 
 # Last Updated: V164.8 Strict Parent-Based Read Logic (Stable)
 
@@ -21,6 +44,12 @@ GEN_CONFIG = dict(
     no_repeat_ngram_size=3
 )
 
+# Assisted Generation (see engines.py): a draft model proposes tokens, BART verifies them.
+# Only tiers without beam search qualify ("greedy", "greedy_short"); beam tiers and bigger
+# batches decode as usual. Not used by INFERENCE_PROCESSES workers.
+ASSISTANT_MODEL = os.environ.get("ASSISTANT_MODEL", "")                # Hub ID or local dir, e.g. sshleifer/distilbart-cnn-12-6 ("" = off)
+ASSISTANT_MAX_BATCH = int(os.environ.get("ASSISTANT_MAX_BATCH", 1))    # Batches up to this size are decoded row by row with the draft
+
 # Output Constraints (Hard Capped)
 SHORT_MIN = 60      # For intermediate chunks
 SHORT_MAX = 120
@@ -28,31 +57,256 @@ SHORT_MAX = 120
 FINAL_MIN = 120     # For final output
 FINAL_MAX = 220
 
+# Deadline-Aware Generation Tiers: (name, generate() kwargs, scale on compute_dynamic_length ratio)
+# Tried in order; the first tier whose predicted time fits the request's latency budget wins.
+# Requests without a budget (and an idle server) always get "full".
+GEN_TIERS = [
+    ("full", GEN_CONFIG, 1.0),
+    ("beams2", dict(GEN_CONFIG, num_beams=2), 1.0),
+    ("greedy", dict(num_beams=1, no_repeat_ngram_size=3), 1.0),
+    ("greedy_short", dict(num_beams=1, no_repeat_ngram_size=3), 0.5),  # Also halves the chunk targets
+]
+GEN_TIER_CONFIGS = {name: (gen, scale) for name, gen, scale in GEN_TIERS}
+COST_SECONDS_PER_UNIT = 0.005  # Seed rate for the cost model (CPU-basic guess, learned online afterwards)
+COST_DECODE_WEIGHT = 2.0       # Work units per decoder step per beam (1 unit = 1 encoder token)
+
 # Chunking Strategy Params
 FIRST_CHUNK_TOKENS = 500    # REC 4: Reduced lead bias (550 -> 500)
 OTHER_CHUNK_TOKENS = 700
-MAX_CHUNKS = 8              # Safety cap to prevent timeouts
+TARGET_CHUNK_SIZE = 1000    # BART: Massive appetite (Leaves 24 for overhead)
+
+# Map-Reduce Params: chunks are summarized independently (map), then the partial summaries
+# are merged in consecutive groups, level by level, until they fit the mode's window (reduce)
+MAP_TOKEN_BUDGET = int(os.environ.get("MAP_TOKEN_BUDGET", 16000))  # Article tokens BART reads (least salient paragraphs dropped beyond)
+REDUCE_GROUP_TOKENS = 1000  # Partial-summary tokens merged per reduce call (BART reads 1024)
+REDUCE_RATIO = 0.5          # Reduce output / input (capped by compute_dynamic_length): each level roughly halves
+SMART_WINDOW_TOKENS = 4096  # Smart mode keeps every chunk summary up to this, reduces beyond
+RECAP_WINDOW_TOKENS = 1022  # Quick Recap's final pass input (was: truncated to this)
+
+# TextRank Params (see textrank.py): mode="extractive" never touches BART
+TEXTRANK_PREFILTER = os.environ.get("TEXTRANK_PREFILTER", "0") == "1" # Opt-in: drop low-salience paragraphs before bucketing
+TEXTRANK_MIN_WORDS = 1500   # Only articles longer than this (2+ chunks) are filtered
+TEXTRANK_KEEP_RATIO = 0.7   # Share of the article's words kept (lead paragraph + most salient)
+
+# Micro-Batching Params (Cross-Job Chunk Scheduler)
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", 8))           # Max chunks per generate() call
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", 30))  # How long a chunk may wait for company
+BATCH_LENGTH_SPREAD = 1.5   # Longest/shortest input ratio allowed inside one padded batch
+BATCH_TARGET_BAND = 64      # Chunks whose min_len and max_len fall in the same bands of this many tokens share batches
+
+# Worker Pool Params
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 4))  # Max jobs summarizing at once
+PRIORITY_LEVELS = {"interactive": 0, "normal": 1, "bulk": 2}     # Lower runs first
+
+# Admission Control Params (/submit, /submit_batch, /summarize): predicted backlog, not job counts
+ADMISSION_MAX_BACKLOG_S = float(os.environ.get("ADMISSION_MAX_BACKLOG_S", 1800))  # Queued work (seconds) before 429 (0 = off)
+ADMISSION_PRIORITY_SCALE = {0: 2.0, 1: 1.0, 2: 0.5}  # Limit multiplier per priority level: bulk is shed first
+TOKENS_PER_WORD = 1.3       # Article length guess while the tokenizer is still loading
+
+# Batch Submit Params (/submit_batch)
+JOB_BATCH_MAX_ITEMS = int(os.environ.get("JOB_BATCH_MAX_ITEMS", 100))  # Articles per batch request
+JOB_BATCH_HISTORY = 200     # Batch records kept in memory (oldest dropped first)
+
+# Story Cluster Params (see story_clusters.py for the matching thresholds)
+CLUSTER_REUSE = os.environ.get("CLUSTER_REUSE", "0") == "1"  # Near-duplicate copy from another outlet shares one summary
+CLUSTER_LEADERS_MAX = 5000  # (cluster, mode) -> leader job entries kept
+
+# Digest Params (/digest)
+DIGEST_HISTORY = int(os.environ.get("DIGEST_HISTORY", 200))  # Digest objects kept in memory (LRU)
+DIGEST_PAGE_SIZE = 20       # Default segments per page
+DIGEST_PAGE_MAX = 200       # Largest page a client may ask for
+
+# Summary Cache Params
+SUMMARY_CACHE_DIR = os.environ.get("SUMMARY_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary_cache"))
+SUMMARY_CACHE_MEMORY_BYTES = int(os.environ.get("SUMMARY_CACHE_MEMORY_BYTES", 32 * 1024 * 1024))
+SUMMARY_CACHE_DISK_BYTES = int(os.environ.get("SUMMARY_CACHE_DISK_BYTES", 512 * 1024 * 1024))
+CHUNK_CACHE_BYTES = int(os.environ.get("CHUNK_CACHE_BYTES", 16 * 1024 * 1024))  # Per-chunk outputs (0 = off)
+
+# Job Store Params
+JOB_STORE = os.environ.get("JOB_STORE", "memory")   # "memory" or "sqlite"
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.sqlite3"))
+JOB_TTL_SECONDS = float(os.environ.get("JOB_TTL_SECONDS", 3 * 24 * 3600))  # Finished jobs expire after 3 days
+JOB_MAX_FINISHED = int(os.environ.get("JOB_MAX_FINISHED", 1000))            # ...or when this many pile up
+
+# Inference Engine: "eager" (fp32), "int8", "onnx" or "compile" (see engines.py)
+INFERENCE_ENGINE = os.environ.get("INFERENCE_ENGINE", "eager")
+
+# Inference Processes (see inference_pool.py): generate() in N worker processes sharing one copy of the weights
+INFERENCE_PROCESSES = int(os.environ.get("INFERENCE_PROCESSES", 0))        # 0 = generate() in the API process
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", 0))            # torch threads per worker (0 = cores / processes)
+INFERENCE_START_METHOD = os.environ.get("INFERENCE_START_METHOD", "fork")  # "fork" (copy-on-write) or "spawn" (shared memory)
+
+# Feed Ingestion (see feed_fetcher.py for paths and connection limits)
+FEED_REFRESH_SECONDS = float(os.environ.get("FEED_REFRESH_SECONDS", 0))  # 0 = only via POST /feeds/refresh
+
+# Search (/search): finished summaries + news_cache articles + the client's master_titles.txt
+MASTER_TITLES_FILE = os.environ.get("MASTER_TITLES_FILE", os.path.join(REPO_ROOT, "master_titles.txt"))
+SEARCH_LIMIT_MAX = 100
+
+# Inbox Polling (/completed_jobs)
+COMPLETED_WAIT_MAX = 60     # Longest long-poll hold (seconds)
+STATUS_WAIT_MAX = 60        # Longest /status/{job_id}?wait= hold (seconds)
+SSE_KEEPALIVE_S = 15        # Idle SSE stream gap before a keep-alive comment
+
+# Read History (/history/*, see history_store.py for retention): read marks + headline history, synced across devices
+HISTORY_DB_PATH = os.environ.get("HISTORY_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.sqlite3"))
+READ_HISTORY_FILE = os.environ.get("READ_HISTORY_FILE", os.path.join(REPO_ROOT, "read_history.json")) # Imported on first start
+HISTORY_SYNC_PAGE = 1000    # Default changes per /history/sync page
+HISTORY_SYNC_PAGE_MAX = 5000
+
+# ==========================================
+# 📊 METRICS
+# ==========================================
+# Scraped at GET /metrics. Per-job values are also emitted as JSON log lines (log_event).
+METRICS = Registry()
+STAGE_SECONDS = METRICS.histogram("summarizer_stage_seconds", "Time spent per pipeline stage", labels=("stage",))
+BATCH_SIZE = METRICS.histogram("summarizer_generate_batch_size", "Chunks per generate() call", buckets=(1, 2, 4, 8, 16, 32))
+QUEUE_WAIT_SECONDS = METRICS.histogram("summarizer_job_queue_wait_seconds", "Submit -> worker pickup")
+JOB_LATENCY_SECONDS = METRICS.histogram("summarizer_job_latency_seconds", "Submit -> done/error", labels=("mode",))
+INPUT_TOKENS = METRICS.histogram("summarizer_input_tokens", "Article tokens per summary", buckets=TOKEN_BUCKETS)
+OUTPUT_TOKENS = METRICS.histogram("summarizer_output_tokens", "Pass 1 summary tokens per article", buckets=TOKEN_BUCKETS)
+RETENTION_RATIO = METRICS.histogram("summarizer_retention_ratio", "Summary tokens / article tokens", buckets=RATIO_BUCKETS)
+JOBS_TOTAL = METRICS.counter("summarizer_jobs_total", "Finished jobs by outcome", labels=("outcome",))
+ACTIVE_JOBS = METRICS.gauge("summarizer_active_jobs", "Jobs currently being summarized")
+GEN_TIER_TOTAL = METRICS.counter("summarizer_generation_tier_total", "Summaries by generation tier", labels=("tier",))
+ASSISTED_ROWS = METRICS.counter("summarizer_assisted_rows_total", "Chunks decoded with the draft model")
+ESTIMATE_RATIO = METRICS.histogram("summarizer_estimate_ratio", "Actual / predicted job seconds", labels=("kind",),
+                                   buckets=ESTIMATE_BUCKETS)
+ADMISSION_REJECTED = METRICS.counter("summarizer_admission_rejected_total", "Requests refused with 429", labels=("endpoint",))
+METRICS.gauge("summarizer_cost_model", "Generation cost model state", labels=("stat",),
+              fn=lambda: {(k,): v for k, v in COST_MODEL.snapshot().items()})
+METRICS.gauge("summarizer_jobs_stored", "Jobs held in the job store (JOBS)", fn=lambda: len(JOBS))
+METRICS.gauge("summarizer_queue_depth", "Jobs waiting for a worker", fn=lambda: len(JOB_QUEUE))
+METRICS.gauge("summarizer_job_waiters", "Requests awaiting a job (/stream, /status?wait=, /summarize)",
+              fn=lambda: len(JOB_WAITERS) + len(DIRECT_JOBS))
+METRICS.gauge("summarizer_summary_cache", "Summary cache counters and sizes", labels=("stat",),
+              fn=lambda: {(k,): v for k, v in SUMMARY_CACHE.snapshot().items()})
+METRICS.gauge("summarizer_chunk_cache", "Chunk cache counters and sizes", labels=("stat",),
+              fn=lambda: {(k,): v for k, v in CHUNK_CACHE.snapshot().items()})
 
 # ==========================================
 # 🧠 MODEL LOADER
 # ==========================================
-print("Loading Model...")
-model_name = "facebook/bart-large-cnn"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
-model.eval() # REC 1: Disable dropout for deterministic output
-print("Model Loaded & Set to Eval Mode!")
+# Loads in a background thread so Uvicorn can serve cheap endpoints ("/", "/completed_jobs")
+# right away. Jobs submitted during warm-up wait in the queue until MODEL_READY is set.
+model_name = os.environ.get("SUMMARIZER_MODEL", "facebook/bart-large-cnn") # Hub ID or local dir (benchmarks point this at a stub)
+tokenizer = None
+model = None
+INFERENCE_POOL = None # Set when INFERENCE_PROCESSES > 0
+assistant = None      # Draft model when ASSISTANT_MODEL is set and compatible
+MODEL_READY = threading.Event() # Set once loading finishes (successfully or not)
+MODEL_STATE = {"phase": "starting", "started_at": time.time(), "ready_at": None, "error": None, "assistant": None}
+
+def load_model():
+    global tokenizer, model, assistant, INFERENCE_POOL
+    try:
+        if INFERENCE_PROCESSES > 0:
+            # generate() runs in the workers; a single-threaded parent is what makes fork safe
+            torch.set_num_threads(1)
+        log_event("model_loading", model=model_name, engine=INFERENCE_ENGINE)
+        MODEL_STATE["phase"] = "loading_tokenizer"
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        # safetensors checkpoints are memory-mapped, not copied into a fresh buffer
+        MODEL_STATE["phase"] = "loading_weights"
+        loaded = load_engine(INFERENCE_ENGINE, model_name)
+
+        # One tiny generate() pays the first-call allocation cost before real traffic does
+        MODEL_STATE["phase"] = "warming_up"
+        warm_ids = tokenizer("Warm up.", return_tensors="pt").input_ids
+        with torch.no_grad():
+            loaded.generate(warm_ids, max_length=8, num_beams=1)
+
+        if ASSISTANT_MODEL:
+            # Optional: a draft that can't load or doesn't match only costs the speedup
+            MODEL_STATE["phase"] = "loading_assistant"
+            try:
+                draft = load_assistant(ASSISTANT_MODEL, loaded, INFERENCE_ENGINE)
+                with torch.no_grad():
+                    loaded.generate(warm_ids, num_beams=1, assistant_model=draft,
+                                    **assisted_length_kwargs(0, 8, tokenizer.eos_token_id))
+                assistant = draft
+                MODEL_STATE["assistant"] = ASSISTANT_MODEL
+                log_event("assistant_ready", assistant=ASSISTANT_MODEL)
+            except Exception as e:
+                log_event("assistant_disabled", assistant=ASSISTANT_MODEL, error=str(e))
+
+        if INFERENCE_PROCESSES > 0:
+            # Each worker warms itself up with its own thread count (see inference_pool.py)
+            MODEL_STATE["phase"] = "starting_workers"
+            INFERENCE_POOL = InferencePool(loaded, model_name, INFERENCE_ENGINE, INFERENCE_PROCESSES,
+                                           threads=INFERENCE_THREADS, start_method=INFERENCE_START_METHOD,
+                                           warm_ids=warm_ids[0].tolist())
+            COST_MODEL.parallelism = INFERENCE_PROCESSES
+
+        model = loaded
+        MODEL_STATE["phase"] = "ready"
+        MODEL_STATE["ready_at"] = time.time()
+        log_event("model_ready", model=model_name, engine=INFERENCE_ENGINE,
+                  seconds=round(MODEL_STATE["ready_at"] - MODEL_STATE["started_at"], 3))
+    except Exception as e:
+        MODEL_STATE["phase"] = "failed"
+        MODEL_STATE["error"] = str(e)
+        log_event("model_load_failed", model=model_name, engine=INFERENCE_ENGINE, error=str(e))
+    finally:
+        MODEL_READY.set()
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """Blocks until the model is usable. False if loading failed or timed out."""
+    MODEL_READY.wait(timeout)
+    return MODEL_STATE["phase"] == "ready"
+
+threading.Thread(target=load_model, name="model-loader", daemon=True).start()
 
 app = FastAPI()
 
 class SummaryRequest(BaseModel):
     text: str
-    mode: str = "half"  # "half" (Smart) or "short" (Quick)
+    mode: Literal["half", "short", "extractive"] = "half"  # Smart, Quick or Instant (no BART); anything else is a 422
     title: str = "Untitled Article"  # Article title for inbox display
     source: str = "Unknown" # Article source for inbox display
+    priority: str = "normal" # "interactive", "normal" or "bulk" (Quick Recap always jumps ahead)
+    latency_budget_s: Optional[float] = None # Submit -> done budget; generation steps down to meet it
+    cluster_reuse: bool = False # Accept the summary of a near-duplicate copy from another source
 
 class DigestRequest(BaseModel):
     job_ids: list[str]
+    paged: bool = False # Return the digest object + first page instead of the whole script
+    page_size: int = DIGEST_PAGE_SIZE
+
+class ClusterItem(BaseModel):
+    title: str
+    desc: str = ""
+    source: str = ""
+    date: str = "" # Feed date string (RSS or Atom), as stored in news_cache
+
+class ClusterAssignRequest(BaseModel):
+    items: list[ClusterItem]
+
+class BatchSubmitRequest(BaseModel):
+    items: list[SummaryRequest]
+    auto_digest: bool = False # Build the /digest script once the last item finishes
+
+class HistoryMark(BaseModel):
+    url: str
+    read: bool = True # False = marked unread again
+    at: Optional[float] = None # When the device made the change (epoch seconds); default: now
+
+class HistoryTitle(BaseModel):
+    title: str
+    source: str = ""
+    link: str = ""
+    date: str = ""
+
+class HistorySyncRequest(BaseModel):
+    device_id: Optional[str] = None # Keeps this device's own changes out of the reply
+    cursor: Optional[str] = None    # From the previous reply; None = full sync
+    reads: list[HistoryMark] = []   # Local changes since the last sync
+    titles: list[HistoryTitle] = []
+    limit: int = HISTORY_SYNC_PAGE
+
+class HistoryCheckRequest(BaseModel):
+    urls: list[str]
 
 def clean_sentence_end(text: str) -> str:
     """ENSURE AUDIO SAFETY: REC 3 - Smarter cleanup that removes AI artifacting."""
@@ -93,30 +347,289 @@ def clean_sentence_end(text: str) -> str:
     # Otherwise, it's likely a cutoff/junk fragment, so safe to cut
     return text[:last_dot+1]
 
-def summarize_text(text: str, min_len: int, max_len: int) -> str:
-    """Core generation wrapper with safety params."""
-    # BART gets raw text
-    input_text = text.strip()
-    
-    # Tokenize input
-    inputs = tokenizer(
-        input_text,
-        return_tensors="pt",
-        truncation=True,
-        max_length=1024 # Model absolute limit
-    )
-
-    # REC 2: Disable Gradient Calculation (Save Memory/CPU)
-    with torch.no_grad():
-        summary_ids = model.generate(
-            inputs.input_ids,
-            min_length=min_len,
-            max_length=max_len,
-            **GEN_CONFIG
-        )
-
-    # Decode
-    return tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+# ==========================================
+# ⏱️ GENERATION COST MODEL
+# ==========================================
+class GenerationCostModel:
+    """
+    Predicts generate() seconds from token counts. One work unit is one encoder token;
+    every decoder step costs COST_DECODE_WEIGHT units per beam. The seconds-per-unit
+    rate is learned from each batch the batcher runs, and chunks already waiting on
+    the batcher are counted as backlog that runs ahead of new work.
+    """
+
+    def __init__(self, seconds_per_unit: float = COST_SECONDS_PER_UNIT, decode_weight: float = COST_DECODE_WEIGHT,
+                 alpha: float = 0.2):
+        self.seconds_per_unit = seconds_per_unit
+        self.decode_weight = decode_weight
+        self.alpha = alpha
+        self.backlog_units = 0.0
+        self.samples = 0
+        self.parallelism = 1 # Batches generating at once (INFERENCE_PROCESSES)
+        self.errors = {}     # kind -> EWMA of |actual/predicted - 1|, EWMA of the signed value, samples
+        self._lock = threading.Lock()
+
+    def units(self, input_len: int, max_len: int, tier: str) -> float:
+        num_beams = GEN_TIER_CONFIGS[tier][0].get("num_beams", 1)
+        return input_len + self.decode_weight * max_len * num_beams
+
+    def add_backlog(self, units: float):
+        with self._lock:
+            self.backlog_units += units
+
+    def observe(self, units: float, seconds: float):
+        """One finished generate() batch: retires its backlog and updates the rate."""
+        with self._lock:
+            self.backlog_units = max(0.0, self.backlog_units - units)
+            if units > 0 and seconds > 0:
+                self.seconds_per_unit += self.alpha * (seconds / units - self.seconds_per_unit)
+                self.samples += 1
+
+    def retire(self, units: float):
+        """A batch that failed: its backlog is gone but says nothing about speed."""
+        with self._lock:
+            self.backlog_units = max(0.0, self.backlog_units - units)
+
+    def backlog_seconds(self) -> float:
+        with self._lock:
+            return self.backlog_units * self.seconds_per_unit / self.parallelism
+
+    def predict_units(self, chunk_lens: list[int], ratio: float, tier: str, second_pass: bool = False) -> float:
+        """Work units of one article at this tier: map, every reduce level, then the recap pass."""
+        scale = GEN_TIER_CONFIGS[tier][1]
+        units = 0.0
+        lengths = []
+        for c_len in chunk_lens:
+            _, max_len = compute_dynamic_length(c_len, ratio * scale)
+            units += self.units(c_len, max_len, tier)
+            lengths.append(max_len)
+        window = RECAP_WINDOW_TOKENS if second_pass else SMART_WINDOW_TOKENS
+        while sum(lengths) > window:
+            groups = reduce_groups(lengths)
+            if len(groups) == len(lengths):
+                break
+            merged = [sum(lengths[i] for i in group) + 2 for group in groups]
+            targets = [compute_dynamic_length(m_len, REDUCE_RATIO * scale)[1] for m_len in merged]
+            units += sum(self.units(m_len, max_len, tier) for group, m_len, max_len in zip(groups, merged, targets)
+                         if len(group) > 1)
+            lengths = [lengths[g[0]] if len(g) == 1 else t for g, t in zip(groups, targets)]
+        if second_pass:
+            units += self.units(min(sum(lengths) + 2, 1024), 200, tier)
+        return units
+
+    def predict(self, chunk_lens: list[int], ratio: float, tier: str, second_pass: bool = False) -> float:
+        """Seconds of generate() work for one article at this tier (backlog not included)."""
+        units = self.predict_units(chunk_lens, ratio, tier, second_pass)
+        with self._lock:
+            return units * self.seconds_per_unit
+
+    def eta(self, queued_units: float, own_units: float) -> tuple[float, float]:
+        """
+        (start, finish) seconds from now for a job whose own work runs after the batcher
+        backlog and `queued_units` of jobs still waiting ahead of it.
+        """
+        with self._lock:
+            start = (self.backlog_units + queued_units) * self.seconds_per_unit / self.parallelism
+            return start, start + own_units * self.seconds_per_unit
+
+    def record_error(self, kind: str, predicted: float, actual: float):
+        """One finished job: how far off the `kind` estimate was, as actual/predicted - 1."""
+        if predicted <= 0 or actual <= 0:
+            return
+        error = actual / predicted - 1
+        with self._lock:
+            entry = self.errors.setdefault(kind, [0.0, 0.0, 0])
+            weight = max(self.alpha, 1 / (entry[2] + 1)) # Plain mean until the EWMA has history
+            entry[0] += weight * (abs(error) - entry[0])
+            entry[1] += weight * (error - entry[1])
+            entry[2] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {"seconds_per_unit": self.seconds_per_unit, "backlog_units": self.backlog_units,
+                      "backlog_seconds": self.backlog_units * self.seconds_per_unit / self.parallelism,
+                      "samples": self.samples}
+            for kind, (abs_error, bias, samples) in self.errors.items():
+                result.update({f"{kind}_abs_error": abs_error, f"{kind}_bias": bias, f"{kind}_samples": samples})
+            return result
+
+COST_MODEL = GenerationCostModel()
+
+# ==========================================
+# 📦 MICRO-BATCHING SCHEDULER
+# ==========================================
+class ChunkBatcher:
+    """
+    Collects pending chunks from ALL in-flight jobs and runs them through one
+    padded model.generate() call. Chunks are grouped by tier (GEN_TIERS config
+    must match inside a batch) and min/max length band, then by similar input
+    length to keep padding waste low. compute_dynamic_length() gives nearly every
+    chunk its own targets, so a batch runs with the loosest of its members' targets
+    (lowest min_len, highest max_len): under BATCH_TARGET_BAND tokens of extra room.
+    """
+
+    def __init__(self, max_batch_size: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS,
+                 length_spread: float = BATCH_LENGTH_SPREAD):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.length_spread = length_spread
+        self._pending = {}  # (tier, min_len band, max_len band) -> [(input_ids, future, enqueued_at, min_len, max_len)]
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="chunk-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, input_ids: list[int], min_len: int, max_len: int, tier: str = "full") -> Future:
+        """Queue one tokenized chunk. Resolves to the summary token IDs (special tokens stripped)."""
+        future = Future()
+        COST_MODEL.add_backlog(COST_MODEL.units(len(input_ids), max_len, tier))
+        with self._cond:
+            key = (tier, min_len // BATCH_TARGET_BAND, max_len // BATCH_TARGET_BAND)
+            self._pending.setdefault(key, []).append((input_ids, future, time.monotonic(), min_len, max_len))
+            self._cond.notify()
+        return future
+
+    def _next_batch(self):
+        """Blocks until a batch is due (full, or its oldest chunk waited long enough)."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                due_key, oldest = None, None
+                for key, items in self._pending.items():
+                    if len(items) >= self.max_batch_size:
+                        due_key = key
+                        break
+                    if oldest is None or items[0][2] < oldest:
+                        due_key, oldest = key, items[0][2]
+
+                if due_key is None:
+                    self._cond.wait()
+                    continue
+
+                items = self._pending[due_key]
+                wait_left = (oldest + self.max_wait_ms / 1000.0 - now) if oldest is not None else 0
+                if len(items) < self.max_batch_size and wait_left > 0:
+                    self._cond.wait(wait_left)
+                    continue
+
+                batch = self._select_similar(items)
+                chosen = {id(item) for item in batch}
+                remaining = [item for item in items if id(item) not in chosen]
+                if remaining: self._pending[due_key] = remaining
+                else: del self._pending[due_key]
+                return due_key, batch
+
+    def _select_similar(self, items):
+        """Grows a batch around the oldest chunk using its nearest neighbours by token length."""
+        ordered = sorted(items, key=lambda item: len(item[0]))
+        pos = next(i for i, item in enumerate(ordered) if item is items[0])
+        lo, hi = pos, pos + 1
+        while hi - lo < self.max_batch_size:
+            shortest, longest = len(ordered[lo][0]), len(ordered[hi - 1][0])
+            left_gap = shortest - len(ordered[lo - 1][0]) if lo > 0 else None
+            right_gap = len(ordered[hi][0]) - longest if hi < len(ordered) else None
+            if left_gap is None and right_gap is None: break
+            if right_gap is None or (left_gap is not None and left_gap <= right_gap):
+                if longest > self.length_spread * max(1, len(ordered[lo - 1][0])): break
+                lo -= 1
+            else:
+                if len(ordered[hi][0]) > self.length_spread * max(1, shortest): break
+                hi += 1
+        return ordered[lo:hi]
+
+    def _run(self):
+        while True:
+            (tier, _, _), batch = self._next_batch()
+            min_len, max_len = min(item[3] for item in batch), max(item[4] for item in batch)
+            units = sum(COST_MODEL.units(len(item[0]), item[4], tier) for item in batch) # As submit() costed them
+            if INFERENCE_POOL is not None:
+                self._dispatch(batch, min_len, max_len, tier, units) # Blocks until a worker process is idle
+                continue
+            try:
+                t0 = time.perf_counter()
+                summaries = self._generate([item[0] for item in batch], min_len, max_len, tier)
+                COST_MODEL.observe(units, time.perf_counter() - t0)
+                for item, summary in zip(batch, summaries):
+                    item[1].set_result(summary)
+            except Exception as e:
+                COST_MODEL.retire(units)
+                for item in batch:
+                    item[1].set_exception(e)
+
+    def _pad(self, batch_ids: list[list[int]]) -> tuple[list[list[int]], list[list[int]]]:
+        width = max(len(ids) for ids in batch_ids)
+        pad_id = tokenizer.pad_token_id
+        input_ids = [ids + [pad_id] * (width - len(ids)) for ids in batch_ids]
+        attention_mask = [[1] * len(ids) + [0] * (width - len(ids)) for ids in batch_ids]
+        return input_ids, attention_mask
+
+    def _finish(self, rows: list[list[int]], width: int, min_len: int, max_len: int, tier: str,
+                seconds: float, assisted: bool = False) -> list[list[int]]:
+        STAGE_SECONDS.observe(seconds, stage="generate")
+        BATCH_SIZE.observe(len(rows))
+        log_event("generate_batch", size=len(rows), width=width, min_len=min_len, max_len=max_len,
+                  tier=tier, seconds=round(seconds, 4), assisted=assisted)
+        special = set(tokenizer.all_special_ids)
+        return [[t for t in row if t not in special] for row in rows]
+
+    def _generate(self, batch_ids: list[list[int]], min_len: int, max_len: int, tier: str) -> list[list[int]]:
+        """One padded generate() call for the whole batch, with the tier's generation params."""
+        gen_kwargs = GEN_TIER_CONFIGS[tier][0]
+        if assistant is not None and assisted_compatible(gen_kwargs, model.generation_config, len(batch_ids),
+                                                         ASSISTANT_MAX_BATCH):
+            return self._generate_assisted(batch_ids, min_len, max_len, tier)
+        input_ids, attention_mask = self._pad(batch_ids)
+
+        # REC 2: Disable Gradient Calculation (Save Memory/CPU)
+        with torch.no_grad():
+            t0 = time.perf_counter()
+            summary_ids = model.generate(
+                torch.tensor(input_ids),
+                attention_mask=torch.tensor(attention_mask),
+                min_length=min_len,
+                max_length=max_len,
+                **GEN_TIER_CONFIGS[tier][0]
+            )
+        return self._finish(summary_ids.tolist(), len(input_ids[0]), min_len, max_len, tier, time.perf_counter() - t0)
+
+    def _generate_assisted(self, batch_ids: list[list[int]], min_len: int, max_len: int, tier: str) -> list[list[int]]:
+        """Draft-assisted decoding: one row per generate() call (no padding needed)."""
+        rows = []
+        with torch.no_grad():
+            t0 = time.perf_counter()
+            length_kwargs = assisted_length_kwargs(min_len, max_len, tokenizer.eos_token_id)
+            for ids in batch_ids:
+                summary_ids = model.generate(torch.tensor([ids]), assistant_model=assistant, **length_kwargs,
+                                             **GEN_TIER_CONFIGS[tier][0])
+                rows.append(summary_ids[0].tolist())
+        ASSISTED_ROWS.inc(len(rows))
+        return self._finish(rows, max(len(ids) for ids in batch_ids), min_len, max_len, tier,
+                            time.perf_counter() - t0, assisted=True)
+
+    def _dispatch(self, batch, min_len: int, max_len: int, tier: str, units: float):
+        """Process mode: the same padded batch, generated by the next idle worker process."""
+        input_ids, attention_mask = self._pad([item[0] for item in batch])
+        gen_kwargs = dict(min_length=min_len, max_length=max_len, **GEN_TIER_CONFIGS[tier][0])
+        pool_future = INFERENCE_POOL.submit(input_ids, attention_mask, gen_kwargs)
+
+        def done(f: Future):
+            try:
+                rows, seconds = f.result()
+                summaries = self._finish(rows, len(input_ids[0]), min_len, max_len, tier, seconds)
+                COST_MODEL.observe(units, seconds)
+                for item, summary in zip(batch, summaries):
+                    item[1].set_result(summary)
+            except Exception as e:
+                COST_MODEL.retire(units)
+                for item in batch:
+                    item[1].set_exception(e)
+        pool_future.add_done_callback(done)
+
+BATCHER = ChunkBatcher()
+
+def submit_chunk(input_ids: list[int], min_len: int, max_len: int, tier: str = "full") -> tuple[Future, bool]:
+    """BATCHER.submit() behind the chunk cache. Returns (future, reused): reused chunks cost no generate()."""
+    key = make_chunk_key(input_ids, min_len, max_len, CHUNK_CACHE_FINGERPRINTS[tier])
+    return CHUNK_CACHE.fetch(key, lambda: BATCHER.submit(input_ids, min_len, max_len, tier))
 
 def compute_dynamic_length(input_len: int, ratio: float) -> tuple[int, int]:
     """
@@ -145,120 +658,841 @@ def compute_dynamic_length(input_len: int, ratio: float) -> tuple[int, int]:
         
     return lower_bound, upper_bound
 
-def chunk_and_summarize(text: str, mode: str = "half") -> str:
+def reduce_groups(lengths: list[int], group_tokens: int = REDUCE_GROUP_TOKENS) -> list[list[int]]:
     """
-    Two-Pass Summarization with Bounded Dynamic Scaling.
+    Packs consecutive partial summaries (by token length) into reduce groups of at most
+    `group_tokens` framed tokens. Article order is kept inside and across groups;
+    a partial that fits with nothing else is a group of one (passed through as-is).
     """
-    tokens = tokenizer.encode(text)
-    total_tokens = len(tokens)
-    chunks = []
-    
-    # 1. PARAGRAPH-AWARE BUCKETING
-    # We group paragraphs to form healthy chunks (~512 tokens).
+    groups, size = [], 0
+    for i, length in enumerate(lengths):
+        if groups and size + length <= group_tokens - 2:
+            groups[-1].append(i)
+            size += length
+        else:
+            groups.append([i])
+            size = length
+    return groups
+
+def wrap_special(ids: list[int]) -> list[int]:
+    """Adds the <s> ... </s> frame the tokenizer would add to a full encode()."""
+    return [tokenizer.bos_token_id] + ids + [tokenizer.eos_token_id]
+
+def build_chunks(text: str, stats: Optional[dict] = None,
+                 token_budget: Optional[int] = None) -> tuple[list[list[int]], int]:
+    """
+    PARAGRAPH-AWARE BUCKETING (Token-Native).
+    Tokenizes every paragraph in ONE batched tokenizer call and buckets the IDs directly.
+    Returns (model-ready chunk IDs, total article tokens). Nothing is decoded or re-encoded.
+    Long articles are TextRank-filtered first, and whatever is still over `token_budget`
+    (default MAP_TOKEN_BUDGET) loses its least salient paragraphs until it fits, so the
+    token total is of what BART reads.
+    Stage timings land in `stats` when given.
+    """
+    # We group paragraphs to form healthy chunks (~1000 tokens).
     # This reduces AI calls (solving timeouts) while maintaining context.
-    
-    raw_paragraphs = text.split("\n")
-    processed_chunks = []
-    
+    paragraphs = [p.strip() for p in text.split("\n")]
+    paragraphs = [p for p in paragraphs if p]
+    if not paragraphs:
+        return [], 0
+    token_budget = token_budget if token_budget is not None else MAP_TOKEN_BUDGET
+
+    with STAGE_SECONDS.time(stage="tokenize") as timer:
+        para_ids = tokenizer(paragraphs, add_special_tokens=False).input_ids
+    if stats is not None: stats["tokenize_s"] = round(timer.elapsed, 4)
+
+    # Long articles lose their least salient paragraphs first (fewer chunks to generate),
+    # then the map budget caps what is left: total work no longer grows with the article
+    lengths = [len(ids) for ids in para_ids]
+    keep_tokens = sum(lengths)
+    if TEXTRANK_PREFILTER and len(text.split()) > TEXTRANK_MIN_WORDS:
+        keep_tokens *= TEXTRANK_KEEP_RATIO
+    if keep_tokens < sum(lengths) or keep_tokens > token_budget:
+        with STAGE_SECONDS.time(stage="textrank") as timer:
+            keep = select_paragraphs(paragraphs, min(keep_tokens, token_budget), lengths, strict=keep_tokens > token_budget)
+        para_ids = [para_ids[p] for p in keep]
+        if stats is not None: stats.update(textrank_s=round(timer.elapsed, 4), paragraphs_dropped=len(paragraphs) - len(keep))
+    if sum(len(ids) for ids in para_ids) > token_budget:
+        # A lead paragraph (or a 1-2 paragraph article) that is over on its own: cut it off
+        capped, room = [], token_budget
+        for ids in para_ids:
+            if room <= 0: break
+            capped.append(ids[:room])
+            room -= len(capped[-1])
+        para_ids = capped
+        if stats is not None: stats["budget_truncated"] = True
+    total_tokens = sum(len(ids) for ids in para_ids) + 2 # + <s> </s>
+
+    bucket_start = time.perf_counter()
+    buckets = []
     current_chunk_tokens = []
-    current_chunk_size = 0
-    TARGET_CHUNK_SIZE = 1000 # BART: Massive appetite (Leaves 24 for overhead)
-
-    for para in raw_paragraphs:
-        para = para.strip()
-        if not para: continue
-            
-        p_tokens = tokenizer.encode(para, add_special_tokens=False)
+
+    for p_tokens in para_ids:
         p_len = len(p_tokens)
         
         # Monster Paragraph Logic
         if p_len > TARGET_CHUNK_SIZE:
              for i in range(0, p_len, TARGET_CHUNK_SIZE):
-                 sub_tokens = p_tokens[i : i + TARGET_CHUNK_SIZE]
-                 processed_chunks.append(tokenizer.decode(sub_tokens, skip_special_tokens=True))
+                 buckets.append(p_tokens[i : i + TARGET_CHUNK_SIZE])
              continue
 
         # Bucket Limit Check
-        if current_chunk_size + p_len > TARGET_CHUNK_SIZE:
-            # Seal Bucket
-            chunk_text = tokenizer.decode(current_chunk_tokens, skip_special_tokens=True)
-            if chunk_text: processed_chunks.append(chunk_text)
-            
-            # Start New Bucket
-            current_chunk_tokens = p_tokens
-            current_chunk_size = p_len
+        if len(current_chunk_tokens) + p_len > TARGET_CHUNK_SIZE:
+            # Seal Bucket + Start New Bucket
+            if current_chunk_tokens: buckets.append(current_chunk_tokens)
+            current_chunk_tokens = list(p_tokens)
         else:
             # Add to Bucket
-            if current_chunk_tokens: current_chunk_tokens.extend(p_tokens)
-            else: current_chunk_tokens = p_tokens
-            current_chunk_size += p_len
+            current_chunk_tokens.extend(p_tokens)
 
     if current_chunk_tokens:
-        chunk_text = tokenizer.decode(current_chunk_tokens, skip_special_tokens=True)
-        processed_chunks.append(chunk_text)
+        buckets.append(current_chunk_tokens)
 
-    chunks = processed_chunks
+    chunks = [wrap_special(b) for b in buckets]
+    bucket_s = time.perf_counter() - bucket_start
+    STAGE_SECONDS.observe(bucket_s, stage="bucket")
+    if stats is not None: stats["bucket_s"] = round(bucket_s, 4)
+    return chunks, total_tokens
 
-    # 2. DETERMINE RATIOS
+def chunk_ratio(mode: str) -> float:
+    """Pass 1 target length per chunk, as a share of its input tokens."""
     if mode == "short":
-        chunk_ratio = 0.25
-    else: 
-        # Smart Summary: High Retention (55%)
-        chunk_ratio = 0.55 
+        return 0.25
+    # Smart Summary: High Retention (55%)
+    return 0.55
 
-    # 3. PASS 1 (Summarize Chunks)
+def choose_tier(chunk_lens: list[int], ratio: float, second_pass: bool, deadline: Optional[float]) -> tuple[str, float]:
+    """
+    DEADLINE-AWARE STEP-DOWN: First GEN_TIERS entry whose predicted finish (batcher
+    backlog + this article's own work) lands before the deadline. Falls back to the
+    cheapest tier when nothing fits. Returns (tier, predicted seconds).
+    """
+    backlog = COST_MODEL.backlog_seconds()
+    if deadline is None:
+        return GEN_TIERS[0][0], backlog + COST_MODEL.predict(chunk_lens, ratio, GEN_TIERS[0][0], second_pass)
+    remaining = deadline - time.time()
+    for name, _, _ in GEN_TIERS:
+        predicted = backlog + COST_MODEL.predict(chunk_lens, ratio, name, second_pass)
+        if predicted <= remaining:
+            return name, predicted
+    return name, predicted
+
+def chunk_and_summarize(text: str, mode: str = "half",
+                        on_progress: Optional[Callable[[int, int, list[str]], None]] = None,
+                        stats: Optional[dict] = None, deadline: Optional[float] = None) -> str:
+    """
+    Two-Pass Summarization with Bounded Dynamic Scaling.
+    Token IDs flow from the single tokenizer call straight into generate(); all
+    length stats are counted from IDs already in hand.
+    on_progress(chunks_done, chunks_total, partial_summaries) fires as each chunk
+    finishes, in article order, so callers can stream output before the last chunk
+    (partial_summaries stays empty when they are not the final output: Quick Recap, or
+    a Smart list long enough to be reduced).
+    Articles over MAP_TOKEN_BUDGET tokens (or a deadline's worth) are cut down by
+    TextRank first; partial summaries over the mode's window are tree-reduced.
+    Per-article stats (token counts, retention, stage timings) are written into `stats`.
+    With a `deadline` (epoch seconds) the generation tier is picked by choose_tier();
+    the tier used is reported as stats["tier"].
+    mode="extractive" returns TextRank's top sentences instead (tier "extractive", no BART).
+    """
+    stats = stats if stats is not None else {}
+
+    # 0. EXTRACTIVE (Instant): milliseconds, no generate() call
+    if mode == "extractive":
+        with STAGE_SECONDS.time(stage="textrank") as timer:
+            summary = extractive_summary(text)
+        stats.update(tier="extractive", mode=mode, textrank_s=round(timer.elapsed, 4))
+        GEN_TIER_TOTAL.inc(tier="extractive")
+        return summary
+
+    # 1. PARAGRAPH-AWARE BUCKETING (capped at MAP_TOKEN_BUDGET tokens)
+    chunks, total_tokens = build_chunks(text, stats)
+
+    # 2. DETERMINE RATIOS
+    ratio = chunk_ratio(mode)
+
+    tier, predicted = choose_tier([len(c) for c in chunks], ratio, mode == "short", deadline)
+    if deadline is not None and predicted > deadline - time.time() and len(chunks) > 1:
+        # TIME BUDGET: not even the cheapest tier makes it, so BART reads less of the article
+        budget = deadline_token_budget(chunks, predicted, deadline)
+        chunks, total_tokens = build_chunks(text, stats, budget)
+        tier, predicted = choose_tier([len(c) for c in chunks], ratio, mode == "short", deadline)
+        stats["token_budget"] = budget
+    length_scale = GEN_TIER_CONFIGS[tier][1]
+    stats.update(tier=tier, predicted_s=round(predicted, 3))
+    GEN_TIER_TOTAL.inc(tier=tier)
+
+    # 3. MAP (Summarize Chunks)
+    # All chunks are queued at once so the batcher can pack them (and other jobs' chunks)
+    # into shared generate() calls. Results are collected back in article order.
+    # Chunks unchanged since an earlier submission come straight from the chunk cache.
+    pending = []
+    targets = []
+    reused = 0
+    for chunk_ids in chunks:
+        c_len = len(chunk_ids)
+        p1_min, p1_max = compute_dynamic_length(c_len, ratio * length_scale)
+        targets.append([c_len, p1_min, p1_max])
+        future, hit = submit_chunk(chunk_ids, p1_min, p1_max, tier)
+        pending.append(future)
+        reused += hit
+    stats["chunk_targets"] = targets # [tokens, min, max] per chunk
+    stats.update(chunks_reused=reused, chunks_generated=len(chunks) - reused)
+
+    # Chunk summaries are the final output (and streamable) only when no reduce can follow
+    window = RECAP_WINDOW_TOKENS if mode == "short" else SMART_WINDOW_TOKENS
+    final_partials = mode != "short" and sum(t[2] for t in targets) <= window
+
+    partial_ids = []
     partial_summaries = []
-    print(f"Processing {len(chunks)} grouped chunks from {total_tokens} tokens... Mode: {mode}", flush=True)
-    
-    for i, chunk in enumerate(chunks):
-        c_len = len(tokenizer.encode(chunk))
-        p1_min, p1_max = compute_dynamic_length(c_len, chunk_ratio)
-        
-        print(f"  Chunk {i+1}: {c_len} tokens -> Target {p1_min}-{p1_max}", flush=True)
-        s = summarize_text(chunk, p1_min, p1_max)
-        partial_summaries.append(s)
+    wait_s = decode_s = 0.0
+    if on_progress: on_progress(0, len(chunks), partial_summaries)
+    for f in pending:
+        t0 = time.perf_counter()
+        ids = f.result()
+        t1 = time.perf_counter()
+        partial_ids.append(ids)
+        if final_partials: partial_summaries.append(tokenizer.decode(ids, skip_special_tokens=True))
+        wait_s += t1 - t0
+        decode_s += time.perf_counter() - t1
+        if on_progress: on_progress(len(partial_ids), len(chunks), partial_summaries)
 
     # 4. FINALIZE
-    combined_text = " ".join(partial_summaries)
-    comb_len = len(tokenizer.encode(combined_text))
+    summary_ids = [t for ids in partial_ids for t in ids]
+    comb_len = len(summary_ids) + 2 # + <s> </s>
     
-    retention_rate = (comb_len / total_tokens) * 100 if total_tokens > 0 else 0
+    retention = comb_len / total_tokens if total_tokens > 0 else 0
 
-    print(f"\n--- INTERMEDIATE STATS ---", flush=True)
-    print(f"Total Tokens: {total_tokens}", flush=True)
-    print(f"AI Summary Tokens: {comb_len}", flush=True)
-    print(f"Retention %: {retention_rate:.1f}%", flush=True)
-    print(f"--------------------------\n", flush=True)
+    INPUT_TOKENS.observe(total_tokens)
+    OUTPUT_TOKENS.observe(comb_len)
+    RETENTION_RATIO.observe(retention)
+    stats.update(mode=mode, chunks=len(chunks), total_tokens=total_tokens, summary_tokens=comb_len,
+                 retention=round(retention, 4))
+
+    # 5. REDUCE (Tree): partials over the mode's window are merged level by level
+    partial_ids, reduce_wait_s = reduce_partials(partial_ids, window, tier, length_scale, stats)
+    wait_s += reduce_wait_s
     
     # FOR SMART MODE: We STOP here and return the detailed list.
-    # Pass 2 causes timeouts and hallucinations on long text.
+    # Pass 2 causes timeouts and hallucinations on long text (very long lists were reduced above instead).
     if mode != "short":
-        print(f"--- FINAL RESULT (MAP-ONLY) ---\n{combined_text[:500]}...\n-------------------------------", flush=True)
-        return clean_sentence_end(combined_text)
+        if not final_partials:
+            t1 = time.perf_counter()
+            partial_summaries = [tokenizer.decode(ids, skip_special_tokens=True) for ids in partial_ids]
+            decode_s += time.perf_counter() - t1
+        record_wait_and_decode(stats, wait_s, decode_s)
+        return clean_sentence_end(" ".join(partial_summaries))
 
     # For "Short" mode, we might still want to compress (Pass 2 logic below...)
-    final_raw = summarize_text(combined_text, 100, 200) # Quick Recap Logic
+    # Pass 2 reuses the (reduced) Pass 1 output IDs directly (Model absolute limit: 1024)
+    summary_ids = [t for ids in partial_ids for t in ids]
+    t0 = time.perf_counter()
+    future, stats["recap_reused"] = submit_chunk(wrap_special(summary_ids[:RECAP_WINDOW_TOKENS]), 100, 200, tier) # Quick Recap Logic
+    final_ids = future.result()
+    t1 = time.perf_counter()
+    final_raw = tokenizer.decode(final_ids, skip_special_tokens=True)
+    record_wait_and_decode(stats, wait_s + t1 - t0, decode_s + time.perf_counter() - t1)
     return clean_sentence_end(final_raw)
 
+def deadline_token_budget(chunks: list[list[int]], predicted: float, deadline: float) -> int:
+    """
+    Map token budget that should make the deadline: the article's own predicted work
+    scaled down to the time left after the batcher backlog (never below one chunk).
+    """
+    backlog = COST_MODEL.backlog_seconds()
+    available = deadline - time.time() - backlog
+    tokens = sum(len(c) for c in chunks)
+    return max(TARGET_CHUNK_SIZE, int(tokens * available / max(predicted - backlog, 1e-6)))
+
+def reduce_partials(partial_ids: list[list[int]], window: int, tier: str, length_scale: float,
+                    stats: dict) -> tuple[list[list[int]], float]:
+    """
+    HIERARCHICAL REDUCE: while the partial summaries are over `window` tokens, consecutive
+    ones are merged in groups of up to REDUCE_GROUP_TOKENS and summarized again. Every
+    group of a level is queued at once so the batcher packs them into shared generate()
+    calls. Returns (partial IDs, seconds spent waiting on generate()).
+    """
+    levels = calls = reused = 0
+    wait_s = 0.0
+    start = time.perf_counter()
+    while sum(len(ids) for ids in partial_ids) > window:
+        groups = reduce_groups([len(ids) for ids in partial_ids])
+        if len(groups) == len(partial_ids):
+            break # Nothing left to merge
+        level = []
+        for group in groups:
+            if len(group) == 1:
+                level.append(partial_ids[group[0]])
+                continue
+            merged = [t for i in group for t in partial_ids[i]]
+            r_min, r_max = compute_dynamic_length(len(merged) + 2, REDUCE_RATIO * length_scale)
+            future, hit = submit_chunk(wrap_special(merged), r_min, r_max, tier)
+            level.append(future)
+            calls += 1
+            reused += hit
+        t0 = time.perf_counter()
+        partial_ids = [item.result() if isinstance(item, Future) else item for item in level]
+        wait_s += time.perf_counter() - t0
+        levels += 1
+    if levels:
+        reduce_s = time.perf_counter() - start
+        STAGE_SECONDS.observe(reduce_s, stage="reduce")
+        stats["reduce_s"] = round(reduce_s, 4)
+    stats.update(reduce_levels=levels, reduce_calls=calls, reduce_reused=reused)
+    return partial_ids, wait_s
+
+def summary_cacheable(stats: dict) -> bool:
+    """Only full-tier summaries of the whole (budgeted) article outlive the request."""
+    return stats["tier"] == GEN_TIERS[0][0] and "token_budget" not in stats
+
+def record_wait_and_decode(stats: dict, wait_s: float, decode_s: float):
+    """generate() itself is timed per batch by the batcher; per job we keep how long it waited on it."""
+    STAGE_SECONDS.observe(decode_s, stage="decode")
+    stats["generate_wait_s"] = round(wait_s, 4)
+    stats["decode_s"] = round(decode_s, 4)
+
+# ==========================================
+# 🗄️ SUMMARY CACHE
+# ==========================================
+# Any change to the model, generation params or length constants produces a new
+# fingerprint, so stale summaries are never served after a config change.
+# Only "full" tier summaries are stored: a degraded one must not outlive the spike.
+CACHE_FINGERPRINT = repr((
+    model_name, INFERENCE_ENGINE, sorted(GEN_CONFIG.items()),
+    SHORT_MIN, SHORT_MAX, FINAL_MIN, FINAL_MAX,
+    FIRST_CHUNK_TOKENS, OTHER_CHUNK_TOKENS, TARGET_CHUNK_SIZE,
+    MAP_TOKEN_BUDGET, REDUCE_GROUP_TOKENS, REDUCE_RATIO, SMART_WINDOW_TOKENS, RECAP_WINDOW_TOKENS,
+    TEXTRANK_PREFILTER, TEXTRANK_MIN_WORDS, TEXTRANK_KEEP_RATIO
+))
+SUMMARY_CACHE = SummaryCache(SUMMARY_CACHE_DIR, SUMMARY_CACHE_MEMORY_BYTES, SUMMARY_CACHE_DISK_BYTES)
+
+# Chunk outputs depend only on the model and the tier's generate() kwargs (targets are in the key)
+CHUNK_CACHE_FINGERPRINTS = {name: repr((model_name, INFERENCE_ENGINE, sorted(gen.items()))) for name, gen, _ in GEN_TIERS}
+CHUNK_CACHE = ChunkCache(CHUNK_CACHE_BYTES)
+
+def summary_cache_key(text: str, mode: str) -> str:
+    return make_cache_key(text, mode, CACHE_FINGERPRINT)
+
 # ==========================================
 #  ASYNC INFRASTRUCTURE
 # ==========================================
-JOBS = {} 
+JOBS = make_job_store(JOB_STORE, JOB_DB_PATH, JOB_TTL_SECONDS, JOB_MAX_FINISHED)
+
+class JobQueue:
+    """
+    Priority queue feeding the inference worker pool.
+    Ordered by (priority, arrival) so equal-priority jobs stay first-in-first-out.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cancelled = set()
+        self._units = {}  # job_id -> predicted work units (COST_MODEL) while waiting
+        self._cond = threading.Condition()
+
+    def put(self, job_id: str, priority: int, payload: tuple, units: float = 0.0):
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._seq), job_id, payload))
+            self._units[job_id] = units
+            self._cond.notify()
+
+    def get(self) -> tuple[str, tuple]:
+        """Blocks until a job is available. Returns (job_id, payload)."""
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, job_id, payload = heapq.heappop(self._heap)
+                self._units.pop(job_id, None)
+                if job_id in self._cancelled:
+                    self._cancelled.discard(job_id)
+                    continue
+                return job_id, payload
+
+    def cancel(self, job_id: str):
+        """Drops a queued job (e.g. deleted before it started)."""
+        with self._cond:
+            if any(entry[2] == job_id for entry in self._heap):
+                self._cancelled.add(job_id)
+                self._units.pop(job_id, None)
+
+    def position(self, job_id: str):
+        """1-based position among waiting jobs, or None if not queued."""
+        with self._cond:
+            waiting = sorted(entry for entry in self._heap if entry[2] not in self._cancelled)
+        for i, entry in enumerate(waiting):
+            if entry[2] == job_id:
+                return i + 1
+        return None
+
+    def work_ahead(self, priority: int, job_id: Optional[str] = None) -> float:
+        """
+        Predicted units of waiting jobs that run before `job_id`, or before a job
+        arriving now at this priority when `job_id` is None (or no longer queued).
+        """
+        with self._cond:
+            if job_id is not None:
+                entry = next((e for e in self._heap if e[2] == job_id), None)
+                if entry is not None:
+                    return sum(self._units.get(e[2], 0.0) for e in self._heap if e[:2] < entry[:2])
+            return sum(self._units.get(e[2], 0.0) for e in self._heap if e[0] <= priority)
+
+    def units(self, job_id: str) -> float:
+        with self._cond:
+            return self._units.get(job_id, 0.0)
+
+    def total_units(self) -> float:
+        with self._cond:
+            return sum(self._units.values())
+
+    def __len__(self):
+        with self._cond:
+            return len(self._heap) - len(self._cancelled)
+
+class JobWaiters:
+    """
+    Per-job wake-ups for async handlers. Each waiter is a future on its request's event
+    loop; notify() (from a worker thread, on every chunk and when the job settles)
+    resolves that job's waiters through call_soon_threadsafe, so a waiting request
+    holds no thread and other jobs' listeners are never woken. A waiter registers
+    (watch) BEFORE it reads the job, so a change landing between the read and the
+    await still wakes it.
+    """
+
+    def __init__(self):
+        self._waiters = {}  # job_id -> {(event loop, future)}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def watch(self, job_id: str):
+        """Registers a wake-up future for job_id on the running loop for the duration of the block."""
+        loop = asyncio.get_running_loop()
+        entry = (loop, loop.create_future())
+        with self._lock:
+            self._waiters.setdefault(job_id, set()).add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                entries = self._waiters.get(job_id)
+                if entries is not None:
+                    entries.discard(entry)
+                    if not entries: del self._waiters[job_id]
+
+    @staticmethod
+    async def woken(waiter: asyncio.Future, timeout: float) -> bool:
+        """True once notify() resolved the watch() future, False after `timeout` seconds."""
+        try:
+            await asyncio.wait_for(waiter, timeout=max(timeout, 0.0))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def wait(self, job_id: str, timeout: float) -> bool:
+        """Waits until the job is done, failed or deleted, or `timeout` seconds pass. True if it settled."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.watch(job_id) as waiter:
+                job = await asyncio.to_thread(JOBS.get, job_id)
+                if job is None or job["status"] in FINISHED:
+                    return True
+                if not await self.woken(waiter, deadline - time.monotonic()):
+                    return False
+
+    def notify(self, job_id: str):
+        with self._lock:
+            entries = self._waiters.pop(job_id, ())
+        for loop, waiter in entries:
+            loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._waiters.values())
+
+JOB_QUEUE = JobQueue()
+JOB_WAITERS = JobWaiters() # Wakes the /stream, /digest stream and /status?wait= listeners of one job
+DIRECT_JOBS = {} # job_id -> Future of a queued /summarize request (result goes to the request, never to JOBS)
+
+def job_priority(req: SummaryRequest) -> int:
+    """Quick Recap and interactive taps go ahead of bulk work."""
+    if req.mode == "short":
+        return PRIORITY_LEVELS["interactive"]
+    return PRIORITY_LEVELS.get(req.priority, PRIORITY_LEVELS["normal"])
+
+def estimate_job_units(text: str, mode: str) -> float:
+    """
+    COST ESTIMATE (admission + ETA): work units of one article at the default tier,
+    from its tokenized length cut into TARGET_CHUNK_SIZE buckets. Mirrors build_chunks()
+    closely enough for queueing without paying for the bucketing itself.
+    """
+    if mode == "extractive":
+        return 0.0
+    words = len(text.split())
+    if tokenizer is not None:
+        tokens = len(tokenizer(text, add_special_tokens=False, verbose=False).input_ids)
+    else:
+        tokens = int(words * TOKENS_PER_WORD) # Warm-up: no tokenizer yet
+    if TEXTRANK_PREFILTER and words > TEXTRANK_MIN_WORDS:
+        tokens = int(tokens * TEXTRANK_KEEP_RATIO)
+    tokens = min(tokens, MAP_TOKEN_BUDGET)
+    full, rest = divmod(tokens, TARGET_CHUNK_SIZE)
+    chunk_lens = [TARGET_CHUNK_SIZE + 2] * full + ([rest + 2] if rest or not full else [])
+    return COST_MODEL.predict_units(chunk_lens, chunk_ratio(mode), GEN_TIERS[0][0], mode == "short")
 
-def process_summarization_job(job_id: str, text: str, mode: str):
+def admission_check(units: float, priority: int, endpoint: str):
     """
-    Runs in a separate thread. Updates JOBS[job_id] when done.
+    ADMISSION CONTROL: 429 + Retry-After when the predicted backlog (batcher + job queue
+    + this request) would exceed ADMISSION_MAX_BACKLOG_S, scaled by priority.
+    Retry-After is how long the excess should take to drain at the current rate.
     """
-    print(f"[Job {job_id}] Started...")
+    if ADMISSION_MAX_BACKLOG_S <= 0 or units <= 0:
+        return
+    limit = ADMISSION_MAX_BACKLOG_S * ADMISSION_PRIORITY_SCALE.get(priority, 1.0)
+    _, backlog = COST_MODEL.eta(JOB_QUEUE.total_units(), units)
+    if backlog <= limit:
+        return
+    retry_after = max(1, math.ceil(backlog - limit))
+    ADMISSION_REJECTED.inc(endpoint=endpoint)
+    log_event("admission_rejected", endpoint=endpoint, priority=priority, backlog_s=round(backlog, 1),
+              limit_s=round(limit, 1), retry_after_s=retry_after)
+    raise HTTPException(status_code=429, detail=f"Server busy: ~{backlog:.0f}s of queued work (limit {limit:.0f}s)",
+                        headers={"Retry-After": str(retry_after)})
+
+def record_estimate(kind: str, predicted: Optional[float], actual: float):
+    """Estimator accuracy: "eta" is the /submit promise, "run" the cost model's prediction at worker start."""
+    if not predicted or actual <= 0:
+        return
+    ESTIMATE_RATIO.observe(actual / predicted, kind=kind)
+    COST_MODEL.record_error(kind, predicted, actual)
+
+def process_summarization_job(job_id: str, text: str, mode: str, deadline: Optional[float] = None):
+    """
+    Runs on a pool worker. Updates JOBS[job_id] when done.
+    """
+    started = time.time()
+    job = JOBS.get(job_id)
+    queue_wait = started - job["created_at"] if job else 0.0
+    QUEUE_WAIT_SECONDS.observe(queue_wait)
+    ACTIVE_JOBS.inc()
+    log_event("job_started", job_id=job_id, mode=mode, queue_wait_s=round(queue_wait, 3))
+    JOBS.update(job_id, status="processing", started_at=started)
+    stats = {}
+
+    def on_progress(done: int, total: int, partials: list[str]):
+        fields = {"chunks_done": done, "chunks_total": total}
+        # Smart mode output IS the chunk list, so partials are playable as-is.
+        # Quick Recap gets compressed again afterwards, so only progress is shared.
+        if mode != "short": fields["partials"] = list(partials)
+        JOBS.update(job_id, **fields)
+        JOB_WAITERS.notify(job_id)
+
     try:
-        final_summary = chunk_and_summarize(text, mode)
-        JOBS[job_id]["status"] = "done"
-        JOBS[job_id]["output"] = final_summary
-        print(f"[Job {job_id}] COMPLETED. Output len: {len(final_summary)}")
+        final_summary = chunk_and_summarize(text, mode, on_progress, stats, deadline)
+        if summary_cacheable(stats):
+            SUMMARY_CACHE.put(summary_cache_key(text, mode), final_summary)
+        JOBS.update(job_id, status="done", output=final_summary, tier=stats["tier"],
+                    chunks_reused=stats["chunks_reused"], chunks_generated=stats["chunks_generated"])
+        outcome = "done"
     except Exception as e:
-        print(f"[Job {job_id}] ERROR: {str(e)}")
-        JOBS[job_id]["status"] = "error"
-        JOBS[job_id]["output"] = f"Error processing summary: {str(e)}"
+        JOBS.update(job_id, status="error", output=f"Error processing summary: {str(e)}")
+        outcome = "error"
+        stats["error"] = str(e)
+    finally:
+        elapsed = time.time() - started
+        ACTIVE_JOBS.dec()
+
+    settle_cluster_followers(job_id)
+    job_settled(job_id)
+    latency = time.time() - job["created_at"] if job else elapsed
+    JOB_LATENCY_SECONDS.observe(latency, mode=mode)
+    JOBS_TOTAL.inc(outcome=outcome)
+    if outcome == "done":
+        record_estimate("run", stats.get("predicted_s"), elapsed)
+        record_estimate("eta", job.get("eta_s") if job else None, latency)
+    log_event("job_" + ("completed" if outcome == "done" else "failed"), job_id=job_id,
+              latency_s=round(latency, 3), run_s=round(elapsed, 3), queue_wait_s=round(queue_wait, 3),
+              eta_s=job.get("eta_s") if job else None, **stats)
+
+def job_settled(job_id: str):
+    """Called when a job reaches done/error or is deleted: wakes waiters, updates search, digests, then batches."""
+    JOB_WAITERS.notify(job_id)
+    job = JOBS.get(job_id)
+    index_job(job_id, job)
+    if DIGESTS.watches(job_id):
+        DIGESTS.job_settled(job_id, job["status"] if job else "deleted")
+    finish_job_batches(job_id)
+
+def inference_worker():
+    """Pool worker loop: pulls the highest-priority job and runs it."""
+    ready = wait_until_ready() # Warm-up: jobs stay queued (with positions) until the model is in
+    while True:
+        job_id, (text, mode, deadline) = JOB_QUEUE.get()
+        direct = DIRECT_JOBS.pop(job_id, None)
+        if direct is not None:
+            run_direct_job(direct, text, mode, deadline, ready)
+            continue
+        if job_id not in JOBS: continue # Deleted while waiting
+        if not ready:
+            JOBS.update(job_id, status="error", output=f"Model failed to load: {MODEL_STATE['error']}")
+            settle_cluster_followers(job_id)
+            job_settled(job_id)
+            continue
+        process_summarization_job(job_id, text, mode, deadline) # Updates to a job deleted mid-run are no-ops
+
+def run_direct_job(future: Future, text: str, mode: str, deadline: Optional[float], ready: bool):
+    """A /summarize job: same pipeline and cache as a queued job, but no JOBS entry (nothing lands in the inbox)."""
+    if not future.set_running_or_notify_cancel():
+        return # Caller disconnected while it was queued
+    try:
+        if not ready:
+            raise RuntimeError(f"Model failed to load: {MODEL_STATE['error']}")
+        stats = {}
+        summary = chunk_and_summarize(text, mode, stats=stats, deadline=deadline) # /summarize already missed the cache
+        if summary_cacheable(stats):
+            SUMMARY_CACHE.put(summary_cache_key(text, mode), summary)
+        future.set_result((summary, stats))
+    except Exception as e:
+        future.set_exception(e)
+
+for n in range(INFERENCE_WORKERS):
+    threading.Thread(target=inference_worker, name=f"inference-worker-{n}", daemon=True).start()
+
+# ==========================================
+# 🧬 STORY CLUSTERS
+# ==========================================
+# The same wire story from several outlets costs one BART run. The first job of a
+# (cluster, mode) leads; later jobs whose body is a near-duplicate of the leader's
+# reuse its summary once done, or follow it while it is still queued/running and are
+# completed with its output. Same cluster but a different body runs on its own.
+STORY_CLUSTERS = StoryClusterIndex()
+CLUSTER_LEADERS = OrderedDict() # (cluster_id, mode) -> (leader job_id, body MinHash)
+CLUSTER_FOLLOWERS = {}          # leader job_id -> [(job_id, priority, payload)]
+CLUSTER_LOCK = threading.Lock()
+METRICS.gauge("summarizer_story_clusters", "Story cluster index sizes", labels=("stat",),
+              fn=lambda: {(k,): v for k, v in STORY_CLUSTERS.snapshot().items()})
+
+def story_cluster(req: SummaryRequest) -> Optional[str]:
+    """Indexes the article (title + lead paragraph) and returns its cluster, or None if reuse is off."""
+    if not CLUSTER_REUSE or not req.cluster_reuse or req.title == "Untitled Article":
+        return None # Without a real title there is nothing to match on
+    lead = next((p.strip() for p in req.text.split("\n") if p.strip()), "")[:500]
+    return STORY_CLUSTERS.add(req.title, lead, req.source, time.time())
+
+def settle_cluster_followers(job_id: str):
+    """Leader finished: hand its summary to the followers, or let them run alone if it failed/was deleted."""
+    with CLUSTER_LOCK:
+        followers = CLUSTER_FOLLOWERS.pop(job_id, [])
+    if not followers:
+        return
+    leader = JOBS.get(job_id)
+    for follower_id, priority, payload in followers:
+        if leader and leader["status"] == "done":
+            JOBS.update(follower_id, status="done", output=leader["output"], tier=leader.get("tier"),
+                        reused_from=job_id, follows=None)
+            JOBS_TOTAL.inc(outcome="cluster_reuse")
+            job_settled(follower_id)
+        else:
+            JOBS.update(follower_id, follows=None)
+            JOB_QUEUE.put(follower_id, priority, payload, estimate_job_units(payload[0], payload[1]))
+    log_event("cluster_followers_settled", leader=job_id, followers=len(followers),
+              reused=bool(leader and leader["status"] == "done"))
+
+# ==========================================
+# 📰 FEED INGESTION
+# ==========================================
+FEED_FETCHER = FeedFetcher()
+
+def feed_refresh_loop():
+    """Background refresh every FEED_REFRESH_SECONDS (each cycle runs its own event loop)."""
+    while True:
+        try:
+            index_feed_report(asyncio.run(FEED_FETCHER.refresh(load_feeds())))
+        except Exception as e:
+            log_event("feed_refresh_failed", error=str(e))
+        time.sleep(FEED_REFRESH_SECONDS)
+
+if FEED_REFRESH_SECONDS > 0:
+    threading.Thread(target=feed_refresh_loop, name="feed-refresh", daemon=True).start()
+
+# ==========================================
+# 📚 BATCH SUBMIT (Reading Lists)
+# ==========================================
+# A batch is a view over ordinary jobs: each item still gets a JOBS entry (so the inbox,
+# /status and /stream work unchanged); the batch only remembers the item order and its digest.
+JOB_BATCHES = OrderedDict() # batch_id -> {"job_ids", "digest_id", "created_at", "finished_at", "digest"}
+JOB_BATCH_INDEX = {}        # job_id -> set of batch_ids waiting on it
+JOB_BATCH_LOCK = threading.Lock()
+
+def register_job_batch(batch_id: str, job_ids: list[str], digest_id: Optional[str]):
+    """Caller holds JOB_BATCH_LOCK. digest_id is set for auto_digest batches."""
+    JOB_BATCHES[batch_id] = {"job_ids": job_ids, "digest_id": digest_id, "created_at": time.time(),
+                             "finished_at": None, "digest": None}
+    for job_id in set(job_ids):
+        JOB_BATCH_INDEX.setdefault(job_id, set()).add(batch_id)
+    while len(JOB_BATCHES) > JOB_BATCH_HISTORY:
+        old_id, old = JOB_BATCHES.popitem(last=False)
+        for job_id in set(old["job_ids"]):
+            waiting = JOB_BATCH_INDEX.get(job_id)
+            if waiting is not None:
+                waiting.discard(old_id)
+                if not waiting: del JOB_BATCH_INDEX[job_id]
+
+def check_batch_finished(batch_id: str):
+    """Caller holds JOB_BATCH_LOCK. Seals the batch (and builds its digest) once every item is done/error."""
+    batch = JOB_BATCHES.get(batch_id)
+    if batch is None or batch["finished_at"] is not None:
+        return
+    jobs = JOBS.get_many(batch["job_ids"])
+    if any(job["status"] not in ("done", "error") for job in jobs.values()):
+        return
+    batch["finished_at"] = time.time()
+    if batch["digest_id"] is not None:
+        digest = DIGESTS.get(batch["digest_id"])
+        if digest is None: # Evicted from the LRU: same ID comes back for the same items
+            digest = DIGESTS.get_or_create(list(dict.fromkeys(batch["job_ids"])))
+        batch["digest"] = DIGESTS.script(digest)
+    log_event("batch_finished", batch_id=batch_id, items=len(batch["job_ids"]),
+              seconds=round(batch["finished_at"] - batch["created_at"], 3))
+
+def finish_job_batches(job_id: str):
+    """Called when a job reaches done/error."""
+    with JOB_BATCH_LOCK:
+        for batch_id in JOB_BATCH_INDEX.pop(job_id, ()):
+            check_batch_finished(batch_id)
+
+# ==========================================
+# 🎧 DIGESTS (Paged / Resumable Briefings)
+# ==========================================
+# A digest is addressed by its ordered job-ID list (see digests.py). Segments fill in
+# as the selected jobs finish; clients page through them or stream them, so audio
+# playback can seek to item N without the whole script being rebuilt or sent.
+DIGESTS = DigestStore(JOBS.get_many, max_digests=DIGEST_HISTORY)
+METRICS.gauge("summarizer_digests_stored", "Digest objects held in memory", fn=lambda: len(DIGESTS))
+
+def digest_page(digest, offset: int, limit: int) -> dict:
+    """Digest summary + one page of segments (intro on the first page, outro on the last once ready)."""
+    limit = max(1, min(limit, DIGEST_PAGE_MAX))
+    result = digest.describe()
+    result["offset"] = offset
+    result["segments"] = DIGESTS.segments(digest, offset, limit)
+    end = offset + len(result["segments"])
+    result["next_offset"] = end if end < len(digest.job_ids) else None
+    if offset == 0:
+        result["intro"] = BRIEFING_INTRO
+    if result["next_offset"] is None and result["status"] == "ready":
+        result["outro"] = BRIEFING_OUTRO
+    return result
+
+# ==========================================
+# 📖 READ HISTORY
+# ==========================================
+# Read state and headline history live in history_store.py's SQLite file instead of the
+# client's read_history.json / master_titles.txt. Both files are imported once, on the
+# first start with an empty store; refreshed feeds add their headlines as they land.
+HISTORY = HistoryStore(HISTORY_DB_PATH)
+METRICS.gauge("summarizer_read_history", "Read history store sizes", labels=("stat",),
+              fn=lambda: {(k,): v for k, v in HISTORY.snapshot().items()})
+
+def history_feed_titles(source: str, items: list[dict]):
+    HISTORY.add_titles([{"source": item.get("source", source), "title": item.get("title", ""),
+                         "link": item.get("link", ""), "date": item.get("date", "")} for item in items])
+
+def history_importer():
+    """First start only (empty store): pulls in the client's existing files."""
+    snapshot = HISTORY.snapshot()
+    if snapshot["reads"] or snapshot["titles"] or snapshot["tombstones"]:
+        return
+    try:
+        counts = HISTORY.import_files(READ_HISTORY_FILE, MASTER_TITLES_FILE)
+        log_event("history_imported", **counts)
+    except (OSError, ValueError) as e:
+        log_event("history_import_failed", error=str(e))
+
+threading.Thread(target=history_importer, name="history-importer", daemon=True).start()
+
+# ==========================================
+# 🔎 SEARCH
+# ==========================================
+# One BM25 index (search_index.py) over finished summaries ("summary"), news_cache
+# items ("article") and master_titles.txt rows ("title"). Jobs are added/removed in
+# job_settled(); a feed's articles are swapped after each refresh that rewrote its file.
+SEARCH_INDEX = SearchIndex()
+SEARCH_FEED_DOCS = {}   # source name -> doc_ids currently indexed from its news_cache file
+SEARCH_FEED_LOCK = threading.Lock()
+METRICS.gauge("summarizer_search_index", "Search index sizes", labels=("stat",),
+              fn=lambda: {(k,): v for k, v in SEARCH_INDEX.snapshot().items()})
+
+def index_job(job_id: str, job: Optional[dict]):
+    """Finished summaries are searchable; failed or deleted ones are dropped."""
+    if job is None or job["status"] != "done":
+        SEARCH_INDEX.delete("job:" + job_id)
+        return
+    title, source = job.get("title") or "Untitled", job.get("source") or "Unknown"
+    SEARCH_INDEX.add("job:" + job_id, title, job["output"], {
+        "kind": "summary", "job_id": job_id, "title": title, "source": source,
+        "timestamp": job.get("created_at"), "snippet": snippet(job["output"]),
+    })
+
+def article_doc_id(item: dict) -> str:
+    return "article:" + (item.get("link") or f"{item.get('source')}|{item.get('title')}")
+
+def index_feed_items(source: str, items: list[dict]):
+    """Replaces one source's articles: new items added, items gone from the feed deleted."""
+    doc_ids = set()
+    for item in items:
+        doc_id = article_doc_id(item)
+        doc_ids.add(doc_id)
+        SEARCH_INDEX.add(doc_id, item.get("title", ""), item.get("desc", ""), {
+            "kind": "article", "title": item.get("title"), "source": item.get("source", source),
+            "link": item.get("link"), "date": item.get("date"), "snippet": snippet(item.get("desc", "")),
+        })
+    with SEARCH_FEED_LOCK:
+        old = SEARCH_FEED_DOCS.get(source, set())
+        SEARCH_FEED_DOCS[source] = doc_ids
+    for doc_id in old - doc_ids:
+        SEARCH_INDEX.delete(doc_id)
+
+def index_feed_file(source: str):
+    path = cache_path(FEED_FETCHER.cache_dir, source)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+    except (OSError, ValueError) as e:
+        log_event("search_feed_unreadable", source=source, error=str(e))
+        return
+    index_feed_items(source, items)
+    history_feed_titles(source, items)
+
+def index_feed_report(report: Optional[dict]):
+    """After a refresh cycle: re-index only the feeds whose file was rewritten."""
+    for result in (report or {}).get("results", []):
+        if result["status"] == "updated":
+            index_feed_file(result["name"])
+
+def search_index_loader():
+    """Startup fill (background): news_cache, master_titles.txt, and jobs a SQLite store kept."""
+    t0 = time.perf_counter()
+    try:
+        feeds = load_feeds()
+    except (OSError, ValueError):
+        feeds = []
+    for feed in feeds:
+        if os.path.exists(cache_path(FEED_FETCHER.cache_dir, feed["name"])):
+            index_feed_file(feed["name"])
+    if os.path.exists(MASTER_TITLES_FILE):
+        for row in read_master_titles(MASTER_TITLES_FILE):
+            if article_doc_id(row) in SEARCH_INDEX: continue # news_cache copy has the description
+            SEARCH_INDEX.add("title:" + (row["link"] or row["title"]), row["title"], "", {
+                "kind": "title", "title": row["title"], "source": row["source"], "link": row["link"], "date": row["date"],
+            })
+    job_ids = [job["id"] for job in JOBS.completed()]
+    for i in range(0, len(job_ids), 500):
+        for job_id, job in JOBS.get_many(job_ids[i:i + 500]).items():
+            index_job(job_id, job)
+    log_event("search_index_loaded", seconds=round(time.perf_counter() - t0, 3), **SEARCH_INDEX.snapshot())
+
+threading.Thread(target=search_index_loader, name="search-index-loader", daemon=True).start()
 
 # ==========================================
 # 🚀 API ENDPOINTS
@@ -266,114 +1500,635 @@ def process_summarization_job(job_id: str, text: str, mode: str):
 
 @app.get("/")
 def home():
-    return {"status": "Active", "system": "InHouse-Inbox-V162.8"}
+    return {"status": "Active", "system": "InHouse-Inbox-V162.8", "engine": INFERENCE_ENGINE,
+            "model_phase": MODEL_STATE["phase"]}
+
+@app.get("/ready")
+def readiness():
+    """
+    READINESS PROBE: 200 once the model can summarize, 503 while loading (or if it failed).
+    Phases: starting -> loading_tokenizer -> loading_weights -> warming_up [-> loading_assistant]
+            [-> starting_workers] -> ready | failed
+    """
+    now = time.time()
+    body = {
+        "ready": MODEL_STATE["phase"] == "ready",
+        "phase": MODEL_STATE["phase"],
+        "engine": INFERENCE_ENGINE,
+        "elapsed": (MODEL_STATE["ready_at"] or now) - MODEL_STATE["started_at"],
+        "queued_jobs": len(JOB_QUEUE),
+    }
+    if INFERENCE_POOL is not None:
+        body["inference_pool"] = INFERENCE_POOL.snapshot()
+    if MODEL_STATE["assistant"]:
+        body["assistant"] = MODEL_STATE["assistant"]
+    if MODEL_STATE["error"]:
+        body["error"] = MODEL_STATE["error"]
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@app.get("/metrics")
+def metrics():
+    """PROMETHEUS SCRAPE: Stage timing histograms, job latency, token counts, queue/store gauges."""
+    return PlainTextResponse(METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/cache/stats")
+def cache_stats():
+    """OPERATOR ENDPOINT: Summary cache hit/miss counters and tier sizes (+ the chunk cache)."""
+    return dict(SUMMARY_CACHE.snapshot(), chunks=CHUNK_CACHE.snapshot())
 
 @app.post("/submit")
 def submit_job(req: SummaryRequest):
     """
     ASYNC SUBMIT: Returns job_id immediately.
     """
+    return create_summary_job(req)
+
+def create_summary_job(req: SummaryRequest, units: Optional[float] = None, admit: bool = True) -> dict:
+    """
+    Creates the JOBS entry (done straight away on a cache hit) and hands it to the worker pool.
+    Jobs that would queue are costed first (`units`, estimated here when not given) and
+    refused with 429 over the admission limit unless `admit` is False (already admitted).
+    """
     job_id = str(uuid.uuid4())
+    if req.mode == "extractive":
+        return create_extractive_job(job_id, req)
+    cached = SUMMARY_CACHE.get(summary_cache_key(req.text, req.mode))
+    created_at = time.time()
     
     # Initialize Job
-    JOBS[job_id] = {
-        "status": "processing",
-        "output": None,
+    job = {
+        "status": "done" if cached is not None else "queued",
+        "output": cached,
         "title": req.title,  # Store title for inbox display
         "source": req.source, # Store source for inbox display
-        "created_at": time.time()
+        "created_at": created_at
     }
+    if cached is not None:
+        job["tier"] = GEN_TIERS[0][0]
+    JOBS.create(job_id, job)
+    
+    # Cache Hit: Nothing to run
+    if cached is not None:
+        index_job(job_id, job)
+        JOBS_TOTAL.inc(outcome="cache_hit")
+        log_event("job_submitted", job_id=job_id, title=req.title, source=req.source, mode=req.mode,
+                  priority=req.priority, cache_hit=True)
+        return {"job_id": job_id, "status": "done", "output": cached, "tier": job["tier"]}
     
-    # Spawn Thread
-    thread = threading.Thread(
-        target=process_summarization_job,
-        args=(job_id, req.text, req.mode)
-    )
-    thread.start()
+    # Hand off to the worker pool (the budget clock starts now, queue wait included)
+    deadline = created_at + req.latency_budget_s if req.latency_budget_s is not None else None
+    priority, payload = job_priority(req), (req.text, req.mode, deadline)
+
+    # Story Cluster: another outlet's copy may already be summarized or on its way
+    cluster_id = story_cluster(req)
+    if cluster_id is not None:
+        JOBS.update(job_id, cluster_id=cluster_id)
+        signature = STORY_CLUSTERS.body_signature(req.text) # Hashed outside the lock
+        with CLUSTER_LOCK:
+            leader_id, leader_signature = CLUSTER_LEADERS.get((cluster_id, req.mode), (None, None))
+            leader = JOBS.get(leader_id) if leader_id else None
+            duplicate = near_duplicate(signature, leader_signature)
+            if leader and duplicate and leader["status"] == "done":
+                JOBS.update(job_id, status="done", output=leader["output"], tier=leader.get("tier"), reused_from=leader_id)
+                index_job(job_id, JOBS.get(job_id))
+                JOBS_TOTAL.inc(outcome="cluster_reuse")
+                log_event("job_submitted", job_id=job_id, title=req.title, source=req.source, mode=req.mode,
+                          priority=req.priority, cache_hit=False, cluster_id=cluster_id, reused_from=leader_id)
+                return {"job_id": job_id, "status": "done", "output": leader["output"], "tier": leader.get("tier"),
+                        "cluster_id": cluster_id, "reused_from": leader_id}
+            if leader and duplicate and leader["status"] in ("queued", "processing"):
+                JOBS.update(job_id, follows=leader_id)
+                CLUSTER_FOLLOWERS.setdefault(leader_id, []).append((job_id, priority, payload))
+                log_event("job_submitted", job_id=job_id, title=req.title, source=req.source, mode=req.mode,
+                          priority=req.priority, cache_hit=False, cluster_id=cluster_id, follows=leader_id)
+                return {"job_id": job_id, "status": "queued", "cluster_id": cluster_id, "follows": leader_id}
+            if signature is not None and (not leader or leader["status"] == "error"):
+                CLUSTER_LEADERS[(cluster_id, req.mode)] = (job_id, signature) # Leader missing, failed or deleted: this job leads
+                CLUSTER_LEADERS.move_to_end((cluster_id, req.mode))
+                while len(CLUSTER_LEADERS) > CLUSTER_LEADERS_MAX:
+                    CLUSTER_LEADERS.popitem(last=False)
+
+    # Admission + ETA: only work that will really queue is costed against the limit
+    if units is None:
+        units = estimate_job_units(req.text, req.mode)
+    if admit:
+        try:
+            admission_check(units, priority, "submit")
+        except HTTPException:
+            JOBS.delete(job_id) # Refused: no trace left (a cluster it just claimed reads as leader missing)
+            raise
+    start_s, eta_s = COST_MODEL.eta(JOB_QUEUE.work_ahead(priority), units)
+    if MODEL_READY.is_set():
+        JOBS.update(job_id, eta_s=round(eta_s, 3)) # Scored against the real latency (warm-up time isn't modelled)
+    JOB_QUEUE.put(job_id, priority, payload, units)
+    position = JOB_QUEUE.position(job_id)
     
-    print(f"--- JOB SUBMITTED: {job_id} ---", flush=True)
-    print(f"Title: {req.title}", flush=True)
-    print(f"Source: {req.source}", flush=True)
-    print(f"Mode: {req.mode}", flush=True)
-    return {"job_id": job_id, "status": "processing"}
+    log_event("job_submitted", job_id=job_id, title=req.title, source=req.source, mode=req.mode,
+              priority=req.priority, cache_hit=False, queue_position=position, latency_budget_s=req.latency_budget_s,
+              cluster_id=cluster_id, eta_s=round(eta_s, 3))
+    job = JOBS.get(job_id)
+    response = {"job_id": job_id, "status": job["status"] if job else "deleted", "queue_position": position,
+                "eta_s": round(eta_s, 1), "estimated_start": created_at + start_s, "estimated_finish": created_at + eta_s}
+    if cluster_id is not None:
+        response["cluster_id"] = cluster_id
+    return response
+
+def create_extractive_job(job_id: str, req: SummaryRequest) -> dict:
+    """mode="extractive": TextRank answers inline, so the job is created done (no queue, cache or cluster)."""
+    created_at = time.time()
+    stats = {}
+    try:
+        summary = chunk_and_summarize(req.text, req.mode, stats=stats)
+        job = {"status": "done", "output": summary, "tier": stats["tier"]}
+        outcome = "done"
+    except Exception as e:
+        job = {"status": "error", "output": f"Error processing summary: {str(e)}"}
+        outcome = "error"
+    job.update(title=req.title, source=req.source, created_at=created_at)
+    JOBS.create(job_id, job)
+    index_job(job_id, job)
+    JOB_LATENCY_SECONDS.observe(time.time() - created_at, mode=req.mode)
+    JOBS_TOTAL.inc(outcome=outcome)
+    log_event("job_submitted", job_id=job_id, title=req.title, source=req.source, priority=req.priority,
+              cache_hit=False, **dict(stats, mode=req.mode))
+    response = {"job_id": job_id, "status": job["status"], "output": job["output"]}
+    if "tier" in job:
+        response["tier"] = job["tier"]
+    return response
+
+@app.post("/submit_batch")
+def submit_batch(req: BatchSubmitRequest):
+    """
+    BATCH SUBMIT: Queues a whole reading list in one round trip.
+    Items are enqueued back to back so their chunks share generate() batches; identical
+    texts (same mode) run once and share a job_id. Poll /batch/{batch_id} for all of it.
+    """
+    if not req.items:
+        raise HTTPException(status_code=400, detail="No items")
+    if len(req.items) > JOB_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {JOB_BATCH_MAX_ITEMS} items per batch")
+
+    # Admission is all or nothing: every distinct uncached item is costed before any is created
+    units = {}  # summary cache key -> predicted work units
+    for item in req.items:
+        key = summary_cache_key(item.text, item.mode)
+        if key not in units:
+            units[key] = 0.0 if key in SUMMARY_CACHE else estimate_job_units(item.text, item.mode)
+    try:
+        admission_check(sum(units.values()), min(job_priority(item) for item in req.items), "submit_batch")
+    except HTTPException as e:
+        raise HTTPException(status_code=e.status_code, detail=f"{e.detail} for {len(units)} articles", headers=e.headers)
+
+    batch_id = str(uuid.uuid4())
+    seen = {}   # summary cache key -> job response
+    items = []
+    # Held until the batch is registered so a fast worker can't finish an item unnoticed
+    with JOB_BATCH_LOCK:
+        for item in req.items:
+            key = summary_cache_key(item.text, item.mode)
+            if key not in seen:
+                seen[key] = create_summary_job(item, units[key], admit=False)
+            items.append(seen[key])
+        job_ids = [item["job_id"] for item in items]
+        digest = DIGESTS.get_or_create(list(dict.fromkeys(job_ids))) if req.auto_digest else None
+        register_job_batch(batch_id, job_ids, digest.id if digest else None)
+        check_batch_finished(batch_id) # All cache hits: already done
+
+    log_event("batch_submitted", batch_id=batch_id, items=len(items), unique=len(seen), auto_digest=req.auto_digest)
+    result = {"batch_id": batch_id, "job_ids": job_ids, "unique_jobs": len(seen), "items": items}
+    if digest is not None:
+        result["digest_id"] = digest.id # Page/stream it via /digest/{digest_id} while items finish
+    return result
+
+@app.get("/batch/{batch_id}")
+def batch_status(batch_id: str):
+    """
+    BATCH STATUS: One poll for a whole /submit_batch. Reports per-item status (in
+    submit order), counts by status and, with auto_digest, the digest once finished.
+    """
+    with JOB_BATCH_LOCK:
+        batch = JOB_BATCHES.get(batch_id)
+        batch = dict(batch) if batch is not None else None
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    jobs = JOBS.get_many(batch["job_ids"])
+    items = []
+    counts = {}
+    for job_id in batch["job_ids"]:
+        job = jobs.get(job_id)
+        status = job["status"] if job else "deleted"
+        counts[status] = counts.get(status, 0) + 1
+        item = {"job_id": job_id, "status": status}
+        if job:
+            item["title"] = job.get("title")
+            if "tier" in job: item["tier"] = job["tier"]
+            if "chunks_total" in job:
+                item["progress"] = {"chunks_done": job["chunks_done"], "chunks_total": job["chunks_total"]}
+        items.append(item)
+
+    result = {
+        "batch_id": batch_id,
+        "status": "done" if batch["finished_at"] is not None else "processing",
+        "counts": counts,
+        "items": items,
+        "created_at": batch["created_at"],
+        "finished_at": batch["finished_at"],
+    }
+    if batch["digest_id"] is not None:
+        result["digest_id"] = batch["digest_id"]
+        result["digest"] = batch["digest"]
+    return result
+
+@app.post("/feeds/refresh")
+async def refresh_feeds():
+    """
+    FEED REFRESH: Fetches every enabled feed now (conditional GET) and rewrites news_cache.
+    Returns the cycle report; 409 if a cycle is already running.
+    """
+    try:
+        feeds = load_feeds()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=f"Feed list unreadable: {e}")
+    report = await FEED_FETCHER.refresh(feeds)
+    if report is None:
+        raise HTTPException(status_code=409, detail="Refresh already running")
+    index_feed_report(report)
+    return report
+
+@app.get("/feeds")
+def feeds_status():
+    """FEED STATUS: Report from the last refresh cycle (per-feed status, item counts, timings)."""
+    return FEED_FETCHER.last_report or {"feeds": 0, "counts": {}, "results": [], "started_at": None}
+
+@app.get("/feeds/{name}/items")
+def feed_items(name: str):
+    """FEED ITEMS: The server's news_cache copy for one source, same JSON the client caches."""
+    path = cache_path(FEED_FETCHER.cache_dir, name)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Feed not cached")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+@app.post("/clusters/assign")
+def assign_clusters(req: ClusterAssignRequest):
+    """
+    STORY CLUSTERS: Assigns each feed item to a story cluster (MinHash/LSH index shared
+    with /submit). Returns cluster_ids in item order.
+    """
+    cluster_ids = [STORY_CLUSTERS.add(item.title, item.desc, item.source, parse_date(item.date))
+                   for item in req.items]
+    return {"cluster_ids": cluster_ids, "clusters": len(set(cluster_ids))}
+
+@app.get("/clusters/{cluster_id}")
+def get_cluster(cluster_id: str):
+    """STORY CLUSTER: Size, founding title/source and creation time."""
+    info = STORY_CLUSTERS.cluster(cluster_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Cluster not found")
+    return info
 
 @app.get("/status/{job_id}")
-def check_status(job_id: str):
+async def check_status(job_id: str, wait: float = 0):
     """
-    POLL STATUS: Returns 'processing' or 'done' + output.
+    POLL STATUS: Returns 'queued', 'processing' or 'done' + output.
+    Queued jobs also report their queue position and a fresh cost-based ETA.
+    ?wait=N holds the request up to N seconds (max STATUS_WAIT_MAX) until the job is
+    done or failed, so one long-poll replaces a run of 'processing' answers.
     """
+    wait = max(0.0, min(wait, STATUS_WAIT_MAX))
+    if wait:
+        await JOB_WAITERS.wait(job_id, wait)
+    return await asyncio.to_thread(job_status, job_id)
+
+def job_status(job_id: str) -> dict:
     job = JOBS.get(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
         
-    return {
+    result = {
         "job_id": job_id,
         "status": job["status"],
         "output": job["output"]
     }
+    if job["status"] == "queued":
+        position = JOB_QUEUE.position(job_id)
+        if position is not None:
+            now = time.time()
+            start_s, eta_s = COST_MODEL.eta(JOB_QUEUE.work_ahead(0, job_id), JOB_QUEUE.units(job_id))
+            result["queue_position"] = position
+            result["estimated_start"] = now + start_s
+            result["estimated_finish"] = now + eta_s
+    if "chunks_total" in job:
+        result["progress"] = {"chunks_done": job["chunks_done"], "chunks_total": job["chunks_total"]}
+    if "partials" in job:
+        result["partials"] = job["partials"]
+    for field in ("tier", "cluster_id", "reused_from", "follows", "chunks_reused", "chunks_generated"):
+        if job.get(field) is not None:
+            result[field] = job[field]
+    return result
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/stream/{job_id}")
+async def stream_job(job_id: str):
+    """
+    STREAMING (SSE): Emits each chunk summary the moment it is ready so TTS can start
+    after the first chunk. Events: 'chunk' (Smart mode), 'progress', then 'done' or 'error'.
+    """
+    if not await asyncio.to_thread(JOBS.__contains__, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        sent = 0
+        last_progress = None
+        while True:
+            with JOB_WAITERS.watch(job_id) as waiter: # Registered before the read: no lost wake-up
+                job = await asyncio.to_thread(JOBS.get, job_id)
+                if job is None:
+                    yield sse_event("error", {"job_id": job_id, "output": "Job deleted"})
+                    return
+
+                partials = job.get("partials", [])
+                while sent < len(partials):
+                    yield sse_event("chunk", {"job_id": job_id, "index": sent, "text": partials[sent]})
+                    sent += 1
+
+                progress = (job.get("chunks_done", 0), job.get("chunks_total"))
+                if progress != last_progress and progress[1] is not None:
+                    yield sse_event("progress", {"job_id": job_id, "chunks_done": progress[0], "chunks_total": progress[1]})
+                    last_progress = progress
+
+                if job["status"] in FINISHED:
+                    yield sse_event(job["status"], {"job_id": job_id, "output": job["output"]})
+                    return
+
+                if not await JOB_WAITERS.woken(waiter, SSE_KEEPALIVE_S):
+                    yield ": keepalive\n\n" # SSE comment: keeps proxies from closing an idle stream
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.delete("/delete/{job_id}")
 def delete_job(job_id: str):
-    if job_id in JOBS:
-        del JOBS[job_id]
+    if JOBS.delete(job_id):
+        JOB_QUEUE.cancel(job_id)
+        settle_cluster_followers(job_id) # Followers of a deleted leader run on their own
+        job_settled(job_id) # A deleted item no longer holds its batch or digest open
         return {"status": "deleted", "id": job_id}
     raise HTTPException(status_code=404, detail="Job not found")
 
+def inbox_entry(job_id: str, job: dict) -> dict:
+    return {
+        "id": job_id,
+        "title": job.get("title") or "Untitled",
+        "source": job.get("source") or "Unknown",
+        "timestamp": job.get("created_at", 0)
+    }
+
+def completed_snapshot() -> dict:
+    """Full inbox list, rebuilt only when the completed set has changed since the last build."""
+    cursor = JOBS.cursor # Read first: a change during the build just forces the next rebuild
+    snapshot = COMPLETED_SNAPSHOT
+    if snapshot["cursor"] != cursor:
+        # Store returns oldest first (reading queue order)
+        completed = [inbox_entry(job["id"], job) for job in JOBS.completed()]
+        snapshot = {"cursor": cursor, "body": {"jobs": completed, "count": len(completed), "cursor": cursor, "full": True}}
+        COMPLETED_SNAPSHOT.update(snapshot)
+    return snapshot["body"]
+
+def completed_delta(since: str) -> Optional[dict]:
+    """Additions/removals since a cursor, or None if the client has to take the full list."""
+    cursor = JOBS.cursor
+    ops = JOBS.changes_since(since)
+    if ops is None:
+        return None
+    added_ids = [job_id for job_id, op in ops.items() if op == "add"]
+    jobs = JOBS.get_many(added_ids) if added_ids else {}
+    added = [inbox_entry(job_id, job) for job_id, job in jobs.items() if job["status"] == "done"]
+    added.sort(key=lambda entry: entry["timestamp"])
+    removed = [job_id for job_id in ops if job_id not in {entry["id"] for entry in added}]
+    return {"added": added, "removed": removed, "cursor": cursor, "full": False}
+
+def wake_completed_waiters(cursor: str):
+    """JOBS listener: releases every /completed_jobs long-poll (runs on the writer's thread)."""
+    with COMPLETED_WAITERS_LOCK:
+        waiters = list(COMPLETED_WAITERS)
+        COMPLETED_WAITERS.clear()
+    for loop, waiter in waiters:
+        loop.call_soon_threadsafe(lambda w=waiter: w.done() or w.set_result(None))
+
+COMPLETED_SNAPSHOT = {"cursor": None, "body": None}
+COMPLETED_WAITERS = set()   # (event loop, future) per long-poll waiting for the next change
+COMPLETED_WAITERS_LOCK = threading.Lock()
+JOBS.add_listener(wake_completed_waiters)
+
 @app.get("/completed_jobs")
-def get_completed_jobs():
+async def get_completed_jobs(request: Request, since: Optional[str] = None, wait: float = 0):
     """
     INBOX ENDPOINT: Returns list of all completed jobs.
     Used by News Reader to show "Green Icon" and populate inbox menu.
+    Every response carries a cursor (also the ETag). Delta polling: ?since=<cursor>
+    returns only "added" / "removed" since then ("full": true means the cursor was too
+    old and "jobs" is the whole list). If-None-Match with the current cursor -> 304.
+    ?wait=N holds the request up to N seconds (max COMPLETED_WAIT_MAX) until something changes.
     """
-    completed = []
-    for job_id, job_data in JOBS.items():
-        if job_data["status"] == "done":
-            completed.append({
-                "id": job_id,
-                "title": job_data.get("title", "Untitled"),
-                "source": job_data.get("source", "Unknown"),
-                "timestamp": job_data.get("created_at", 0)
-            })
-    
-    # Sort by oldest first (reading queue order)
-    completed.sort(key=lambda x: x["timestamp"])
-    return {"jobs": completed, "count": len(completed)}
+    etag_seen = request.headers.get("if-none-match", "").strip()
+    etag_seen = (etag_seen[2:] if etag_seen.startswith("W/") else etag_seen).strip('"') or None
+    known = since or etag_seen
+    wait = max(0.0, min(wait, COMPLETED_WAIT_MAX))
+    if wait and known == JOBS.cursor:
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        with COMPLETED_WAITERS_LOCK:
+            COMPLETED_WAITERS.add((loop, waiter))
+        try:
+            if known == JOBS.cursor: # Nothing slipped in while registering
+                await asyncio.wait_for(waiter, timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with COMPLETED_WAITERS_LOCK:
+                COMPLETED_WAITERS.discard((loop, waiter))
+
+    cursor = JOBS.cursor
+    if etag_seen == cursor:
+        return Response(status_code=304, headers={"ETag": f'"{cursor}"', "Cache-Control": "no-cache"})
+    body = None
+    if since is not None:
+        body = await asyncio.to_thread(completed_delta, since)
+    if body is None:
+        body = await asyncio.to_thread(completed_snapshot)
+    return JSONResponse(body, headers={"ETag": f'"{body["cursor"]}"', "Cache-Control": "no-cache"})
+
+@app.get("/search")
+def search(q: str, limit: int = 10, kind: Optional[str] = None):
+    """
+    SEARCH: BM25 over finished summaries, cached feed articles and master_titles.txt.
+    kind = "summary", "article" or "title" narrows it. Best match first.
+    """
+    if kind is not None and kind not in ("summary", "article", "title"):
+        raise HTTPException(status_code=400, detail="kind must be summary, article or title")
+    limit = max(1, min(limit, SEARCH_LIMIT_MAX))
+    t0 = time.perf_counter()
+    hits = SEARCH_INDEX.search(q, limit, kind)
+    # Summaries can leave the store by TTL eviction without a delete: drop those lazily
+    job_ids = [meta["job_id"] for _, _, meta in hits if meta.get("kind") == "summary"]
+    alive = JOBS.get_many(job_ids) if job_ids else {}
+    results = []
+    for doc_id, score, meta in hits:
+        if meta.get("kind") == "summary" and meta["job_id"] not in alive:
+            SEARCH_INDEX.delete(doc_id)
+            continue
+        results.append(dict(meta, doc_id=doc_id, score=round(score, 4)))
+    return {"query": q, "results": results, "count": len(results), "documents": len(SEARCH_INDEX),
+            "took_ms": round((time.perf_counter() - t0) * 1000, 3)}
+
+@app.post("/history/sync")
+def history_sync(req: HistorySyncRequest):
+    """
+    READ HISTORY SYNC: Applies this device's changes, then returns everyone else's since
+    `cursor` (one page; repeat with the new cursor while "more"). The newest mark per
+    URL wins. "full": true means the cursor was unusable and the page starts from scratch.
+    """
+    if not 1 <= req.limit <= HISTORY_SYNC_PAGE_MAX:
+        raise HTTPException(status_code=422, detail=f"limit must be between 1 and {HISTORY_SYNC_PAGE_MAX}")
+    now = time.time()
+    applied = {
+        # Clamped: a device clock running ahead must not win every future conflict
+        "reads": HISTORY.mark([(m.url, m.read, min(m.at, now) if m.at is not None else now) for m in req.reads],
+                              req.device_id),
+        "titles": HISTORY.add_titles([{"title": t.title, "source": t.source, "link": t.link, "date": t.date}
+                                      for t in req.titles], req.device_id),
+    }
+    page = HISTORY.changes_since(req.cursor, req.limit, req.device_id)
+    page["applied"] = applied
+    return page
+
+@app.post("/history/check")
+def history_check(req: HistoryCheckRequest):
+    """READ CHECK: Which of these URLs are marked read (URLs are compared normalized)."""
+    return {"read": HISTORY.read_urls(req.urls)}
+
+@app.post("/history/import")
+def history_import():
+    """READ HISTORY IMPORT: Re-reads read_history.json + master_titles.txt (older marks never override newer ones)."""
+    try:
+        return HISTORY.import_files(READ_HISTORY_FILE, MASTER_TITLES_FILE)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=f"Import failed: {e}")
+
+@app.get("/history/stats")
+def history_stats():
+    return HISTORY.snapshot()
 
 @app.post("/digest")
 def generate_digest(req: DigestRequest):
     """
     DAILY BRIEFING: Stitches multiple job outputs into one script.
+    Same selection (same order) -> same digest_id, so replays are served from the
+    digest object. With paged=true only the first page of segments is returned;
+    fetch the rest from /digest/{digest_id} or stream them.
     """
-    combined_script = "Here is your Audio Briefing. "
-    count = 0
-    
-    # Sort ids to verify order? No, trust the client order.
-    for i, job_id in enumerate(req.job_ids):
-        job = JOBS.get(job_id)
-        if job and job["status"] == "done":
-            source = job.get("source", "Unknown Source")
-            title = job.get("title", "Untitled")
-            text = job["output"]
-            
-            if count > 0:
-                combined_script += f"\n\nNext up, from {source}: {title}. \n"
-            else:
-                combined_script += f"Starting with {source}: {title}. \n"
-                
-            combined_script += text
-            count += 1
-            
-    if count == 0:
-        return {"digest": "No processed summaries found."}
-        
-    combined_script += "\n\nThat concludes your briefing."
-    return {"digest": combined_script}
-    
+    digest = DIGESTS.get_or_create(req.job_ids)
+    if req.paged:
+        return digest_page(digest, 0, req.page_size)
+    return {"digest": DIGESTS.script(digest), "digest_id": digest.id}
+
+def get_digest_or_404(digest_id: str):
+    digest = DIGESTS.get(digest_id)
+    if digest is None:
+        raise HTTPException(status_code=404, detail="Digest not found (POST /digest again with the job_ids)")
+    return digest
+
+@app.get("/digest/{digest_id}")
+def digest_segments(digest_id: str, offset: int = 0, limit: int = DIGEST_PAGE_SIZE):
+    """
+    DIGEST PAGE: Segments [offset, offset + limit) with their lead-in and text (done
+    items only) and the digest's build status. Resume playback by asking for item N.
+    """
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must be >= 0")
+    return digest_page(get_digest_or_404(digest_id), offset, limit)
+
+@app.get("/digest/{digest_id}/segments/{index}")
+def digest_segment(digest_id: str, index: int):
+    """DIGEST SEGMENT: One item of the briefing, for seeking straight to it."""
+    digest = get_digest_or_404(digest_id)
+    if not 0 <= index < len(digest.job_ids):
+        raise HTTPException(status_code=404, detail="Segment out of range")
+    return DIGESTS.segments(digest, index, 1)[0]
+
+@app.get("/digest/{digest_id}/stream")
+async def stream_digest(digest_id: str, start: int = 0):
+    """
+    DIGEST STREAMING (SSE): Plays the briefing in order from segment `start`, waiting
+    for each item to finish. Events: 'intro' (start=0), 'segment', 'skipped' (failed or
+    deleted item), then 'done' with the outro (or the empty-briefing text).
+    """
+    digest = await asyncio.to_thread(get_digest_or_404, digest_id)
+    if start < 0:
+        raise HTTPException(status_code=400, detail="start must be >= 0")
+
+    async def events():
+        index = start
+        played = 0
+        if start == 0 and digest.job_ids:
+            yield sse_event("intro", {"digest_id": digest_id, "text": BRIEFING_INTRO})
+        while index < len(digest.job_ids):
+            with JOB_WAITERS.watch(digest.job_ids[index]) as waiter: # Only the item up next can wake this stream
+                segment = (await asyncio.to_thread(DIGESTS.segments, digest, index, 1))[0]
+                if segment["status"] == "done":
+                    yield sse_event("segment", segment)
+                    played += 1
+                    index += 1
+                elif segment["status"] in ("error", "deleted"):
+                    yield sse_event("skipped", {"index": index, "job_id": segment["job_id"], "status": segment["status"]})
+                    index += 1
+                elif not await JOB_WAITERS.woken(waiter, SSE_KEEPALIVE_S):
+                    yield ": keepalive\n\n"
+        if start == 0 and played == 0:
+            yield sse_event("done", {"digest_id": digest_id, "text": BRIEFING_EMPTY})
+        else:
+            yield sse_event("done", {"digest_id": digest_id, "text": BRIEFING_OUTRO})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 # Legacy endpoint (Synchronous) for backward compatibility testing
 @app.post("/summarize")
-def summarize(req: SummaryRequest):
+async def summarize(req: SummaryRequest):
+    """
+    SYNC SUMMARIZE (legacy): one request in, the summary out. The work runs as a queued
+    job on the worker pool (priority, batching, admission) and this handler awaits its
+    future, so no threadpool worker is held while BART generates.
+    """
+    deadline = time.time() + req.latency_budget_s if req.latency_budget_s is not None else None
+    if req.mode == "extractive": # Milliseconds, no model: answered inline
+        stats = {}
+        summary = await asyncio.to_thread(chunk_and_summarize, req.text, req.mode, None, stats)
+        return {"summary": summary, "tier": stats["tier"]}
+    if MODEL_READY.is_set() and MODEL_STATE["error"]:
+        raise HTTPException(status_code=503, detail=f"Model failed to load: {MODEL_STATE['error']}")
+    cached = await asyncio.to_thread(SUMMARY_CACHE.get, summary_cache_key(req.text, req.mode))
+    if cached is not None:
+        return {"summary": cached, "tier": GEN_TIERS[0][0]}
+
+    priority = job_priority(req)
+    units = await asyncio.to_thread(estimate_job_units, req.text, req.mode)
+    admission_check(units, priority, "summarize")
+    job_id = str(uuid.uuid4())
+    future = Future()
+    DIRECT_JOBS[job_id] = future
+    JOB_QUEUE.put(job_id, priority, (req.text, req.mode, deadline), units)
     try:
-        return {"summary": chunk_and_summarize(req.text, req.mode)}
+        summary, stats = await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        DIRECT_JOBS.pop(job_id, None) # Client went away: drop the job if it hasn't started
+        JOB_QUEUE.cancel(job_id)
+        raise
     except Exception as e:
-        print(f"Sync Error: {e}")
+        log_event("summarize_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    return {"summary": summary, "tier": stats["tier"]}
@@ -0,0 +1,23 @@
+"""
+Benchmarks for the summarizer server.
+
+Run from HuggingFace_Server/ as modules. Every benchmark defaults to a tiny local
+stub model (--stub) so it runs offline; pass --real to use cached bart-large-cnn.
+
+    python -m benchmarks.run               # p50/p95/p99, tokens/s, peak RSS (pipeline + HTTP)
+    python -m benchmarks.bench_batching    # cross-job micro-batching throughput
+    python -m benchmarks.bench_preprocess  # tokenizer work before generate()
+    python -m benchmarks.bench_startup     # cold start: first response vs first summary
+    python -m benchmarks.compare_engines   # eager / int8 / onnx / compile
+    python -m benchmarks.bench_assisted    # draft-model assisted decoding: tok/s speedup + output parity
+    python -m benchmarks.bench_processes   # INFERENCE_PROCESSES 0/1/2/4: throughput + shared-weight memory
+    python -m benchmarks.bench_feed_refresh  # feed_fetcher refresh cycle vs. stand-in publishers (no model)
+    python -m benchmarks.bench_clusters      # story clustering build/query time up to 100k titles (no model)
+    python -m benchmarks.bench_search        # BM25 search index build/update/query time up to 100k docs (no model)
+    python -m benchmarks.bench_textrank      # TextRank prefilter (chunks/time saved, ROUGE kept) + extractive latency
+    python -m benchmarks.bench_chunk_cache   # re-submitted (edited) articles: chunks reused, time with/without the chunk cache
+    python -m benchmarks.bench_history       # read-history store: feed read checks, sync, compaction vs. the flat JSON file (no model)
+    python -m benchmarks.bench_map_reduce    # 10k-50k token articles: token budget + tree reduce vs. unbounded (bounded latency)
+    python -m benchmarks.bench_admission     # /submit burst: promised ETA vs. real latency, 429s over the backlog limit
+    python -m benchmarks.bench_long_poll     # /status polling vs. ?wait= long-poll (requests, notify delay) + async /summarize burst
+"""
@@ -0,0 +1,84 @@
+"""
+ADMISSION / ETA BENCHMARK
+A burst of corpus articles submitted back to back through create_summary_job() (the
+/submit path), then drained by the worker pool. Per accepted job it compares the ETA
+promised at submit with the real submit -> done latency; jobs over --limit seconds of
+predicted backlog are refused (429) instead of queued.
+
+  eta s     - predicted seconds until done, at submit
+  actual s  - measured submit -> done
+  ratio     - actual / eta (what summarizer_estimate_ratio{kind="eta"} histograms)
+
+A few warm-up articles run first (concurrently, so batched) so the cost model has
+learned this machine's rate.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_admission [--jobs 12] [--limit 120] [--warmup 4] [--stub | --real]
+"""
+import argparse
+import os
+import time
+
+from fastapi import HTTPException
+
+from benchmarks.corpus import build_corpus
+from benchmarks.run import percentile
+from benchmarks.stub_model import add_model_args, select_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=12)
+    parser.add_argument("--limit", type=float, default=120, help="ADMISSION_MAX_BACKLOG_S for the burst")
+    parser.add_argument("--warmup", type=int, default=4)
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    select_model(args.model)
+    os.environ.update(SUMMARY_CACHE_DIR="", CHUNK_CACHE_BYTES="0", CLUSTER_REUSE="0")
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    docs = [d for d in build_corpus() if d["kind"] != "titles" and 200 < len(d["text"].split()) < 4000]
+    warmup = [app.create_summary_job(app.SummaryRequest(text=doc["text"], mode="half"), admit=False)["job_id"]
+              for doc in docs[:args.warmup]]
+    while any(app.JOBS.get(job_id)["status"] not in ("done", "error") for job_id in warmup):
+        time.sleep(0.2)
+    burst = docs[args.warmup:args.warmup + args.jobs]
+    app.ADMISSION_MAX_BACKLOG_S = args.limit
+    print(f"\nwarm-up rate: {app.COST_MODEL.seconds_per_unit * 1000:.3f} ms/unit | limit {args.limit:.0f} s | "
+          f"{len(burst)} jobs")
+
+    accepted, rejected = [], 0
+    for n, doc in enumerate(burst):
+        priority = ("interactive", "normal", "bulk")[n % 3]
+        try:
+            response = app.create_summary_job(app.SummaryRequest(text=doc["text"], mode="half", priority=priority))
+            accepted.append((doc, priority, response))
+        except HTTPException as e:
+            rejected += 1
+            print(f"{doc['id']:>12} | {priority:>11} | 429, Retry-After {e.headers['Retry-After']} s")
+
+    print(f"\n{'doc':>12} | {'priority':>11} | {'words':>6} | {'position':>8} | {'eta s':>7} | {'actual s':>8} | {'ratio':>5}")
+    print("-" * 74)
+    ratios = []
+    for doc, priority, response in accepted:
+        job_id = response["job_id"]
+        while app.JOBS.get(job_id)["status"] not in ("done", "error"):
+            time.sleep(0.2)
+        job = app.JOBS.get(job_id)
+        actual = job["finished_at"] - job["created_at"]
+        ratios.append(actual / response["eta_s"])
+        print(f"{doc['id']:>12} | {priority:>11} | {len(doc['text'].split()):>6} | {response['queue_position']:>8} | "
+              f"{response['eta_s']:>7.1f} | {actual:>8.1f} | {ratios[-1]:>5.2f}", flush=True)
+
+    if ratios:
+        errors = [abs(r - 1) for r in ratios]
+        stats = app.COST_MODEL.snapshot()
+        print(f"\naccepted {len(accepted)} | rejected {rejected} | eta error p50 {percentile(errors, 50):.0%} "
+              f"p90 {percentile(errors, 90):.0%} | cost model: eta_abs_error {stats.get('eta_abs_error', 0):.0%}, "
+              f"eta_bias {stats.get('eta_bias', 0):+.0%}, run_abs_error {stats.get('run_abs_error', 0):.0%}")
+
+
+if __name__ == "__main__":
+    main()
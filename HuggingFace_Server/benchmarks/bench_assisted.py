@@ -0,0 +1,91 @@
+"""
+ASSISTED GENERATION BENCHMARK
+Decoding speed and output parity of the "greedy" tier with and without the draft
+model (ASSISTANT_MODEL), one chunk per generate() call through the batcher's own
+_generate(), on article chunks from the benchmark corpus.
+
+  tok/s   - generated tokens per second of generate() time
+  parity  - chunks whose token IDs are identical with and without the draft
+            (greedy verification keeps the main model's output; differences mean
+            float drift between batched verification and step-by-step decoding)
+
+Also checks that a beam tier ("full") falls back to normal decoding.
+
+Models:
+  --stub  a 12-layer stub and a 2-layer draft cut from it (benchmarks/stub_model.py),
+          offline; the draft agrees with the main model most of the time, like a
+          distilled checkpoint. The main model's generation_config has
+          min_length=56, as bart-large-cnn's does
+  --real  bart-large-cnn + sshleifer/distilbart-cnn-12-6, both from the local HF cache
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_assisted [--chunks 12] [--stub | --real]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.corpus import load_feed_articles
+from benchmarks.rouge import rouge_l
+from benchmarks.stub_model import REAL_MODEL, add_model_args, build_stub_assisted_pair, real_model_cached
+
+REAL_DRAFT = "sshleifer/distilbart-cnn-12-6"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=12)
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    if args.model == "real":
+        if not (real_model_cached(REAL_MODEL) and real_model_cached(REAL_DRAFT)):
+            raise SystemExit(f"--real needs {REAL_MODEL} and {REAL_DRAFT} in the local Hugging Face cache")
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        main_model, draft_model = REAL_MODEL, REAL_DRAFT
+    else:
+        main_model, draft_model = build_stub_assisted_pair()
+    os.environ.update(SUMMARIZER_MODEL=main_model, ASSISTANT_MODEL=draft_model, SUMMARY_CACHE_DIR="",
+                      CLUSTER_REUSE="0")
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    if app.assistant is None:
+        raise SystemExit("Draft model was not loaded (see the assistant_disabled log line)")
+    draft = app.assistant
+
+    chunks = [c for text in load_feed_articles() for c in app.build_chunks(text)[0]][:args.chunks]
+    print(f"\nmain={main_model} | draft={draft_model} | {len(chunks)} chunks | tier=greedy")
+    print(f"\n{'chunk':>5} | {'tokens in':>9} | {'out':>4} | {'plain tok/s':>11} | {'assisted tok/s':>14} | "
+          f"{'speedup':>7} | {'identical':>9} | {'ROUGE-L':>7}")
+    print("-" * 88)
+    totals = {"plain": 0.0, "assisted": 0.0, "tokens": 0, "identical": 0}
+    for n, ids in enumerate(chunks):
+        min_len, max_len = app.compute_dynamic_length(len(ids), 0.55)
+        runs = {}
+        for setting in ("plain", "assisted"):
+            app.assistant = draft if setting == "assisted" else None
+            t0 = time.perf_counter()
+            out = app.BATCHER._generate([ids], min_len, max_len, "greedy")[0]
+            runs[setting] = (out, time.perf_counter() - t0)
+            totals[setting] += runs[setting][1]
+        plain, assisted = runs["plain"][0], runs["assisted"][0]
+        same = plain == assisted
+        totals["tokens"] += len(plain)
+        totals["identical"] += same
+        score = rouge_l(app.tokenizer.decode(assisted), app.tokenizer.decode(plain))
+        print(f"{n:>5} | {len(ids):>9} | {len(plain):>4} | {len(plain) / runs['plain'][1]:>11.1f} | "
+              f"{len(assisted) / runs['assisted'][1]:>14.1f} | {runs['plain'][1] / runs['assisted'][1]:>6.2f}x | "
+              f"{'yes' if same else 'no':>9} | {score:>7.3f}", flush=True)
+
+    app.assistant = draft
+    before = app.ASSISTED_ROWS.value()
+    app.BATCHER._generate([chunks[0]], *app.compute_dynamic_length(len(chunks[0]), 0.55), "full")
+    fallback = "ok" if app.ASSISTED_ROWS.value() == before else "FAILED (beam tier used the draft)"
+    print(f"\ntotal: {totals['tokens'] / totals['plain']:.1f} -> {totals['tokens'] / totals['assisted']:.1f} tok/s "
+          f"({totals['plain'] / totals['assisted']:.2f}x) | identical {totals['identical']}/{len(chunks)} | "
+          f"beam-tier fallback: {fallback}")
+
+
+if __name__ == "__main__":
+    main()
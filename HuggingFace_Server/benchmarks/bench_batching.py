@@ -0,0 +1,99 @@
+"""
+MICRO-BATCHING BENCHMARK
+Submits 1, 4 and 16 articles at the same moment and measures throughput with the
+cross-job batcher enabled vs. forced batch-of-one (the old behaviour).
+
+  calls  - generate() calls for the round
+  sizes  - how many of those calls ran 1, 2-3, 4-7 and 8+ chunks
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_batching [--jobs 1,4,16] [--max-batch 8] [--max-wait-ms 30] [--stub | --real]
+"""
+import argparse
+import os
+import threading
+import time
+from collections import Counter
+
+from benchmarks.corpus import load_feed_articles
+from benchmarks.stub_model import add_model_args, select_model
+
+
+SIZE_BANDS = ((1, "1"), (3, "2-3"), (7, "4-7"), (None, "8+"))
+
+
+def size_band(size: int) -> str:
+    return next(label for top, label in SIZE_BANDS if top is None or size <= top)
+
+
+def record_batch_sizes(app) -> list[int]:
+    """Wraps BATCHER._generate so every generate() call's row count is appended to the returned list."""
+    sizes = []
+    generate = app.BATCHER._generate
+
+    def recording(batch_ids, *args):
+        sizes.append(len(batch_ids))
+        return generate(batch_ids, *args)
+
+    app.BATCHER._generate = recording
+    return sizes
+
+
+def run_round(articles: list[str], n_jobs: int, mode: str) -> tuple[float, int]:
+    """Fires n_jobs chunk_and_summarize() calls at once. Returns (wall seconds, chunk count)."""
+    import app
+    batch = [articles[i % len(articles)] for i in range(n_jobs)]
+    chunk_count = sum(len(app.build_chunks(a)[0]) for a in batch)
+    start = threading.Barrier(n_jobs + 1)
+    threads = []
+
+    def worker(text):
+        start.wait()
+        app.chunk_and_summarize(text, mode)
+
+    for text in batch:
+        t = threading.Thread(target=worker, args=(text,))
+        t.start()
+        threads.append(t)
+
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, chunk_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", default="1,4,16")
+    parser.add_argument("--mode", default="half", choices=["half", "short"])
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=30)
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    select_model(args.model)
+    os.environ.update(CHUNK_CACHE_BYTES="0", CLUSTER_REUSE="0") # Repeated articles must rerun the model
+    import app  # Starts loading the model in the background
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    articles = load_feed_articles()
+    app.BATCHER.max_wait_ms = args.max_wait_ms
+    sizes = record_batch_sizes(app)
+
+    bands = " ".join(f"{label:>4}" for _, label in SIZE_BANDS)
+    print(f"\n{'jobs':>5} | {'batch':>5} | {'wall s':>8} | {'jobs/s':>7} | {'chunks/s':>9} | {'calls':>5} | sizes {bands}")
+    print("-" * 86)
+    for n_jobs in [int(n) for n in args.jobs.split(",")]:
+        for max_batch in (1, args.max_batch):
+            app.BATCHER.max_batch_size = max_batch
+            sizes.clear()
+            wall, chunks = run_round(articles, n_jobs, args.mode)
+            counts = Counter(size_band(s) for s in sizes)
+            spread = " ".join(f"{counts[label]:>4}" for _, label in SIZE_BANDS)
+            print(f"{n_jobs:>5} | {max_batch:>5} | {wall:>8.2f} | {n_jobs / wall:>7.2f} | {chunks / wall:>9.2f} | "
+                  f"{len(sizes):>5} |       {spread}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
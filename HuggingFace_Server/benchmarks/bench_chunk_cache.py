@@ -0,0 +1,83 @@
+"""
+CHUNK CACHE BENCHMARK
+Live-blog style re-submissions through chunk_and_summarize(): each long article is
+summarized once, then again after every edit below, with the chunk cache on vs. off.
+
+  append  - a new paragraph at the end (the usual live-blog update)
+  edit    - one word changed in the middle paragraph
+  insert  - a new paragraph at the top (shifts every later bucket boundary: worst case)
+
+Reports chunks generated vs. reused and wall time per revision. The TextRank
+prefilter is off here so edits don't also change which paragraphs are kept.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_chunk_cache [--articles 3] [--mode half] [--stub | --real]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.corpus import build_corpus
+from benchmarks.stub_model import add_model_args, select_model
+from summary_cache import ChunkCache
+
+UPDATE = "Update: officials confirmed the figures in a statement released this afternoon."
+
+
+def revisions(text: str) -> list[tuple[str, str]]:
+    paragraphs = [p for p in text.split("\n") if p.strip()]
+    middle = len(paragraphs) // 2
+    edited = list(paragraphs)
+    words = edited[middle].split()
+    words[len(words) // 2] = "reportedly"
+    edited[middle] = " ".join(words)
+    return [
+        ("append", "\n".join(paragraphs + [UPDATE])),
+        ("edit", "\n".join(edited)),
+        ("insert", "\n".join([UPDATE] + paragraphs)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=3)
+    parser.add_argument("--mode", default="half", choices=["half", "short"])
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    select_model(args.model)
+    os.environ["SUMMARY_CACHE_DIR"] = ""
+    os.environ["TEXTRANK_PREFILTER"] = "0"
+    os.environ["CLUSTER_REUSE"] = "0"
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    docs = [d for d in build_corpus() if d["kind"] != "titles" and 1500 < len(d["text"].split()) < 6000][:args.articles]
+    cache, disabled = app.CHUNK_CACHE, ChunkCache(0)
+
+    print(f"\n{'doc':>12} | {'revision':>8} | {'chunks':>6} | {'reused':>6} | {'cache on s':>10} | {'cache off s':>11}")
+    print("-" * 70)
+    totals = {"on": 0.0, "off": 0.0, "chunks": 0, "reused": 0}
+    for doc in docs:
+        for name, text in [("original", doc["text"])] + revisions(doc["text"]):
+            times = {}
+            for setting in ("off", "on"):
+                app.CHUNK_CACHE = cache if setting == "on" else disabled
+                stats = {}
+                t0 = time.perf_counter()
+                app.chunk_and_summarize(text, args.mode, stats=stats)
+                times[setting] = time.perf_counter() - t0
+            if name != "original":
+                totals["on"] += times["on"]
+                totals["off"] += times["off"]
+                totals["chunks"] += stats["chunks"]
+                totals["reused"] += stats["chunks_reused"]
+            print(f"{doc['id']:>12} | {name:>8} | {stats['chunks']:>6} | {stats['chunks_reused']:>6} | "
+                  f"{times['on']:>10.2f} | {times['off']:>11.2f}", flush=True)
+    if totals["chunks"]:
+        print(f"\nrevisions: {totals['reused']}/{totals['chunks']} chunks reused | "
+              f"{totals['off']:.1f} s -> {totals['on']:.1f} s ({totals['off'] / max(totals['on'], 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+STORY CLUSTERING BENCHMARK
+Index build and query time of story_clusters.StoryClusterIndex on master_titles.txt
+scaled up with seeded synthetic headlines (near-duplicate rewrites of real titles plus
+unrelated word mixes), and agreement with a brute-force clusterer that scores every
+cluster primary exactly (what the client's groupArticles() does, minus its date sort).
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_clusters [--sizes 1000,10000,100000] [--queries 2000] [--seed 1234]
+"""
+import argparse
+import random
+import time
+
+from benchmarks.corpus import load_feed_items, load_master_titles
+from benchmarks.run import peak_rss_mb, percentile
+from story_clusters import (BASE_THRESHOLD, SAME_SOURCE_THRESHOLD, SHORT_THRESHOLD, StoryClusterIndex,
+                            jaccard, title_similarity)
+
+
+def real_articles() -> list[dict]:
+    """master_titles.txt rows, with the feed description when news_cache has the same link."""
+    descs = {it.get("link"): it.get("desc", "") for it in load_feed_items()}
+    return [{"title": r["title"], "source": r["source"], "desc": descs.get(r["link"], "")} for r in load_master_titles()]
+
+
+def scaled_corpus(articles: list[dict], size: int, rng: random.Random) -> list[dict]:
+    """The real articles, then 30% near-duplicate rewrites / 70% unrelated mixes up to `size`."""
+    vocab = sorted({w for a in articles for w in a["title"].split()})
+    sources = sorted({a["source"] for a in articles})
+    docs = list(articles[:size])
+    while len(docs) < size:
+        if rng.random() < 0.3:
+            base = rng.choice(articles)
+            words = base["title"].split()
+            if len(words) > 4: words.pop(rng.randrange(len(words)))  # Drop a word...
+            words.insert(rng.randrange(len(words) + 1), rng.choice(vocab))  # ...and add another
+            docs.append({"title": " ".join(words), "source": rng.choice(sources), "desc": base["desc"]})
+        else:
+            docs.append({"title": " ".join(rng.sample(vocab, rng.randint(6, 12))), "source": rng.choice(sources),
+                         "desc": ""})
+    return docs
+
+
+def brute_force(index: StoryClusterIndex, docs: list[dict]) -> list[str]:
+    """Reference assignment: exact score against EVERY cluster primary, best match wins."""
+    primaries, assigned = [], []
+    for d in docs:
+        doc = index._make_doc(d["title"], d["desc"], d["source"], None)
+        best, best_score = None, 0.0
+        for cluster_id, other in primaries:
+            score = max(title_similarity(doc, other), jaccard(doc.combined, other.combined))
+            short = min(len(doc.tokens), len(other.tokens)) <= 5
+            if score < (SHORT_THRESHOLD if short else BASE_THRESHOLD): continue
+            if doc.source == other.source and score < SAME_SOURCE_THRESHOLD: continue
+            if score > best_score:
+                best, best_score = cluster_id, score
+        if best is None:
+            best = f"p{len(primaries)}"
+            primaries.append((best, doc))
+        assigned.append(best)
+    return assigned
+
+
+def pair_agreement(a: list[str], b: list[str]) -> tuple[float, float]:
+    """Precision / recall of "same story" pairs in `a` against reference `b`."""
+    def pairs(labels):
+        groups = {}
+        for i, label in enumerate(labels):
+            groups.setdefault(label, []).append(i)
+        return {(x, y) for members in groups.values() for i, x in enumerate(members) for y in members[i + 1:]}
+    got, ref = pairs(a), pairs(b)
+    if not got or not ref:
+        return 1.0, 1.0
+    return len(got & ref) / len(got), len(got & ref) / len(ref)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    articles = real_articles()
+    rng = random.Random(args.seed)
+
+    # 1. Quality: the LSH index vs. exhaustive scoring on the real headlines (+ a scaled slice)
+    print(f"\nagreement with brute force (pairs assigned to the same story):")
+    for size in (len(articles), 5000):
+        docs = scaled_corpus(articles, size, random.Random(args.seed))
+        index = StoryClusterIndex(window_seconds=None)
+        lsh = [index.add(d["title"], d["desc"], d["source"]) for d in docs]
+        t0 = time.perf_counter()
+        ref = brute_force(StoryClusterIndex(window_seconds=None), docs)
+        brute_s = time.perf_counter() - t0
+        precision, recall = pair_agreement(lsh, ref)
+        print(f"  {size:>6} docs: precision {precision:.3f} | recall {recall:.3f} | clusters {len(set(lsh))} vs "
+              f"{len(set(ref))} | brute force {brute_s * 1e6 / size:.0f} us/article")
+
+    # 2. Speed: incremental build, then query-only lookups, at each scale
+    print(f"\n{'docs':>7} | {'build s':>8} | {'add p50 us':>10} | {'add p99 us':>10} | {'query p50 us':>12} | "
+          f"{'query p99 us':>12} | {'clusters':>8} | {'RSS MB':>7}")
+    print("-" * 96)
+    for size in [int(s) for s in args.sizes.split(",")]:
+        docs = scaled_corpus(articles, size, rng)
+        index = StoryClusterIndex(window_seconds=None)
+        add_us = []
+        t_build = time.perf_counter()
+        for d in docs:
+            t0 = time.perf_counter()
+            index.add(d["title"], d["desc"], d["source"])
+            add_us.append((time.perf_counter() - t0) * 1e6)
+        build_s = time.perf_counter() - t_build
+
+        query_us = []
+        for d in scaled_corpus(articles, len(articles) + args.queries, random.Random(args.seed + size))[-args.queries:]:
+            t0 = time.perf_counter()
+            index.query(d["title"], d["desc"], d["source"])
+            query_us.append((time.perf_counter() - t0) * 1e6)
+
+        print(f"{size:>7} | {build_s:>8.2f} | {percentile(add_us, 50):>10.0f} | {percentile(add_us, 99):>10.0f} | "
+              f"{percentile(query_us, 50):>12.0f} | {percentile(query_us, 99):>12.0f} | {len(index):>8} | "
+              f"{peak_rss_mb():>7.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
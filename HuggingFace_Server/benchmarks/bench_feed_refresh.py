@@ -0,0 +1,260 @@
+"""
+FEED REFRESH BENCHMARK
+Runs full refresh cycles of feed_fetcher.FeedFetcher against local stand-in HTTP
+servers (one per publisher host in global_news_feeds.json) that serve feeds recorded
+from news_cache/*.json, re-rendered as RSS or Atom with a simulated network delay.
+
+Measures, for a sequential baseline (1 connection) and the concurrent engine:
+  - cold cycle:  every feed downloaded, parsed and written
+  - warm cycle:  every feed answered 304 Not Modified (no parsing)
+and checks along the way that:
+  - every news_cache file round-trips to the recorded items (stale ones filtered out)
+  - the warm cycle sends validators and rewrites nothing
+  - one changed feed is picked up on the next cycle
+  - no host ever sees more than --per-host requests at once
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_feed_refresh [--latency-ms 150] [--per-host 2] [--connections 32] [--copies 4]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import format_datetime, formatdate
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from benchmarks.corpus import NEWS_CACHE, REPO_ROOT
+from feed_fetcher import FeedFetcher, cache_path, decode_text, load_feeds
+
+STALE_ITEMS = 2 # Per feed, dated past the 3-day expiry
+
+
+# ==========================================
+# 📼 RECORDED FEEDS
+# ==========================================
+def render_feed(items: list[dict], atom: bool, now: float) -> tuple[str, list[dict]]:
+    """XML for one source plus the items a correct fetcher should write for it."""
+    entries, expected = [], []
+    for i, item in enumerate(items + items[:STALE_ITEMS]):
+        stale = i >= len(items)
+        stamp = now - (5 * 24 * 3600 if stale else 600 * (i + 1))
+        moment = datetime.fromtimestamp(stamp, timezone.utc)
+        date = moment.isoformat().replace("+00:00", "Z") if atom else format_datetime(moment)
+        title, desc = item.get("title", ""), item.get("desc", "")
+        if atom:
+            entries.append(f'<entry><title><![CDATA[{title}]]></title><link href="{item.get("link", "")}"/>'
+                           f'<updated>{date}</updated><summary><![CDATA[{desc}]]></summary></entry>')
+        else:
+            entries.append(f'<item><title><![CDATA[{title}]]></title><link>{item.get("link", "")}</link>'
+                           f'<pubDate>{date}</pubDate><description><![CDATA[{desc}]]></description></item>')
+        if not stale:
+            expected.append({"title": decode_text(title) or "Untitled Article", "link": item.get("link", ""),
+                             "date": date, "desc": decode_text(desc)})
+    if atom:
+        xml = f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>x</title>{"".join(entries)}</feed>'
+    else:
+        xml = f'<?xml version="1.0"?><rss version="2.0"><channel><title>x</title>{"".join(entries)}</channel></rss>'
+    return xml, expected
+
+
+def record_feeds(now: float) -> tuple[list[dict], dict]:
+    """Enabled feeds that have a news_cache file -> (feed list, {url: recording})."""
+    feeds, recordings = [], {}
+    for n, feed in enumerate(f for f in load_feeds(os.path.join(REPO_ROOT, "global_news_feeds.json")) if f.get("enabled")):
+        path = cache_path(NEWS_CACHE, feed["name"])
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+        xml, expected = render_feed(items, atom=(n % 3 == 2), now=now)
+        for item in expected:
+            item["source"] = feed["name"]
+        feeds.append(dict(feed))
+        recordings[feed["url"]] = {"body": xml.encode("utf-8"), "expected": expected}
+    return feeds, recordings
+
+
+# ==========================================
+# 🖥️ STAND-IN PUBLISHERS
+# ==========================================
+class Publisher:
+    """One local HTTP server standing in for one real host. Honours ETag / If-Modified-Since."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.routes = {}   # path -> {"body", "etag", "last_modified"}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.hits = {"200": 0, "304": 0, "conditional": 0}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        publisher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, so the client pool can reuse connections
+
+            def do_GET(self):
+                with publisher._lock:
+                    publisher.in_flight += 1
+                    publisher.max_in_flight = max(publisher.max_in_flight, publisher.in_flight)
+                try:
+                    time.sleep(publisher.latency_s)
+                    route = publisher.routes.get(self.path)
+                    if route is None:
+                        self.send_response(404)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    etag = self.headers.get("If-None-Match")
+                    since = self.headers.get("If-Modified-Since")
+                    if etag or since:
+                        publisher.count("conditional")
+                    if (etag and etag == route["etag"]) or (not etag and since == route["last_modified"]):
+                        publisher.count("304")
+                        self.send_response(304)
+                        self.send_header("ETag", route["etag"])
+                        self.end_headers()
+                        return
+                    publisher.count("200", len(route["body"]))
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                    self.send_header("Content-Length", str(len(route["body"])))
+                    self.send_header("ETag", route["etag"])
+                    self.send_header("Last-Modified", route["last_modified"])
+                    self.end_headers()
+                    self.wfile.write(route["body"])
+                finally:
+                    with publisher._lock:
+                        publisher.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def count(self, key: str, nbytes: int = 0):
+        with self._lock:
+            self.hits[key] += 1
+            self.bytes_sent += nbytes
+
+    def publish(self, path: str, body: bytes):
+        self.routes[path] = {"body": body, "etag": '"%s"' % hashlib.sha1(body).hexdigest()[:16],
+                             "last_modified": formatdate(time.time(), usegmt=True)}
+
+
+def start_publishers(feeds: list[dict], recordings: dict, latency_s: float,
+                     copies: int) -> tuple[list[dict], dict, dict]:
+    """
+    Points every feed at a stand-in server for its original host. `copies` > 1 adds
+    renamed duplicates on the same host so the per-host limit actually has to queue.
+    Returns (feeds, publishers, expected).
+    """
+    publishers, local_feeds, expected = {}, [], {}
+    n = 0
+    for feed in feeds:
+        host = urlsplit(feed["url"]).netloc.lower()
+        if host not in publishers:
+            publishers[host] = Publisher(latency_s)
+        recording = recordings[feed["url"]]
+        for copy in range(copies):
+            name = feed["name"] if copy == 0 else f"{feed['name']} {copy}"
+            path = f"/feed{n}.xml"
+            n += 1
+            body = recording["body"].replace(b"<title>x</title>", f"<title>{name}</title>".encode("utf-8"))
+            publishers[host].publish(path, body)
+            local_feeds.append(dict(feed, name=name, url=publishers[host].base + path))
+            expected[name] = [dict(item, source=name) for item in recording["expected"]]
+    return local_feeds, publishers, expected
+
+
+# ==========================================
+# ✅ CHECKS + TIMING
+# ==========================================
+def check_cache(cache_dir: str, expected: dict):
+    for name, items in expected.items():
+        with open(cache_path(cache_dir, name), encoding="utf-8") as f:
+            written = json.load(f)
+        assert written == items, f"{name}: cache file does not match the recorded feed"
+
+
+def run_cycle(fetcher: FeedFetcher, feeds: list[dict]) -> dict:
+    report = asyncio.run(fetcher.refresh(feeds))
+    errors = [r for r in report["results"] if r["status"] == "error"]
+    assert not errors, f"fetch errors: {errors[:3]}"
+    return report
+
+
+def bench(label: str, feeds: list[dict], publishers: dict, expected: dict, connections: int, per_host: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        fetcher = FeedFetcher(cache_dir=os.path.join(tmp, "news_cache"), state_path=os.path.join(tmp, "feed_state.json"),
+                              max_connections=connections, per_host=per_host)
+        for p in publishers.values():
+            p.max_in_flight = 0
+
+        sent = lambda: sum(p.bytes_sent for p in publishers.values())
+        before = sent()
+        cold = run_cycle(fetcher, feeds)
+        cold_kb = (sent() - before) / 1024
+        assert cold["counts"] == {"updated": len(feeds)}, cold["counts"]
+        check_cache(fetcher.cache_dir, expected)
+
+        mtimes = {name: os.stat(cache_path(fetcher.cache_dir, name)).st_mtime_ns for name in expected}
+        before = sent()
+        warm = run_cycle(FeedFetcher(cache_dir=fetcher.cache_dir, state_path=fetcher.state_path, # Validators from disk
+                                     max_connections=connections, per_host=per_host), feeds)
+        warm_kb = (sent() - before) / 1024
+        assert warm["counts"] == {"not_modified": len(feeds)}, warm["counts"]
+        assert all(os.stat(cache_path(fetcher.cache_dir, name)).st_mtime_ns == mtimes[name] for name in expected)
+
+        # Republish one feed: exactly that one is downloaded again
+        changed = feeds[0]
+        host = urlsplit(changed["url"]).netloc
+        publisher = next(p for p in publishers.values() if urlsplit(p.base).netloc == host)
+        path = urlsplit(changed["url"]).path
+        publisher.publish(path, publisher.routes[path]["body"] + b"\n")
+        delta = run_cycle(fetcher, feeds)
+        assert delta["counts"] == {"updated": 1, "not_modified": len(feeds) - 1}, delta["counts"]
+
+        peak = max(p.max_in_flight for p in publishers.values())
+        assert peak <= per_host, f"per-host limit exceeded: {peak} > {per_host}"
+
+    row = {"label": label, "cold_s": cold["seconds"], "warm_s": warm["seconds"], "peak_per_host": peak}
+    print(f"{label:<12} | {connections:>5} | {per_host:>8} | {row['cold_s']:>7.2f} | {row['warm_s']:>7.2f} | "
+          f"{cold_kb:>7.0f} | {warm_kb:>7.0f} | {peak:>9}", flush=True)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=150, help="Simulated server response time")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=2)
+    parser.add_argument("--copies", type=int, default=4, help="Feeds per stand-in host")
+    args = parser.parse_args()
+
+    feeds, recordings = record_feeds(time.time())
+    feeds, publishers, expected = start_publishers(feeds, recordings, args.latency_ms / 1000, args.copies)
+    size_kb = sum(len(route["body"]) for p in publishers.values() for route in p.routes.values()) / 1024
+    print(f"\n{len(feeds)} feeds on {len(publishers)} hosts | {size_kb:.0f} KB recorded | "
+          f"{args.latency_ms:.0f} ms simulated latency")
+    print(f"\n{'engine':<12} | {'conns':>5} | {'per host':>8} | {'cold s':>7} | {'warm s':>7} | "
+          f"{'cold KB':>7} | {'warm KB':>7} | {'peak/host':>9}")
+    print("-" * 84)
+
+    sequential = bench("sequential", feeds, publishers, expected, connections=1, per_host=1)
+    concurrent = bench("concurrent", feeds, publishers, expected, args.connections, args.per_host)
+    print(f"\nspeedup (cold): {sequential['cold_s'] / concurrent['cold_s']:.1f}x | "
+          f"warm vs cold: {concurrent['cold_s'] / max(concurrent['warm_s'], 1e-9):.1f}x | all checks passed")
+
+
+if __name__ == "__main__":
+    main()
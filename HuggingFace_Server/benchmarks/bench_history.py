@@ -0,0 +1,91 @@
+"""
+READ HISTORY BENCHMARK
+history_store.HistoryStore vs. what the client does today with read_history.json
+(parse the whole array, then `includes()` per rendered article) at growing history
+sizes. URLs are the real read_history.json / master_titles.txt links plus seeded
+synthetic ones with the same shape.
+
+Per size:
+  write    - marking the history read, in 1000-URL sync batches
+  check    - read state of a 500-article feed render (10% already read)
+  flat     - the same check as a linear scan of the parsed JSON array
+  sync     - a full /history/sync download, paged
+  compact  - one retention pass (nothing expired: the fixed cost)
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_history [--sizes 1000,10000,100000] [--seed 1234]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.corpus import load_master_titles
+from benchmarks.run import percentile
+from feed_fetcher import REPO_ROOT
+from history_store import HistoryStore
+
+
+def synthetic_urls(base: list[str], size: int, rng: random.Random) -> list[str]:
+    urls = list(dict.fromkeys(base))[:size]
+    while len(urls) < size:
+        stem = rng.choice(base).rsplit("/", 1)[0]
+        urls.append(f"{stem}/story-{rng.getrandbits(48):012x}?utm_source=rss")
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    with open(os.path.join(REPO_ROOT, "read_history.json"), "r", encoding="utf-8") as f:
+        base = json.load(f) + [row["link"] for row in load_master_titles() if row["link"]]
+    rng = random.Random(args.seed)
+
+    print(f"\n{'reads':>7} | {'write s':>7} | {'check p50 ms':>12} | {'check p99 ms':>12} | {'flat p50 ms':>11} | "
+          f"{'sync s':>6} | {'compact ms':>10} | {'DB MB':>6} | {'bloom KB':>8}")
+    print("-" * 102)
+    for size in [int(s) for s in args.sizes.split(",")]:
+        urls = synthetic_urls(base, size, rng)
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+            t0 = time.perf_counter()
+            for i in range(0, size, 1000):
+                store.mark_read(urls[i:i + 1000], device="bench")
+            write_s = time.perf_counter() - t0
+
+            flat_json = json.dumps(urls)
+            unseen = synthetic_urls(base, size + 450, random.Random(args.seed + size))[size:]
+            check_ms, flat_ms = [], []
+            for _ in range(50):
+                render = rng.sample(urls, 50) + rng.sample(unseen, 450)
+                t0 = time.perf_counter()
+                found = store.read_urls(render)
+                check_ms.append((time.perf_counter() - t0) * 1000)
+                assert len(found) >= 50
+                t0 = time.perf_counter()
+                history = json.loads(flat_json)
+                sum(1 for url in render if url in history)
+                flat_ms.append((time.perf_counter() - t0) * 1000)
+
+            t0 = time.perf_counter()
+            page = store.changes_since(None, 5000)
+            while page["more"]:
+                page = store.changes_since(page["cursor"], 5000)
+            sync_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            store.compact()
+            compact_ms = (time.perf_counter() - t0) * 1000
+            stats = store.snapshot()
+        print(f"{size:>7} | {write_s:>7.2f} | {percentile(check_ms, 50):>12.2f} | {percentile(check_ms, 99):>12.2f} | "
+              f"{percentile(flat_ms, 50):>11.2f} | {sync_s:>6.2f} | {compact_ms:>10.1f} | "
+              f"{stats['db_bytes'] / 2 ** 20:>6.1f} | {stats['bloom_bytes'] / 1024:>8.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
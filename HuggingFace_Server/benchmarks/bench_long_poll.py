@@ -0,0 +1,98 @@
+"""
+LONG-POLL BENCHMARK
+Requests per summary and notification delay for the /submit -> /status loop, through
+the ASGI app in-process (httpx), with a batch of corpus articles submitted at once:
+
+  poll N s  - GET /status/{job_id} every N seconds until done (what clients do today)
+  wait      - GET /status/{job_id}?wait=STATUS_WAIT_MAX, repeated until done
+
+  requests/summary - /status calls per finished job
+  notify ms        - job finished_at -> the client holding the 'done' answer
+
+Then a /summarize burst: every request awaits its queued job, so threads should stay
+flat and a cheap endpoint (GET /) should keep answering while BART runs.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_long_poll [--jobs 4] [--intervals 1,3] [--burst 8] [--stub | --real]
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+from benchmarks.corpus import build_corpus
+from benchmarks.run import percentile
+from benchmarks.stub_model import add_model_args, select_model
+
+
+async def follow(client, job_id: str, interval: float) -> tuple[int, float]:
+    """Polls one job to completion. Returns (requests, seen_at)."""
+    requests = 0
+    while True:
+        params = {"wait": 60} if interval == 0 else None
+        body = (await client.get(f"/status/{job_id}", params=params)).json()
+        requests += 1
+        if body["status"] in ("done", "error"):
+            return requests, time.time()
+        if interval:
+            await asyncio.sleep(interval)
+
+
+async def main_async(args, app, texts: list[str]):
+    import httpx
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app.app), base_url="http://bench", timeout=600) as client:
+        strategies = [(f"poll {i:g} s", i) for i in args.intervals] + [("wait", 0)]
+        print(f"\n{'strategy':>10} | {'jobs':>4} | {'requests/summary':>16} | {'notify p50 ms':>13} | {'notify max ms':>13}")
+        print("-" * 70)
+        for n, (name, interval) in enumerate(strategies):
+            batch = texts[n * args.jobs:(n + 1) * args.jobs]
+            job_ids = [(await client.post("/submit", json={"text": t})).json()["job_id"] for t in batch]
+            results = await asyncio.gather(*(follow(client, job_id, interval) for job_id in job_ids))
+            delays = [(seen - app.JOBS.get(job_id)["finished_at"]) * 1000 for job_id, (_, seen) in zip(job_ids, results)]
+            requests = sum(r for r, _ in results)
+            print(f"{name:>10} | {len(job_ids):>4} | {requests / len(job_ids):>16.1f} | "
+                  f"{percentile(delays, 50):>13.0f} | {max(delays):>13.0f}", flush=True)
+
+        burst = texts[len(strategies) * args.jobs:][:args.burst]
+        threads = [threading.active_count()] * 2
+        health_ms = []
+
+        async def probe():
+            while True:
+                threads[1] = max(threads[1], threading.active_count())
+                t0 = time.perf_counter()
+                await client.get("/")
+                health_ms.append((time.perf_counter() - t0) * 1000)
+                await asyncio.sleep(0.1)
+
+        prober = asyncio.create_task(probe())
+        t0 = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/summarize", json={"text": t}) for t in burst))
+        wall = time.perf_counter() - t0
+        prober.cancel()
+        ok = sum(r.status_code == 200 for r in responses)
+        print(f"\n/summarize burst: {ok}/{len(burst)} ok in {wall:.1f} s | threads {threads[0]} -> peak {threads[1]} | "
+              f"GET / during burst: p50 {percentile(health_ms, 50):.1f} ms, max {max(health_ms):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=4, help="Articles per polling strategy")
+    parser.add_argument("--intervals", default="1,3", help="Short-poll intervals (seconds) to compare")
+    parser.add_argument("--burst", type=int, default=8, help="Concurrent /summarize requests")
+    add_model_args(parser)
+    args = parser.parse_args()
+    args.intervals = [float(i) for i in args.intervals.split(",") if i]
+
+    select_model(args.model)
+    os.environ.update(SUMMARY_CACHE_DIR="", SUMMARY_CACHE_MEMORY_BYTES="0", CHUNK_CACHE_BYTES="0", CLUSTER_REUSE="0")
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    texts = [d["text"] for d in build_corpus() if d["kind"] != "titles" and 200 < len(d["text"].split()) < 1500]
+    asyncio.run(main_async(args, app, texts))
+
+
+if __name__ == "__main__":
+    main()
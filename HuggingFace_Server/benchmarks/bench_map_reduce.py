@@ -0,0 +1,90 @@
+"""
+MAP-REDUCE BENCHMARK
+Synthetic 10k-50k token articles (benchmark corpus paragraphs, concatenated) through
+chunk_and_summarize(), bounded vs. unbounded:
+
+  bounded    - defaults: at most MAP_TOKEN_BUDGET article tokens are read (TextRank
+               keeps the most salient paragraphs) and partial summaries over the
+               mode's window are tree-reduced in REDUCE_GROUP_TOKENS groups
+  unbounded  - no token budget and no Smart-mode reduce: every chunk is generated and
+               every chunk summary returned (what the server did before)
+
+Per input: chunks mapped, reduce levels / calls, output tokens and wall time. With
+--deadline, one more bounded run per input gets that latency budget, so the map input
+is also cut to what the cost model says fits in time.
+The chunk cache is off so every run generates.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_map_reduce [--sizes 10000,20000,30000,50000] [--mode half]
+                                          [--deadline 30] [--no-unbounded] [--stub | --real]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.corpus import build_corpus
+from benchmarks.stub_model import add_model_args, select_model
+
+
+def synthetic_article(paragraphs: list[str], tokenizer, target_tokens: int) -> str:
+    out, tokens, i = [], 0, 0
+    while tokens < target_tokens:
+        paragraph = paragraphs[i % len(paragraphs)]
+        out.append(paragraph)
+        tokens += len(tokenizer(paragraph, add_special_tokens=False).input_ids)
+        i += 1
+    return "\n".join(out)
+
+
+def run(app, text: str, mode: str, deadline_s=None) -> tuple[dict, float, int]:
+    stats = {}
+    t0 = time.perf_counter()
+    deadline = time.time() + deadline_s if deadline_s else None
+    summary = app.chunk_and_summarize(text, mode, stats=stats, deadline=deadline)
+    seconds = time.perf_counter() - t0
+    return stats, seconds, len(app.tokenizer(summary).input_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,20000,30000,50000")
+    parser.add_argument("--mode", default="half", choices=["half", "short"])
+    parser.add_argument("--deadline", type=float, default=0, help="Latency budget (s) for an extra bounded run")
+    parser.add_argument("--no-unbounded", dest="unbounded", action="store_false")
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    select_model(args.model)
+    os.environ.update(SUMMARY_CACHE_DIR="", CHUNK_CACHE_BYTES="0", CLUSTER_REUSE="0")
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    paragraphs = [p.strip() for d in build_corpus() if d["kind"] != "titles" for p in d["text"].split("\n") if p.strip()]
+    bounded = {"MAP_TOKEN_BUDGET": app.MAP_TOKEN_BUDGET, "SMART_WINDOW_TOKENS": app.SMART_WINDOW_TOKENS}
+    unbounded = {"MAP_TOKEN_BUDGET": 10 ** 9, "SMART_WINDOW_TOKENS": 10 ** 9}
+
+    print(f"\nmode={args.mode} | MAP_TOKEN_BUDGET={app.MAP_TOKEN_BUDGET} | window="
+          f"{app.RECAP_WINDOW_TOKENS if args.mode == 'short' else app.SMART_WINDOW_TOKENS} tokens")
+    print(f"\n{'input tok':>9} | {'run':>10} | {'read tok':>8} | {'chunks':>6} | {'levels':>6} | {'reduces':>7} | "
+          f"{'out tok':>7} | {'predicted s':>11} | {'wall s':>7}")
+    print("-" * 96)
+    runs = [("bounded", bounded, None)]
+    if args.deadline:
+        runs.append((f"<= {args.deadline:g} s", bounded, args.deadline))
+    if args.unbounded:
+        runs.append(("unbounded", unbounded, None))
+    for size in [int(s) for s in args.sizes.split(",")]:
+        text = synthetic_article(paragraphs, app.tokenizer, size)
+        for name, config, deadline_s in runs:
+            for key, value in config.items():
+                setattr(app, key, value)
+            stats, seconds, out_tokens = run(app, text, args.mode, deadline_s)
+            print(f"{size:>9} | {name:>10} | {stats['total_tokens']:>8} | {stats['chunks']:>6} | "
+                  f"{stats['reduce_levels']:>6} | {stats['reduce_calls']:>7} | {out_tokens:>7} | "
+                  f"{stats['predicted_s']:>11.1f} | {seconds:>7.1f}", flush=True)
+        for key, value in bounded.items():
+            setattr(app, key, value)
+
+
+if __name__ == "__main__":
+    main()
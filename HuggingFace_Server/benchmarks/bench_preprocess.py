@@ -0,0 +1,86 @@
+"""
+PREPROCESSING MICROBENCHMARK
+Times the tokenizer work done before generate() for every long article built from
+news_cache/*.json: the legacy decode/re-encode pipeline vs. token-native build_chunks().
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_preprocess [--repeat 20] [--stub | --real]
+"""
+import argparse
+import time
+
+from benchmarks.corpus import load_feed_articles
+from benchmarks.stub_model import add_model_args, select_model
+
+
+def legacy_preprocess(text: str) -> int:
+    """The pre-token-native pipeline, minus generate(). Returns the chunk count."""
+    import app
+    tok = app.tokenizer
+    total_tokens = len(tok.encode(text))
+    processed_chunks, current, size = [], [], 0
+    for para in text.split("\n"):
+        para = para.strip()
+        if not para: continue
+        p_tokens = tok.encode(para, add_special_tokens=False)
+        if len(p_tokens) > app.TARGET_CHUNK_SIZE:
+            for i in range(0, len(p_tokens), app.TARGET_CHUNK_SIZE):
+                processed_chunks.append(tok.decode(p_tokens[i:i + app.TARGET_CHUNK_SIZE], skip_special_tokens=True))
+            continue
+        if size + len(p_tokens) > app.TARGET_CHUNK_SIZE:
+            chunk_text = tok.decode(current, skip_special_tokens=True)
+            if chunk_text: processed_chunks.append(chunk_text)
+            current, size = list(p_tokens), len(p_tokens)
+        else:
+            current.extend(p_tokens)
+            size += len(p_tokens)
+    if current:
+        processed_chunks.append(tok.decode(current, skip_special_tokens=True))
+
+    for chunk in processed_chunks:
+        len(tok.encode(chunk))                                          # c_len
+        tok(chunk.strip(), truncation=True, max_length=1024).input_ids  # summarize_text()
+    assert total_tokens >= 0
+    return len(processed_chunks)
+
+
+def token_native_preprocess(text: str) -> int:
+    import app
+    chunks, total_tokens = app.build_chunks(text)
+    [len(c) for c in chunks]  # c_len is free
+    assert total_tokens >= 0
+    return len(chunks)
+
+
+def time_it(fn, articles: list[str], repeat: int) -> float:
+    """Mean milliseconds per article."""
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for text in articles:
+            fn(text)
+    return (time.perf_counter() - t0) * 1000 / (repeat * len(articles))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    select_model(args.model)
+    import app  # Starts loading the tokenizer + model in the background
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    articles = load_feed_articles()
+    tokens = sum(app.build_chunks(a)[1] for a in articles)
+    print(f"\n{len(articles)} articles | {tokens} tokens | {args.repeat} rounds")
+
+    legacy_ms = time_it(legacy_preprocess, articles, args.repeat)
+    native_ms = time_it(token_native_preprocess, articles, args.repeat)
+    print(f"{'legacy (decode/re-encode)':<28} {legacy_ms:>8.3f} ms/article")
+    print(f"{'token-native':<28} {native_ms:>8.3f} ms/article")
+    print(f"{'speedup':<28} {legacy_ms / native_ms:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+INFERENCE PROCESS SCALING BENCHMARK
+Throughput of INFERENCE_PROCESSES = 0 (generate() in the API process, all cores on
+one call) vs. 1, 2 and 4 worker processes (cores split between them), with the same
+burst of concurrent articles going through chunk_and_summarize() and the batcher.
+
+Also reports memory across the API process + workers:
+  RSS sum - what N private copies of the weights would cost
+  PSS sum - what the machine actually pays (shared pages split between sharers)
+
+Each configuration runs in a fresh child process (the pool is set up at import).
+On a machine with fewer cores than workers the split has nothing to parallelize,
+so expect flat numbers there.
+
+First, a startup check: 2 workers x 2 torch threads (INFERENCE_THREADS=2) under a
+parent whose torch defaults to 4 threads, as on a multi-core host (set before
+'import app'; OMP_NUM_THREADS is capped to the core count). A fork after the parent
+ran multi-threaded torch hangs the workers, so the check fails if the pool isn't
+ready within --startup-timeout seconds.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_processes [--processes 0,1,2,4] [--jobs 16] [--start-method fork]
+                                         [--startup-timeout 120] [--stub | --real]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.corpus import load_feed_articles
+from benchmarks.stub_model import add_model_args, select_model
+
+
+def smaps_kb(pid: int) -> dict:
+    """Rss / Pss of one process in KB (Linux /proc/<pid>/smaps_rollup)."""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values
+
+
+def startup_child():
+    """Startup check: time to a ready pool, then one article through it. Prints a JSON row."""
+    import torch
+    torch.set_num_threads(4) # A multi-core host's default
+    t0 = time.perf_counter()
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    ready_s = time.perf_counter() - t0
+    app.chunk_and_summarize(load_feed_articles()[0], "half")
+    print(json.dumps({"startup": ready_s, "parent_threads": app.torch.get_num_threads(),
+                      "worker_threads": app.INFERENCE_POOL.threads}), flush=True)
+    app.INFERENCE_POOL.close()
+
+
+def startup_check(start_method: str, timeout: float) -> bool:
+    env = dict(os.environ, INFERENCE_PROCESSES="2", INFERENCE_THREADS="2",
+               INFERENCE_START_METHOD=start_method, SUMMARY_CACHE_DIR="", CHUNK_CACHE_BYTES="0", CLUSTER_REUSE="0")
+    try:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_processes", "--startup-child"],
+                             env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        print(f"startup check ({start_method}, 2 workers x 2 threads): FAILED, not ready after {timeout:.0f} s")
+        return False
+    rows = [json.loads(line) for line in out.stdout.splitlines() if line.startswith('{"startup"')]
+    if not rows:
+        print(f"startup check ({start_method}, 2 workers x 2 threads): FAILED {out.stderr.strip().splitlines()[-1:]}")
+        return False
+    row = rows[0]
+    print(f"startup check ({start_method}, 2 workers x {row['worker_threads']} threads, parent "
+          f"{row['parent_threads']} thread): ready in {row['startup']:.1f} s, one article summarized")
+    return True
+
+
+def child(processes: int, jobs: int, mode: str):
+    """One configuration: warm up, fire `jobs` articles at once, print a JSON row."""
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    articles = load_feed_articles()
+    burst = [articles[i % len(articles)] for i in range(jobs)]
+    chunks = sum(len(app.build_chunks(a)[0]) for a in burst)
+    app.chunk_and_summarize(articles[0], mode) # Warm every code path once
+
+    start = threading.Barrier(jobs + 1)
+    latencies = []
+
+    def worker(text):
+        start.wait()
+        t0 = time.perf_counter()
+        app.chunk_and_summarize(text, mode)
+        latencies.append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in burst]
+    for t in threads: t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+
+    pids = [os.getpid()]
+    if app.INFERENCE_POOL is not None:
+        pids += [w["pid"] for w in app.INFERENCE_POOL._workers if w is not None]
+    memory = [smaps_kb(pid) for pid in pids]
+    threads_each = app.INFERENCE_POOL.threads if app.INFERENCE_POOL is not None else app.torch.get_num_threads()
+    print(json.dumps({"processes": processes, "threads": threads_each, "wall": wall, "chunks": chunks,
+                      "p50": sorted(latencies)[len(latencies) // 2], "max": max(latencies),
+                      "rss_mb": sum(m.get("Rss", 0) for m in memory) / 1024,
+                      "pss_mb": sum(m.get("Pss", 0) for m in memory) / 1024}), flush=True)
+    if app.INFERENCE_POOL is not None:
+        app.INFERENCE_POOL.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", default="0,1,2,4")
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--mode", default="half", choices=["half", "short"])
+    parser.add_argument("--start-method", default="fork", choices=["fork", "spawn"])
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--startup-child", action="store_true", help=argparse.SUPPRESS)
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.jobs, args.mode)
+        return
+    if args.startup_child:
+        startup_child()
+        return
+
+    select_model(args.model)
+    print(f"\n{os.cpu_count()} cores | {args.jobs} articles at once | mode={args.mode} | start={args.start_method}")
+    if not startup_check(args.start_method, args.startup_timeout):
+        raise SystemExit(1)
+    print(f"\n{'procs':>5} | {'threads':>7} | {'wall s':>7} | {'chunks/s':>8} | {'speedup':>7} | {'p50 s':>6} | "
+          f"{'max s':>6} | {'RSS sum MB':>10} | {'PSS sum MB':>10}")
+    print("-" * 90)
+    baseline = None
+    for processes in [int(p) for p in args.processes.split(",")]:
+        env = dict(os.environ, INFERENCE_PROCESSES=str(processes), INFERENCE_START_METHOD=args.start_method,
+                   SUMMARY_CACHE_DIR="", CHUNK_CACHE_BYTES="0", CLUSTER_REUSE="0")
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_processes", "--child", str(processes),
+                              "--jobs", str(args.jobs), "--mode", args.mode],
+                             env=env, capture_output=True, text=True)
+        rows = [json.loads(line) for line in out.stdout.splitlines() if line.startswith('{"processes"')]
+        if not rows: # (exit status is unreliable: torch may abort on interpreter teardown)
+            print(f"{processes:>5} | failed: {out.stderr.strip().splitlines()[-1:] }")
+            continue
+        row = rows[0]
+        rate = row["chunks"] / row["wall"]
+        baseline = baseline or rate
+        print(f"{processes:>5} | {row['threads']:>7} | {row['wall']:>7.2f} | {rate:>8.2f} | {rate / baseline:>6.2f}x | "
+              f"{row['p50']:>6.2f} | {row['max']:>6.2f} | {row['rss_mb']:>10.0f} | {row['pss_mb']:>10.0f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
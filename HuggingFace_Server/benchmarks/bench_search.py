@@ -0,0 +1,203 @@
+"""
+SEARCH INDEX BENCHMARK
+Build, update and query time of search_index.SearchIndex on the real articles
+(news_cache/*.json + master_titles.txt) scaled up with seeded synthetic documents
+whose words are drawn from the real token stream (so term frequencies stay natural),
+and a mix of article-sized and summary-sized bodies.
+
+Checks along the way that:
+  - top-10 results match a brute-force BM25 over every live document
+  - after deleting/re-adding 10% of the docs, results equal a fresh build of the survivors
+  - deleted documents never come back
+  - after feed-refresh style re-adds (renumbering ordinals), results still equal a fresh build
+
+Then re-adds every document --refreshes times, as feed refreshes do (10% with new
+text each round), and reports ordinals and query time before and after.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_search [--sizes 1000,10000,100000] [--queries 2000] [--refreshes 10] [--seed 1234]
+"""
+import argparse
+import math
+import random
+import time
+from collections import Counter
+
+from benchmarks.corpus import load_feed_items, load_master_titles
+from benchmarks.run import peak_rss_mb, percentile
+from search_index import BM25_B, BM25_K1, TITLE_BOOST, SearchIndex, tokenize
+
+
+def real_docs() -> list[dict]:
+    docs = [{"title": it.get("title", ""), "body": it.get("desc", "")} for it in load_feed_items()]
+    docs += [{"title": row["title"], "body": ""} for row in load_master_titles()]
+    return docs
+
+
+def scaled_corpus(base: list[dict], size: int, rng: random.Random) -> list[dict]:
+    """The real docs, then synthetic ones: 8-14 word titles, 30-250 word bodies."""
+    stream = [w for d in base for w in (d["title"] + " " + d["body"]).split()]
+    docs = list(base[:size])
+    while len(docs) < size:
+        title = " ".join(rng.choice(stream) for _ in range(rng.randint(8, 14)))
+        body = " ".join(rng.choice(stream) for _ in range(rng.randint(30, 250)))
+        docs.append({"title": title, "body": body})
+    return docs
+
+
+def make_queries(base: list[dict], count: int, rng: random.Random) -> list[str]:
+    """1-3 words from real titles: what someone half-remembering a headline types."""
+    titles = [tokenize(d["title"]) for d in base]
+    titles = [t for t in titles if t]
+    queries = []
+    while len(queries) < count:
+        words = rng.choice(titles)
+        queries.append(" ".join(rng.sample(words, min(len(words), rng.randint(1, 3)))))
+    return queries
+
+
+def brute_force(docs: dict, query: str, limit: int) -> list[tuple[str, float]]:
+    """Textbook BM25 over every live document."""
+    bags = {doc_id: Counter(tokenize(d["title"]) * TITLE_BOOST + tokenize(d["body"])) for doc_id, d in docs.items()}
+    n = len(bags)
+    avg = sum(sum(b.values()) for b in bags.values()) / n
+    terms = list(dict.fromkeys(tokenize(query)))
+    df = {t: sum(1 for b in bags.values() if t in b) for t in terms}
+    scores = {}
+    for doc_id, bag in bags.items():
+        length = sum(bag.values())
+        score = 0.0
+        for t in terms:
+            tf = bag.get(t, 0)
+            if tf:
+                idf = math.log1p((n - df[t] + 0.5) / (df[t] + 0.5))
+                score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg))
+        if score > 0:
+            scores[doc_id] = score
+    return sorted(scores.items(), key=lambda kv: -kv[1])[:limit]
+
+
+def same_results(a: list[tuple[str, float]], b: list[tuple[str, float]]) -> bool:
+    """Same scores in the same order (ids may swap only between tied scores)."""
+    return len(a) == len(b) and all(abs(x[1] - y[1]) <= 1e-3 * max(1.0, y[1]) for x, y in zip(a, b))
+
+
+def check_correctness(base: list[dict], rng: random.Random, queries: list[str]):
+    docs = {f"d{i}": d for i, d in enumerate(scaled_corpus(base, 3000, rng))}
+    index = SearchIndex()
+    for doc_id, d in docs.items():
+        index.add(doc_id, d["title"], d["body"])
+    # Churn: delete 10%, re-add half of those with new text
+    deleted = rng.sample(sorted(docs), len(docs) // 10)
+    for doc_id in deleted:
+        index.delete(doc_id)
+        del docs[doc_id]
+    for doc_id in deleted[: len(deleted) // 2]:
+        docs[doc_id] = rng.choice(base)
+        index.add(doc_id, docs[doc_id]["title"], docs[doc_id]["body"])
+    gone = set(deleted[len(deleted) // 2:])
+    compare(index, docs, gone, queries[:200], "10% churn")
+
+    # Refreshes: every doc re-added, half of them with new text, until ordinals are renumbered
+    while not index.renumbers:
+        for n, doc_id in enumerate(sorted(docs)):
+            if n % 2:
+                docs[doc_id] = rng.choice(base)
+            index.add(doc_id, docs[doc_id]["title"], docs[doc_id]["body"])
+    compare(index, docs, gone, queries[:200], "re-adds")
+    print(f"index: {index.compactions} term compactions, {index.renumbers} renumbers, "
+          f"{index.unchanged} unchanged re-adds skipped")
+
+
+def compare(index: SearchIndex, docs: dict, gone: set, queries: list[str], label: str):
+    fresh = SearchIndex()
+    for doc_id, d in docs.items():
+        fresh.add(doc_id, d["title"], d["body"])
+    for q in queries:
+        got = [(doc_id, score) for doc_id, score, _ in index.search(q, 10)]
+        assert not gone & {doc_id for doc_id, _ in got}, f"deleted doc returned for {q!r}"
+        assert same_results(got, brute_force(docs, q, 10)), f"brute force mismatch for {q!r} after {label}"
+        assert same_results(got, [(d, s) for d, s, _ in fresh.search(q, 10)]), f"fresh build mismatch for {q!r} after {label}"
+    print(f"correctness: {len(queries)} queries match brute-force BM25 and a fresh build after {label}")
+
+
+def query_p50(index: SearchIndex, queries: list[str]) -> float:
+    query_ms = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, 10)
+        query_ms.append((time.perf_counter() - t0) * 1000)
+    return percentile(query_ms, 50)
+
+
+def check_refreshes(base: list[dict], size: int, rounds: int, rng: random.Random, queries: list[str]):
+    docs = scaled_corpus(base, size, rng)
+    index = SearchIndex()
+    for i, d in enumerate(docs):
+        index.add(f"d{i}", d["title"], d["body"], {"kind": "article"})
+    before = query_p50(index, queries)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        for i in rng.sample(range(size), size // 10):
+            docs[i] = rng.choice(base) # Edited upstream
+        for i, d in enumerate(docs):
+            index.add(f"d{i}", d["title"], d["body"], {"kind": "article"})
+    refresh_s = (time.perf_counter() - t0) / rounds
+    stats = index.snapshot()
+    print(f"\nrefreshes: {size} docs re-added {rounds}x | {refresh_s:.2f} s/refresh | ordinals {stats['ordinals']} | "
+          f"renumbers {stats['renumbers']} | query p50 {before:.2f} -> {query_p50(index, queries):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--refreshes", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    base = real_docs()
+    rng = random.Random(args.seed)
+    queries = make_queries(base, args.queries, random.Random(args.seed))
+    check_correctness(base, random.Random(args.seed), queries)
+
+    print(f"\n{'docs':>7} | {'build s':>7} | {'add p99 us':>10} | {'del p99 us':>10} | {'q p50 ms':>8} | "
+          f"{'q p95 ms':>8} | {'q p99 ms':>8} | {'postings MB':>11} | {'RSS MB':>7}")
+    print("-" * 98)
+    for size in [int(s) for s in args.sizes.split(",")]:
+        docs = scaled_corpus(base, size, rng)
+        index = SearchIndex()
+        add_us = []
+        t_build = time.perf_counter()
+        for i, d in enumerate(docs):
+            t0 = time.perf_counter()
+            index.add(f"d{i}", d["title"], d["body"], {"kind": "article"})
+            add_us.append((time.perf_counter() - t0) * 1e6)
+        build_s = time.perf_counter() - t_build
+
+        # Incremental churn at full size: delete 5% and add them back
+        del_us = []
+        churn = rng.sample(range(size), size // 20)
+        for i in churn:
+            t0 = time.perf_counter()
+            index.delete(f"d{i}")
+            del_us.append((time.perf_counter() - t0) * 1e6)
+        for i in churn:
+            index.add(f"d{i}", docs[i]["title"], docs[i]["body"], {"kind": "article"})
+
+        query_ms = []
+        for q in queries:
+            t0 = time.perf_counter()
+            index.search(q, 10)
+            query_ms.append((time.perf_counter() - t0) * 1000)
+
+        stats = index.snapshot()
+        print(f"{size:>7} | {build_s:>7.2f} | {percentile(add_us, 99):>10.0f} | {percentile(del_us, 99):>10.0f} | "
+              f"{percentile(query_ms, 50):>8.2f} | {percentile(query_ms, 95):>8.2f} | {percentile(query_ms, 99):>8.2f} | "
+              f"{stats['postings_bytes'] / 2 ** 20:>11.1f} | {peak_rss_mb():>7.0f}", flush=True)
+
+    check_refreshes(base, min(50000, max(int(s) for s in args.sizes.split(","))), args.refreshes, rng, queries)
+
+
+if __name__ == "__main__":
+    main()
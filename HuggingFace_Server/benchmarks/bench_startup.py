@@ -0,0 +1,98 @@
+"""
+COLD START BENCHMARK
+Boots the server in a fresh Uvicorn process and measures, from process launch:
+  - time-to-first-response: first 200 from "/" (cheap endpoint, model may still be loading)
+  - time-to-ready:          "/ready" flips to 200
+  - time-to-first-summary:  a job submitted right after the first response reaches "done"
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_startup [--runs 3] [--port 7870] [--stub | --real]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.corpus import load_feed_articles
+from benchmarks.stub_model import add_model_args, select_model
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def request(url: str, payload: dict = None):
+    """Returns (status, json body) or (None, None) while the port is still closed."""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, None
+
+
+def one_run(port: int, text: str, timeout: float) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, SUMMARY_CACHE_DIR="", CLUSTER_REUSE="0") # Memory-only cache: a disk hit would skip the model
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    marks = {}
+    try:
+        job_id = None
+        while time.perf_counter() - t0 < timeout:
+            if "first_response" not in marks:
+                status, _ = request(f"{base}/")
+                if status == 200:
+                    marks["first_response"] = time.perf_counter() - t0
+                    _, body = request(f"{base}/submit", {"text": text, "priority": "interactive"})
+                    job_id = body["job_id"]
+            else:
+                if "ready" not in marks and request(f"{base}/ready")[0] == 200:
+                    marks["ready"] = time.perf_counter() - t0
+                _, body = request(f"{base}/status/{job_id}")
+                if body and body.get("status") == "done":
+                    marks["first_summary"] = time.perf_counter() - t0
+                    marks.setdefault("ready", marks["first_summary"])
+                    return marks
+                if body and body.get("status") == "error":
+                    raise RuntimeError(body.get("output"))
+            time.sleep(0.02)
+        raise TimeoutError(f"Server did not finish within {timeout}s: {marks}")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=7870)
+    parser.add_argument("--timeout", type=float, default=600)
+    add_model_args(parser)
+    args = parser.parse_args()
+    select_model(args.model) # The server process inherits SUMMARIZER_MODEL
+
+    text = load_feed_articles()[0]
+    runs = []
+    for i in range(args.runs):
+        marks = one_run(args.port, text, args.timeout)
+        runs.append(marks)
+        print(f"run {i + 1}: first response {marks['first_response']:.2f}s | ready {marks['ready']:.2f}s | "
+              f"first summary {marks['first_summary']:.2f}s", flush=True)
+
+    print("\nmedian over runs:")
+    for key, label in (("first_response", "time-to-first-response"), ("ready", "time-to-ready"),
+                       ("first_summary", "time-to-first-summary")):
+        print(f"  {label:<24} {statistics.median(r[key] for r in runs):>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
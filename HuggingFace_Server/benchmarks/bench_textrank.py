@@ -0,0 +1,72 @@
+"""
+TEXTRANK BENCHMARK
+What the TextRank stage (textrank.py) buys on the benchmark corpus:
+  - prefilter: chunks (= generate() inputs) per long article with TEXTRANK_PREFILTER
+    off vs. on, the Smart-mode wall time of both, and ROUGE of the filtered summary
+    against the unfiltered one (how much of the full-article summary survives)
+  - extractive: mode="extractive" latency on every document (no generate() at all)
+
+ROUGE against the stub model's output is noise; pass --real for a meaningful number.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.bench_textrank [--limit 6] [--stub | --real]
+"""
+import argparse
+import os
+import time
+
+from benchmarks.corpus import build_corpus
+from benchmarks.rouge import rouge_scores
+from benchmarks.run import percentile
+from benchmarks.stub_model import add_model_args, select_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=6, help="Long articles summarized both ways")
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    select_model(args.model)
+    os.environ["CLUSTER_REUSE"] = "0"
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    docs = build_corpus()
+
+    extract_ms = []
+    for doc in docs:
+        t0 = time.perf_counter()
+        app.chunk_and_summarize(doc["text"], "extractive")
+        extract_ms.append((time.perf_counter() - t0) * 1000)
+    print(f"\nextractive: {len(docs)} docs | p50 {percentile(extract_ms, 50):.1f} ms | "
+          f"p99 {percentile(extract_ms, 99):.1f} ms | max {max(extract_ms):.1f} ms")
+
+    long_docs = [d for d in docs if len(d["text"].split()) > app.TEXTRANK_MIN_WORDS][:args.limit]
+    print(f"\nprefilter (keep {app.TEXTRANK_KEEP_RATIO:.0%} of tokens above {app.TEXTRANK_MIN_WORDS} words)")
+    print(f"\n{'doc':>12} | {'words':>6} | {'chunks':>6} | {'kept':>4} | {'off s':>6} | {'on s':>6} | "
+          f"{'rank ms':>7} | {'ROUGE-1':>7} | {'ROUGE-L':>7}")
+    print("-" * 86)
+    totals = {"off": 0, "on": 0, "off_s": 0.0, "on_s": 0.0}
+    for doc in long_docs:
+        runs = {}
+        for flag in ("off", "on"):
+            app.TEXTRANK_PREFILTER = flag == "on"
+            stats = {}
+            t0 = time.perf_counter()
+            summary = app.chunk_and_summarize(doc["text"], "half", stats=stats)
+            runs[flag] = (summary, stats, time.perf_counter() - t0)
+            totals[flag] += stats["chunks"]
+            totals[flag + "_s"] += runs[flag][2]
+        scores = rouge_scores(runs["on"][0], runs["off"][0])
+        print(f"{doc['id']:>12} | {len(doc['text'].split()):>6} | {runs['off'][1]['chunks']:>6} | "
+              f"{runs['on'][1]['chunks']:>4} | {runs['off'][2]:>6.2f} | {runs['on'][2]:>6.2f} | "
+              f"{runs['on'][1].get('textrank_s', 0) * 1000:>7.1f} | {scores['rouge1']:>7.3f} | {scores['rougeL']:>7.3f}",
+              flush=True)
+    if long_docs:
+        print(f"\ngenerate() inputs: {totals['off']} -> {totals['on']} ({1 - totals['on'] / totals['off']:.0%} fewer) | "
+              f"wall: {totals['off_s']:.1f} s -> {totals['on_s']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
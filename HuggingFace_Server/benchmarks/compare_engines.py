@@ -0,0 +1,110 @@
+"""
+INFERENCE ENGINE COMPARISON
+Runs a fixed article set through every engine (each in a fresh process so memory
+numbers are not polluted) and reports latency, peak RSS and ROUGE drift against
+the fp32 eager baseline.
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.compare_engines [--engines eager,int8,onnx,compile] [--articles 6] [--stub | --real]
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import load_feed_articles
+from benchmarks.rouge import rouge_scores
+from benchmarks.stub_model import add_model_args, select_model
+
+RESULT_MARKER = "@@ENGINE_RESULT@@"
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # Linux reports KB
+
+
+def run_worker(n_articles: int, mode: str):
+    """Child process: INFERENCE_ENGINE is already set in the environment."""
+    t0 = time.perf_counter()
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+    load_s = time.perf_counter() - t0
+    load_rss = peak_rss_mb()
+
+    articles = load_feed_articles()[:n_articles]
+    app.chunk_and_summarize(articles[0], mode) # Warm-up (compile / ORT session init)
+    outputs, latencies = [], []
+    for text in articles:
+        t0 = time.perf_counter()
+        outputs.append(app.chunk_and_summarize(text, mode)) # No summary cache here; chunk cache off (see run_engine)
+        latencies.append(time.perf_counter() - t0)
+
+    print(RESULT_MARKER + json.dumps({
+        "load_s": load_s,
+        "load_rss_mb": load_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "latencies": latencies,
+        "outputs": outputs,
+    }), flush=True)
+
+
+def run_engine(engine: str, n_articles: int, mode: str):
+    env = dict(os.environ, INFERENCE_ENGINE=engine, CHUNK_CACHE_BYTES="0", CLUSTER_REUSE="0")
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.compare_engines", "--worker", "--articles", str(n_articles), "--mode", mode],
+        env=env, capture_output=True, text=True)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["no output"]
+    print(f"  [{engine}] FAILED: {tail[0]}", flush=True)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default="eager,int8,onnx,compile")
+    parser.add_argument("--articles", type=int, default=6)
+    parser.add_argument("--mode", default="half", choices=["half", "short"])
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.articles, args.mode)
+        return
+    select_model(args.model) # Children inherit SUMMARIZER_MODEL
+
+    engines = args.engines.split(",")
+    if "eager" not in engines:
+        engines.insert(0, "eager") # Drift needs the fp32 reference
+
+    results = {}
+    for engine in engines:
+        print(f"Running {engine}...", flush=True)
+        results[engine] = run_engine(engine, args.articles, args.mode)
+
+    baseline = results.get("eager")
+    print(f"\n{'engine':<8} | {'load s':>6} | {'p50 s':>6} | {'mean s':>6} | {'RSS MB':>7} | {'R-1':>5} | {'R-2':>5} | {'R-L':>5}")
+    print("-" * 70)
+    for engine, res in results.items():
+        if res is None:
+            print(f"{engine:<8} | unavailable")
+            continue
+        drift = {"rouge1": 1.0, "rouge2": 1.0, "rougeL": 1.0}
+        if baseline and engine != "eager":
+            scores = [rouge_scores(out, ref) for out, ref in zip(res["outputs"], baseline["outputs"])]
+            drift = {k: statistics.mean(s[k] for s in scores) for k in drift}
+        print(f"{engine:<8} | {res['load_s']:>6.1f} | {statistics.median(res['latencies']):>6.2f} | "
+              f"{statistics.mean(res['latencies']):>6.2f} | {res['peak_rss_mb']:>7.0f} | "
+              f"{drift['rouge1']:>5.3f} | {drift['rouge2']:>5.3f} | {drift['rougeL']:>5.3f}")
+    print("\nROUGE columns are F1 against the eager fp32 output (1.000 = identical).")
+
+
+if __name__ == "__main__":
+    main()
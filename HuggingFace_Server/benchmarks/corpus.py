@@ -0,0 +1,86 @@
+import glob
+import hashlib
+import json
+import os
+import random
+
+# ==========================================
+# 📰 BENCHMARK CORPUS
+# ==========================================
+# Built only from files in the repo (news_cache/*.json, master_titles.txt) plus seeded
+# synthetic bodies, so the same seed always yields the same corpus on any machine.
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+NEWS_CACHE = os.path.join(REPO_ROOT, "news_cache")
+MASTER_TITLES = os.path.join(REPO_ROOT, "master_titles.txt")
+
+def load_feed_items() -> list[dict]:
+    """Every cached feed item ({title, link, date, desc, source}), in stable file order."""
+    items = []
+    for path in sorted(glob.glob(os.path.join(NEWS_CACHE, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            items.extend(json.load(f))
+    return items
+
+def load_feed_articles(min_paragraphs: int = 5) -> list[str]:
+    """
+    One long article per cached feed: every item becomes a "Title. Description" paragraph.
+    Feed items are short teasers, so stitching a whole feed gives realistic multi-chunk inputs.
+    """
+    articles = []
+    for path in sorted(glob.glob(os.path.join(NEWS_CACHE, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)
+        paragraphs = [f"{it.get('title', '')}. {it.get('desc', '')}".strip() for it in items if it.get("desc")]
+        if len(paragraphs) >= min_paragraphs:
+            articles.append("\n".join(paragraphs))
+    return articles
+
+def load_master_titles() -> list[dict]:
+    """Rows of master_titles.txt (SOURCE|TITLE|LINK|DATE) as dicts."""
+    rows = []
+    with open(MASTER_TITLES, encoding="utf-8") as f:
+        next(f, None) # Header
+        for line in f:
+            parts = line.rstrip("\n").split("|")
+            if len(parts) >= 4 and parts[1]:
+                rows.append({"source": parts[0], "title": parts[1], "link": parts[2], "date": parts[3]})
+    return rows
+
+def synthetic_long_body(rng: random.Random, target_words: int, sentences: list[str]) -> str:
+    """Paragraphs of 3-7 sampled sentences until target_words is reached."""
+    paragraphs, words = [], 0
+    while words < target_words:
+        para = " ".join(rng.choice(sentences) for _ in range(rng.randint(3, 7)))
+        paragraphs.append(para)
+        words += len(para.split())
+    return "\n".join(paragraphs)
+
+def build_corpus(seed: int = 1234, synthetic: int = 8, synthetic_words: tuple[int, int] = (1500, 6000)) -> list[dict]:
+    """
+    Reproducible corpus of {id, kind, text}:
+      feed      - one stitched article per cached feed
+      titles    - master_titles.txt rows grouped into 40-headline bulletins
+      synthetic - long bodies sampled from every title/description sentence
+    """
+    docs = [{"id": f"feed-{i}", "kind": "feed", "text": text} for i, text in enumerate(load_feed_articles())]
+
+    titles = [row["title"].strip() for row in load_master_titles()]
+    for i in range(0, len(titles) - 39, 40):
+        docs.append({"id": f"titles-{i // 40}", "kind": "titles", "text": "\n".join(t + "." for t in titles[i:i + 40])})
+
+    sentences = [t + "." for t in titles]
+    sentences += [it["desc"].strip() for it in load_feed_items() if it.get("desc")]
+    rng = random.Random(seed)
+    for i in range(synthetic):
+        target = rng.randint(*synthetic_words)
+        docs.append({"id": f"synthetic-{i}", "kind": "synthetic", "text": synthetic_long_body(rng, target, sentences)})
+    return docs
+
+def corpus_fingerprint(docs: list[dict]) -> str:
+    """Short hash so benchmark reports can prove two runs used the same inputs."""
+    h = hashlib.sha256()
+    for doc in docs:
+        h.update(doc["id"].encode())
+        h.update(doc["text"].encode())
+    return h.hexdigest()[:12]
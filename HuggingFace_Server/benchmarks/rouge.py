@@ -0,0 +1,39 @@
+import re
+from collections import Counter
+
+# ==========================================
+# 📏 ROUGE (dependency-free, F1 only)
+# ==========================================
+def _tokens(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def _f1(overlap: int, cand_total: int, ref_total: int) -> float:
+    if not overlap or not cand_total or not ref_total:
+        return 0.0
+    precision, recall = overlap / cand_total, overlap / ref_total
+    return 2 * precision * recall / (precision + recall)
+
+def rouge_n(candidate: str, reference: str, n: int) -> float:
+    def grams(toks):
+        return Counter(tuple(toks[i:i + n]) for i in range(len(toks) - n + 1))
+    cand, ref = grams(_tokens(candidate)), grams(_tokens(reference))
+    return _f1(sum((cand & ref).values()), sum(cand.values()), sum(ref.values()))
+
+def rouge_l(candidate: str, reference: str) -> float:
+    cand, ref = _tokens(candidate), _tokens(reference)
+    if not cand or not ref:
+        return 0.0
+    prev = [0] * (len(ref) + 1)
+    for c in cand:
+        row = [0]
+        for j, r in enumerate(ref):
+            row.append(prev[j] + 1 if c == r else max(prev[j + 1], row[j]))
+        prev = row
+    return _f1(prev[-1], len(cand), len(ref))
+
+def rouge_scores(candidate: str, reference: str) -> dict[str, float]:
+    return {
+        "rouge1": rouge_n(candidate, reference, 1),
+        "rouge2": rouge_n(candidate, reference, 2),
+        "rougeL": rouge_l(candidate, reference),
+    }
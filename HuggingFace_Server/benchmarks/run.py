@@ -0,0 +1,151 @@
+"""
+OFFLINE BENCHMARK SUITE
+Drives the summarizer with a reproducible corpus (news_cache + master_titles.txt +
+seeded synthetic long bodies) and reports p50/p95/p99 latency, tokens/s and peak RSS.
+
+Targets:
+  pipeline - chunk_and_summarize() called directly from N threads
+  http     - the real client flow (POST /submit, poll /status) against an in-process Uvicorn
+
+Usage (from HuggingFace_Server/):
+    python -m benchmarks.run                                  # stub model, both targets
+    python -m benchmarks.run --target http --concurrency 1,8 --requests 32
+    python -m benchmarks.run --real                           # cached bart-large-cnn weights
+    python -m benchmarks.run --latency-budget 20              # deadline-aware tiers (see GEN_TIERS)
+"""
+import argparse
+import json
+import os
+import resource
+import socket
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import build_corpus, corpus_fingerprint
+from benchmarks.stub_model import add_model_args, select_model
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # Linux reports KB
+
+
+def report(label: str, concurrency: int, latencies: list[float], tokens: int, wall: float) -> dict:
+    row = {
+        "target": label, "concurrency": concurrency, "requests": len(latencies),
+        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "p99": percentile(latencies, 99),
+        "tokens_per_s": tokens / wall, "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"{label:<8} | {concurrency:>4} | {len(latencies):>4} | {row['p50']:>7.2f} | {row['p95']:>7.2f} | "
+          f"{row['p99']:>7.2f} | {row['tokens_per_s']:>9.0f} | {row['peak_rss_mb']:>7.0f}", flush=True)
+    return row
+
+
+def drive(fn, docs: list[dict], concurrency: int, n_requests: int) -> tuple[list[float], float]:
+    """Runs fn(doc) n_requests times over the corpus with `concurrency` in flight."""
+    work = [docs[i % len(docs)] for i in range(n_requests)]
+
+    def timed(doc):
+        t0 = time.perf_counter()
+        fn(doc)
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, work))
+    return latencies, time.perf_counter() - t0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app_module):
+    import uvicorn
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server
+
+
+def http_json(url: str, payload: dict = None) -> dict:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=600) as resp:
+        return json.loads(resp.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="pipeline,http")
+    parser.add_argument("--concurrency", default="1,4")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per concurrency level")
+    parser.add_argument("--mode", default="half", choices=["half", "short"])
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--synthetic", type=int, default=8, help="Synthetic long bodies in the corpus")
+    parser.add_argument("--latency-budget", type=float, help="Per-request latency_budget_s (default: none, always full tier)")
+    parser.add_argument("--json", help="Also write the result rows to this file")
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    # Environment must be settled before the server module reads it
+    model_path = select_model(args.model)
+    os.environ["SUMMARY_CACHE_DIR"] = ""            # No disk tier...
+    os.environ["SUMMARY_CACHE_MEMORY_BYTES"] = "0"  # ...no memory tier...
+    os.environ["CHUNK_CACHE_BYTES"] = "0"           # ...no per-chunk cache...
+    os.environ["CLUSTER_REUSE"] = "0"               # ...and no story sharing: every request runs the model
+    import app
+    if not app.wait_until_ready():
+        raise SystemExit(f"Model failed to load: {app.MODEL_STATE['error']}")
+
+    docs = build_corpus(args.seed, args.synthetic)
+    doc_tokens = {doc["id"]: app.build_chunks(doc["text"])[1] for doc in docs}
+    print(f"\nmodel: {model_path} | corpus: {len(docs)} docs, {sum(doc_tokens.values())} tokens, "
+          f"fingerprint {corpus_fingerprint(docs)}")
+    print(f"\n{'target':<8} | {'conc':>4} | {'reqs':>4} | {'p50 s':>7} | {'p95 s':>7} | {'p99 s':>7} | {'tokens/s':>9} | {'RSS MB':>7}")
+    print("-" * 80)
+
+    base_url = None
+    rows = []
+    for target in args.target.split(","):
+        if target == "pipeline":
+            def fn(doc):
+                deadline = time.time() + args.latency_budget if args.latency_budget is not None else None
+                app.chunk_and_summarize(doc["text"], args.mode, deadline=deadline)
+        elif target == "http":
+            if base_url is None:
+                base_url, _ = start_server(app)
+
+            def fn(doc):
+                job = http_json(f"{base_url}/submit", {"text": doc["text"], "mode": args.mode, "title": doc["id"],
+                                                       "latency_budget_s": args.latency_budget})
+                while job["status"] not in ("done", "error"):
+                    time.sleep(0.05)
+                    job = http_json(f"{base_url}/status/{job['job_id']}")
+        else:
+            raise SystemExit(f"Unknown target: {target}")
+
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            work_tokens = sum(doc_tokens[docs[i % len(docs)]["id"]] for i in range(args.requests))
+            latencies, wall = drive(fn, docs, concurrency, args.requests)
+            rows.append(report(target, concurrency, latencies, work_tokens, wall))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model": model_path, "corpus": corpus_fingerprint(docs), "rows": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
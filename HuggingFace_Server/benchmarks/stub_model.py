@@ -0,0 +1,119 @@
+import os
+import tempfile
+
+# ==========================================
+# 🧪 STUB MODEL (Offline Benchmarks / CI)
+# ==========================================
+# A randomly initialised, BART-shaped model with a byte-level BPE tokenizer trained on
+# the repo corpus. Output text is gibberish, but the code path (tokenize -> bucket ->
+# batched beam search -> decode) is identical to bart-large-cnn, just ~10^4x cheaper.
+
+STUB_VERSION = "v2"
+REAL_MODEL = "facebook/bart-large-cnn"
+
+def stub_dir() -> str:
+    return os.path.join(tempfile.gettempdir(), f"news_reader_stub_bart_{STUB_VERSION}")
+
+def build_stub_model(path: str = None, vocab_size: int = 4000, d_model: int = 64, layers: int = 2) -> str:
+    """Builds (once) and returns a local model directory loadable with from_pretrained()."""
+    import torch
+    from tokenizers import ByteLevelBPETokenizer
+    from tokenizers.processors import RobertaProcessing
+    from transformers import BartConfig, BartForConditionalGeneration, PreTrainedTokenizerFast
+
+    from benchmarks.corpus import load_feed_items, load_master_titles
+
+    path = path or stub_dir()
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+    os.makedirs(path, exist_ok=True)
+
+    texts = [f"{it.get('title', '')} {it.get('desc', '')}" for it in load_feed_items()]
+    texts += [row["title"] for row in load_master_titles()]
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(texts, vocab_size=vocab_size, special_tokens=["<s>", "<pad>", "</s>", "<unk>", "<mask>"])
+    bpe.post_processor = RobertaProcessing(("</s>", 2), ("<s>", 0)) # <s> text </s>, like BART
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=bpe._tokenizer, bos_token="<s>", eos_token="</s>",
+        pad_token="<pad>", unk_token="<unk>", mask_token="<mask>")
+    tokenizer.save_pretrained(path)
+
+    config = BartConfig(
+        vocab_size=len(tokenizer), d_model=d_model,
+        encoder_layers=layers, decoder_layers=layers,
+        encoder_attention_heads=2, decoder_attention_heads=2,
+        encoder_ffn_dim=d_model * 2, decoder_ffn_dim=d_model * 2,
+        max_position_embeddings=1024,
+        pad_token_id=1, bos_token_id=0, eos_token_id=2,
+        decoder_start_token_id=2, forced_bos_token_id=0)
+    torch.manual_seed(0) # Same weights every build
+    BartForConditionalGeneration(config).save_pretrained(path)
+    return path
+
+def build_stub_assisted_pair(layers: int = 12, draft_layers: int = 2, d_model: int = 384) -> tuple[str, str]:
+    """
+    (main, draft) model directories sharing the stub tokenizer, for assisted-generation
+    benchmarks. The draft is the main model's first `draft_layers` decoder layers; the
+    main model's later layers are scaled down to near-identity, so the two mostly agree
+    (as a distilled draft does) while the main model pays for every layer.
+    """
+    import torch
+    from transformers import AutoTokenizer, BartConfig, BartForConditionalGeneration
+
+    root = os.path.join(tempfile.gettempdir(), f"news_reader_stub_assisted_{STUB_VERSION}")
+    main_dir, draft_dir = os.path.join(root, "main"), os.path.join(root, "draft")
+    if os.path.exists(os.path.join(draft_dir, "config.json")):
+        return main_dir, draft_dir
+    tokenizer = AutoTokenizer.from_pretrained(build_stub_model())
+
+    config = BartConfig(
+        vocab_size=len(tokenizer), d_model=d_model,
+        encoder_layers=2, decoder_layers=layers,
+        encoder_attention_heads=4, decoder_attention_heads=4,
+        encoder_ffn_dim=d_model * 4, decoder_ffn_dim=d_model * 4,
+        max_position_embeddings=1024,
+        pad_token_id=1, bos_token_id=0, eos_token_id=2,
+        decoder_start_token_id=2, forced_bos_token_id=0)
+    torch.manual_seed(0)
+    main = BartForConditionalGeneration(config)
+    with torch.no_grad():
+        for layer in main.model.decoder.layers[draft_layers:]:
+            for proj in (layer.self_attn.out_proj, layer.encoder_attn.out_proj, layer.fc2):
+                proj.weight.mul_(0.01)
+                proj.bias.zero_()
+    main.generation_config.min_length = 56 # As bart-large-cnn: assisted calls must override it
+    main.save_pretrained(main_dir)
+    tokenizer.save_pretrained(main_dir)
+
+    draft = BartForConditionalGeneration.from_pretrained(main_dir)
+    draft.model.decoder.layers = draft.model.decoder.layers[:draft_layers]
+    draft.config.decoder_layers = draft_layers
+    draft.save_pretrained(draft_dir)
+    tokenizer.save_pretrained(draft_dir)
+    return main_dir, draft_dir
+
+def real_model_cached(model_name: str = REAL_MODEL) -> bool:
+    try:
+        from huggingface_hub import try_to_load_from_cache
+    except ImportError:
+        return False
+    return isinstance(try_to_load_from_cache(model_name, "config.json"), str)
+
+def add_model_args(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--stub", dest="model", action="store_const", const="stub",
+                       help="Tiny local random model (default; offline)")
+    group.add_argument("--real", dest="model", action="store_const", const="real",
+                       help=f"Real {REAL_MODEL} weights from the local HF cache (no download)")
+    parser.set_defaults(model="stub")
+
+def select_model(choice: str) -> str:
+    """Points SUMMARIZER_MODEL at the chosen weights. Must run BEFORE 'import app'."""
+    if choice == "real":
+        if not real_model_cached():
+            raise SystemExit(f"--real needs {REAL_MODEL} in the local Hugging Face cache (run the server once first)")
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["SUMMARIZER_MODEL"] = REAL_MODEL
+    else:
+        os.environ["SUMMARIZER_MODEL"] = build_stub_model()
+    return os.environ["SUMMARIZER_MODEL"]
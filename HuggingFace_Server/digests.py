@@ -0,0 +1,199 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# ==========================================
+# 🎧 DIGEST OBJECTS (Paged / Resumable Briefings)
+# ==========================================
+# A digest is addressed by its ordered job-ID list, so asking for the same selection
+# again (replay, resume on another device) returns the same object instead of a
+# rebuild. Segment status is updated as the selected jobs finish; segment text is
+# read from the job store only for the page being served, so a huge selection is
+# never materialized as one string unless the legacy full script is asked for.
+
+BRIEFING_INTRO = "Here is your Audio Briefing. "
+BRIEFING_OUTRO = "\n\nThat concludes your briefing."
+BRIEFING_EMPTY = "No processed summaries found."
+SETTLED = ("done", "error", "deleted")  # Nothing more will happen to these segments
+FETCH_PAGE = 500                         # Job IDs per store round trip (keeps SQLite IN lists short)
+
+def digest_id_for(job_ids: list[str]) -> str:
+    return hashlib.sha256("\x00".join(job_ids).encode("utf-8")).hexdigest()[:24]
+
+def segment_lead(first: bool, source: str, title: str) -> str:
+    """Spoken transition before each summary (same wording as the original /digest)."""
+    if first:
+        return f"Starting with {source}: {title}. \n"
+    return f"\n\nNext up, from {source}: {title}. \n"
+
+def fetch_jobs(get_many: Callable[[list[str]], dict], job_ids: list[str]) -> dict:
+    """get_many() in pages of FETCH_PAGE."""
+    unique = list(dict.fromkeys(job_ids))
+    jobs = {}
+    for i in range(0, len(unique), FETCH_PAGE):
+        jobs.update(get_many(unique[i:i + FETCH_PAGE]))
+    return jobs
+
+def render_briefing(job_ids: list[str], jobs: dict) -> str:
+    """The full legacy script: finished jobs only, in the given order."""
+    parts = [BRIEFING_INTRO]
+    count = 0
+    for job_id in job_ids:
+        job = jobs.get(job_id)
+        if job and job["status"] == "done":
+            parts.append(segment_lead(count == 0, job.get("source", "Unknown Source"), job.get("title", "Untitled")))
+            parts.append(job["output"])
+            count += 1
+    if count == 0:
+        return BRIEFING_EMPTY
+    parts.append(BRIEFING_OUTRO)
+    return "".join(parts)
+
+class Digest:
+    """One briefing: the ordered job IDs plus the status of each segment."""
+
+    def __init__(self, digest_id: str, job_ids: list[str]):
+        self.id = digest_id
+        self.job_ids = tuple(job_ids)
+        self.statuses = ["pending"] * len(job_ids)
+        self.pending = len(job_ids)
+        self.first_live = 0 # First segment that is (or will be) played: gets "Starting with"
+        self.created_at = time.time()
+        self.finished_at = None if job_ids else self.created_at
+        self.script = None  # Legacy full text, kept once every segment is settled
+        self.version = 0    # Bumped on every segment change (guards the script cache)
+
+    def set_status(self, index: int, status: str) -> bool:
+        """Caller holds the store lock. True if the segment changed."""
+        old = self.statuses[index]
+        if old == status or old == "deleted" or (old in SETTLED and status != "deleted"):
+            return False # Finished items only change by being deleted
+        self.statuses[index] = status
+        self.version += 1
+        if old not in SETTLED and status in SETTLED:
+            self.pending -= 1
+            if self.pending == 0:
+                self.finished_at = time.time()
+        if old == "done":
+            self.script = None # Deleted after the script was built
+        while self.first_live < len(self.statuses) and self.statuses[self.first_live] in ("error", "deleted"):
+            self.first_live += 1
+        return True
+
+    def describe(self) -> dict:
+        ready = sum(1 for s in self.statuses if s == "done")
+        return {
+            "digest_id": self.id,
+            "status": "ready" if self.pending == 0 else "building",
+            "segments_total": len(self.job_ids),
+            "segments_ready": ready,
+            "segments_pending": self.pending,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+class DigestStore:
+    """
+    LRU of Digest objects keyed by digest_id, plus a job_id -> digest index so a
+    finishing job updates every digest that selected it.
+    """
+
+    def __init__(self, get_many: Callable[[list[str]], dict], max_digests: int = 200):
+        self.get_many = get_many
+        self.max_digests = max_digests
+        self._digests = OrderedDict()
+        self._by_job = {} # job_id -> {digest_id: [segment indexes]} (kept until deleted: a delete changes the script)
+        self._lock = threading.Lock()
+
+    def get(self, digest_id: str) -> Optional[Digest]:
+        with self._lock:
+            digest = self._digests.get(digest_id)
+            if digest is not None:
+                self._digests.move_to_end(digest_id)
+            return digest
+
+    def get_or_create(self, job_ids: list[str]) -> Digest:
+        digest_id = digest_id_for(job_ids)
+        with self._lock:
+            digest = self._digests.get(digest_id)
+            if digest is not None:
+                self._digests.move_to_end(digest_id)
+                return digest
+            # Indexed before the status read below, so a job finishing in between still lands
+            digest = Digest(digest_id, job_ids)
+            self._digests[digest_id] = digest
+            for i, job_id in enumerate(job_ids):
+                self._by_job.setdefault(job_id, {}).setdefault(digest_id, []).append(i)
+            while len(self._digests) > self.max_digests:
+                self._drop(*self._digests.popitem(last=False))
+
+        jobs = fetch_jobs(self.get_many, job_ids)
+        with self._lock:
+            for i, job_id in enumerate(job_ids):
+                job = jobs.get(job_id)
+                digest.set_status(i, job["status"] if job else "deleted")
+        return digest
+
+    def _drop(self, digest_id: str, digest: Digest):
+        """Caller holds the lock."""
+        for job_id in set(digest.job_ids):
+            refs = self._by_job.get(job_id)
+            if refs is not None:
+                refs.pop(digest_id, None)
+                if not refs: del self._by_job[job_id]
+
+    def watches(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._by_job
+
+    def job_settled(self, job_id: str, status: str):
+        """A selected job reached done/error or was deleted."""
+        with self._lock:
+            refs = self._by_job.pop(job_id, {}) if status == "deleted" else self._by_job.get(job_id, {})
+            for digest_id, indexes in refs.items():
+                digest = self._digests.get(digest_id)
+                if digest is None: continue
+                for i in indexes:
+                    digest.set_status(i, status)
+
+    def segments(self, digest: Digest, offset: int, limit: int) -> list[dict]:
+        """One page of segments. Only this page's jobs are read from the store."""
+        offset = max(0, offset)
+        ids = digest.job_ids[offset:offset + max(0, limit)]
+        jobs = fetch_jobs(self.get_many, list(ids))
+        page = []
+        with self._lock:
+            for n, job_id in enumerate(ids):
+                i = offset + n
+                job = jobs.get(job_id)
+                digest.set_status(i, job["status"] if job else "deleted") # Self-heals a missed notification
+                page.append((i, job_id, digest.statuses[i], job, i == digest.first_live))
+        result = []
+        for i, job_id, status, job, first in page:
+            segment = {"index": i, "job_id": job_id, "status": status}
+            if job:
+                source, title = job.get("source", "Unknown Source"), job.get("title", "Untitled")
+                segment.update(source=source, title=title)
+                if status == "done":
+                    segment["lead"] = segment_lead(first, source, title)
+                    segment["text"] = job["output"]
+            result.append(segment)
+        return result
+
+    def script(self, digest: Digest) -> str:
+        """Legacy single-string briefing. Cached on the digest once every segment is settled."""
+        with self._lock:
+            if digest.script is not None:
+                return digest.script
+            version = digest.version
+        text = render_briefing(list(digest.job_ids), fetch_jobs(self.get_many, list(digest.job_ids)))
+        with self._lock:
+            if digest.pending == 0 and digest.version == version:
+                digest.script = text
+        return text
+
+    def __len__(self):
+        with self._lock:
+            return len(self._digests)
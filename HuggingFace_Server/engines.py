@@ -0,0 +1,103 @@
+import torch
+from transformers import AutoModelForSeq2SeqLM, LogitsProcessor, LogitsProcessorList
+
+# ==========================================
+# 🏎️ INFERENCE ENGINES
+# ==========================================
+# Every engine returns an object with the same generate(input_ids, attention_mask=..., **gen_kwargs)
+# contract as a Hugging Face seq2seq model, so the batcher never changes.
+#   eager   - fp32 PyTorch (reference quality)
+#   int8    - dynamic int8 quantization of every nn.Linear (weights int8, activations fp32)
+#   onnx    - ONNX Runtime seq2seq export via optimum (pip install optimum[onnxruntime])
+#   compile - torch.compile'd forward pass
+
+ENGINES = ("eager", "int8", "onnx", "compile")
+
+def load_eager(model_name: str):
+    # low_cpu_mem_usage: build the module empty, then fill it straight from the
+    # memory-mapped safetensors file instead of allocating random weights first
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, low_cpu_mem_usage=True)
+    model.eval() # REC 1: Disable dropout for deterministic output
+    return model
+
+def load_int8(model_name: str):
+    model = load_eager(model_name)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_onnx(model_name: str):
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise RuntimeError("INFERENCE_ENGINE=onnx needs 'optimum[onnxruntime]' installed") from e
+    # export=True converts the PyTorch checkpoint on first load (encoder + decoder w/ past)
+    return ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+
+def load_compiled(model_name: str):
+    model = load_eager(model_name)
+    # generate() calls the module, which calls self.forward -> swap in the compiled version.
+    # dynamic=True avoids a recompile for every new sequence length / batch size.
+    model.forward = torch.compile(model.forward, dynamic=True)
+    return model
+
+LOADERS = {
+    "eager": load_eager,
+    "int8": load_int8,
+    "onnx": load_onnx,
+    "compile": load_compiled,
+}
+
+def load_engine(engine: str, model_name: str):
+    if engine not in LOADERS:
+        raise ValueError(f"Unknown INFERENCE_ENGINE '{engine}'. Choose from: {', '.join(ENGINES)}")
+    return LOADERS[engine](model_name)
+
+# ==========================================
+# 🐇 ASSISTED GENERATION (Draft Model)
+# ==========================================
+# A small draft model with the same vocabulary (e.g. sshleifer/distilbart-cnn-12-6 for
+# bart-large-cnn) proposes a few tokens per step; the main model checks them all in one
+# forward pass and keeps the prefix it agrees with. Greedy output is unchanged, only
+# cheaper. transformers only runs it for greedy/sampling decodes of one row at a time.
+
+ASSISTED_ENGINES = ("eager", "int8", "compile") # ONNX Runtime models can't verify draft tokens
+
+def load_assistant(model_name: str, main_model, engine: str):
+    """The draft model (eager fp32: it is small), or ValueError if it can't assist `main_model`."""
+    if engine not in ASSISTED_ENGINES:
+        raise ValueError(f"assisted generation needs one of: {', '.join(ASSISTED_ENGINES)} (got '{engine}')")
+    assistant = load_eager(model_name)
+    if assistant.config.vocab_size != main_model.config.vocab_size:
+        raise ValueError(f"draft vocabulary ({assistant.config.vocab_size}) differs from the main model's "
+                         f"({main_model.config.vocab_size})")
+    return assistant
+
+class AssistedMinLength(LogitsProcessor):
+    """
+    min_length for assisted decoding: the same EOS mask as transformers' MinLengthLogitsProcessor,
+    which generate() refuses to combine with an assistant_model.
+    """
+
+    def __init__(self, min_length: int, eos_token_id: int):
+        self.min_length = min_length
+        self.eos_token_id = eos_token_id
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        if input_ids.shape[-1] < self.min_length:
+            scores = scores.clone()
+            scores[:, self.eos_token_id] = -float("inf")
+        return scores
+
+def assisted_length_kwargs(min_length: int, max_length: int, eos_token_id: int) -> dict:
+    """
+    generate() length kwargs for an assisted call. min_length travels as a logits
+    processor; min_length=0 overrides generation_config.min_length (56 for
+    bart-large-cnn), which transformers refuses to combine with an assistant.
+    """
+    return dict(max_length=max_length, min_length=0,
+                logits_processor=LogitsProcessorList([AssistedMinLength(min_length, eos_token_id)]))
+
+def assisted_compatible(gen_kwargs: dict, generation_config, batch_size: int, max_batch: int) -> bool:
+    """Greedy/sampling (no beams, no beam groups) and small enough to decode row by row."""
+    num_beams = gen_kwargs.get("num_beams", getattr(generation_config, "num_beams", 1))
+    num_beam_groups = gen_kwargs.get("num_beam_groups", getattr(generation_config, "num_beam_groups", 1))
+    return num_beams == 1 and num_beam_groups == 1 and batch_size <= max_batch
@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from metrics import log_event
+
+# ==========================================
+# 📰 FEED INGESTION (Server-Side RSS Refresh)
+# ==========================================
+# Fetches every enabled feed in global_news_feeds.json concurrently and writes
+# news_cache/<source>.json in exactly the shape the Scriptable client writes
+# ({title, link, date, desc, source}), so devices can pull one refreshed copy
+# instead of each hitting every publisher.
+#
+# Conditional GET: ETag / Last-Modified from the previous cycle are sent back as
+# If-None-Match / If-Modified-Since. A 304 leaves the cache file untouched and
+# skips parsing entirely.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEEDS_FILE = os.environ.get("FEEDS_FILE", os.path.join(REPO_ROOT, "global_news_feeds.json"))
+NEWS_CACHE_DIR = os.environ.get("NEWS_CACHE_DIR", os.path.join(REPO_ROOT, "news_cache"))
+FEED_STATE_PATH = os.environ.get("FEED_STATE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "feed_state.json"))
+FEED_MAX_CONNECTIONS = int(os.environ.get("FEED_MAX_CONNECTIONS", 32))  # Whole pool
+FEED_PER_HOST = int(os.environ.get("FEED_PER_HOST", 2))                 # Politeness cap per publisher host
+FEED_TIMEOUT_SECONDS = float(os.environ.get("FEED_TIMEOUT_SECONDS", 10))
+FEED_MAX_AGE_SECONDS = 3 * 24 * 3600  # Same expiry as the client (getExpiryCutoffMs)
+USER_AGENT = "NewsReaderRSS-FeedFetcher/1.0"
+
+# ==========================================
+# 🧩 PARSING (Mirrors the client's extract())
+# ==========================================
+NAMED_ENTITIES = [
+    ("&apos;", "'"), ("&#039;", "'"), ("&quot;", '"'),
+    ("&#8217;", "'"), ("&#8220;", '"'), ("&#8221;", '"'),
+    ("&#8211;", "-"), ("&#8212;", "--"),
+]
+
+def _char(code: int, fallback: str) -> str:
+    try:
+        return chr(code)
+    except (ValueError, OverflowError):
+        return fallback
+
+def decode_text(raw: str) -> str:
+    """Same steps and order as the client: unescape markup, strip tags, squash whitespace, decode entities."""
+    text = raw.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    for entity, char in NAMED_ENTITIES:
+        text = text.replace(entity, char)
+    text = re.sub(r"&#(\d+);", lambda m: _char(int(m.group(1)), m.group(0)), text)
+    text = re.sub(r"&#x([0-9a-f]+);", lambda m: _char(int(m.group(1), 16), m.group(0)), text, flags=re.I)
+    return text
+
+def extract(block: str, tag: str) -> str:
+    m = re.search(rf"<{tag}[^>]*>(?:<!\[CDATA\[)?(.*?)(?:\]\]>)?</{tag}>", block, re.I | re.S)
+    if m:
+        return decode_text(m.group(1))
+    if tag == "link":
+        link = re.search(r"""<link [^>]*href=["']([^"']+)["']""", block)
+        return link.group(1) if link else ""
+    return ""
+
+def parse_feed(xml: str, name: str) -> list[dict]:
+    """RSS <item> or Atom <entry> blocks -> normalized items."""
+    blocks = re.split(r"<item[^>]*>", xml)[1:] if "<item" in xml else re.split(r"<entry[^>]*>", xml)[1:]
+    return [{
+        "title": extract(b, "title") or extract(b, "dc:title") or extract(b, "media:title") or "Untitled Article",
+        "link": extract(b, "link"),
+        "date": extract(b, "pubDate") or extract(b, "updated") or extract(b, "published"),
+        "desc": extract(b, "description") or extract(b, "summary") or extract(b, "content"),
+        "source": name,
+    } for b in blocks]
+
+def parse_date(value: str) -> Optional[float]:
+    """RFC 822 (RSS) or ISO 8601 (Atom) -> epoch seconds. None if unreadable."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def filter_fresh(items: list[dict], max_age_seconds: Optional[float], now: Optional[float] = None) -> list[dict]:
+    """Drops expired items. Like the client, an unreadable date counts as expired."""
+    if max_age_seconds is None:
+        return items
+    now = now if now is not None else time.time()
+    fresh = []
+    for item in items:
+        stamp = parse_date(item["date"])
+        if stamp is not None and now - stamp < max_age_seconds:
+            fresh.append(item)
+    return fresh
+
+def cache_path(cache_dir: str, name: str) -> str:
+    """Client naming: name.replace(/[^a-z0-9]/gi, '_').toLowerCase() + ".json"."""
+    return os.path.join(cache_dir, re.sub(r"[^a-z0-9]", "_", name, flags=re.I).lower() + ".json")
+
+def write_json_atomic(path: str, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":")) # JSON.stringify layout
+    os.replace(tmp, path)
+
+def load_feeds(path: str = FEEDS_FILE) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+# ==========================================
+# 🌐 FETCH ENGINE
+# ==========================================
+class FeedFetcher:
+    """
+    One refresh cycle = every enabled feed fetched concurrently on a pooled
+    httpx.AsyncClient. The pool caps total connections; a semaphore per host caps
+    how many requests one publisher sees at once. Validators (ETag/Last-Modified)
+    persist in a small JSON state file between cycles and restarts.
+    """
+
+    def __init__(self, cache_dir: str = NEWS_CACHE_DIR, state_path: Optional[str] = FEED_STATE_PATH,
+                 max_connections: int = FEED_MAX_CONNECTIONS, per_host: int = FEED_PER_HOST,
+                 timeout: float = FEED_TIMEOUT_SECONDS, max_age_seconds: Optional[float] = FEED_MAX_AGE_SECONDS):
+        self.cache_dir = cache_dir
+        self.state_path = state_path
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_age_seconds = max_age_seconds
+        self.state = self._load_state() # url -> {"etag", "last_modified"}
+        self.last_report = None
+        self._busy = threading.Lock()   # One cycle at a time (endpoint vs. background loop)
+
+    def _load_state(self) -> dict:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            log_event("feed_state_unreadable", path=self.state_path, error=str(e))
+            return {}
+
+    async def refresh(self, feeds: list[dict]) -> Optional[dict]:
+        """Runs one full cycle. Returns the report, or None if a cycle is already running."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            return await self._refresh(feeds)
+        finally:
+            self._busy.release()
+
+    async def _refresh(self, feeds: list[dict]) -> dict:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        enabled = [f for f in feeds if f.get("enabled")]
+        started = time.time()
+        t0 = time.perf_counter()
+
+        # Client lives for one cycle: cycles are minutes apart, longer than any keep-alive
+        host_limits = {}
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        timeout = httpx.Timeout(self.timeout, pool=None) # Waiting for a pooled connection is not a failure
+        async with httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True,
+                                     headers={"User-Agent": USER_AGENT}) as client:
+            results = await asyncio.gather(*(self._fetch(client, feed, host_limits) for feed in enabled))
+
+        if self.state_path:
+            write_json_atomic(self.state_path, self.state)
+
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        report = {"started_at": started, "seconds": round(time.perf_counter() - t0, 3),
+                  "feeds": len(enabled), "counts": counts, "results": results}
+        self.last_report = report
+        log_event("feed_refresh", feeds=len(enabled), seconds=report["seconds"], **counts)
+        return report
+
+    async def _fetch(self, client: httpx.AsyncClient, feed: dict, host_limits: dict) -> dict:
+        name, url = feed["name"], feed["url"]
+        path = cache_path(self.cache_dir, name)
+        host = urlsplit(url).netloc.lower()
+        semaphore = host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+
+        headers = {}
+        validators = self.state.get(url, {})
+        if os.path.exists(path): # Without the file a 304 would leave nothing to serve
+            if validators.get("etag"): headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"): headers["If-Modified-Since"] = validators["last_modified"]
+
+        result = {"name": name}
+        t0 = time.perf_counter()
+        try:
+            async with semaphore:
+                resp = await client.get(url, headers=headers)
+            if resp.status_code == 304 and headers:
+                result["status"] = "not_modified"
+            else:
+                resp.raise_for_status()
+                items = filter_fresh(parse_feed(resp.text, name), self.max_age_seconds)
+                write_json_atomic(path, items)
+                self.state[url] = {"etag": resp.headers.get("etag"), "last_modified": resp.headers.get("last-modified")}
+                result.update(status="updated", items=len(items))
+        except Exception as e:
+            # Keep serving the previous file, same as the client's cached fallback
+            result.update(status="error", error=f"{type(e).__name__}: {e}", cached=os.path.exists(path))
+            log_event("feed_fetch_failed", feed=name, url=url, error=result["error"])
+        result["seconds"] = round(time.perf_counter() - t0, 3)
+        return result
+
+if __name__ == "__main__":
+    # One-shot refresh: python feed_fetcher.py
+    report = asyncio.run(FeedFetcher().refresh(load_feeds()))
+    print(json.dumps({k: v for k, v in report.items() if k != "results"}, indent=2))
@@ -0,0 +1,371 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from feed_fetcher import parse_date
+from search_index import read_master_titles
+
+# ==========================================
+# 📖 READ HISTORY + TITLE STORE (SQLite)
+# ==========================================
+# Replaces the client's read_history.json (flat URL array) and master_titles.txt
+# (pipe-delimited, rewritten and scanned in full) with one SQLite file:
+#   reads  - read / unread state per article URL (unread kept as a tombstone so it syncs)
+#   titles - every headline seen, first sighting wins
+# Rows are keyed by a 64-bit hash of the NORMALIZED URL (INTEGER PRIMARY KEY, so the
+# key is the rowid: one B-tree probe, 8 bytes per key). An in-memory Bloom filter over
+# the read keys answers most "was this read?" questions for unread articles - the
+# common case when rendering a feed - without touching SQLite at all.
+#
+# Sync: every change gets a sequence number; cursors are "<epoch>-<seq>" like the job
+# store's, but the epoch lives in the database, so cursors survive restarts. A cursor
+# from another database or older than the last tombstone purge means "full resync".
+
+READ_RETENTION_DAYS = 180    # Read marks older than this are compacted away...
+MIN_READS_KEPT = 1000        # ...except the newest this many (the client's MAX_HISTORY floor)
+TITLE_RETENTION_DAYS = 90    # Headlines older than this (feed date, else first sighting) are dropped
+TOMBSTONE_RETENTION_DAYS = 30 # "Marked unread" rows kept this long for devices that haven't synced
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MIN_CAPACITY = 4096
+COMPACT_INTERVAL = 3600      # Seconds between automatic compactions (checked on writes)
+QUERY_PAGE = 500             # Keys per IN (...) lookup
+
+TRACKING_PARAMS = frozenset((
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "smid", "ocid",
+    "taid", "guccounter", "soc_src", "soc_trk", "at_medium", "at_campaign", "partner", "rss", "feed",
+))
+
+def normalize_url(url: str) -> str:
+    """
+    Same article, same string: https, lowercase host without "www.", no default port,
+    fragment or tracking parameters (utm_* etc.), sorted query, no trailing slash.
+    Anything that isn't an absolute URL is only trimmed.
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+    host = parts.hostname
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def url_key(url: str) -> int:
+    """Signed 64-bit key of the normalized URL (fits SQLite's INTEGER PRIMARY KEY)."""
+    digest = hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def title_key(row: dict) -> int:
+    """Headlines are keyed by link; link-less ones by source + lowercased title."""
+    if row.get("link"):
+        return url_key(row["link"])
+    return url_key(f"title:{row.get('source', '')}|{row['title'].strip().lower()}")
+
+class BloomFilter:
+    """Bit array + k probes by double hashing. False positives only; nothing is ever removed."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = max(capacity, BLOOM_MIN_CAPACITY)
+        self.bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _probes(self, key: int):
+        h1 = key & 0xFFFFFFFFFFFFFFFF
+        h2 = ((h1 * 0x9E3779B97F4A7C15) >> 17 | 1) & 0xFFFFFFFFFFFFFFFF # Second hash derived from the first
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, key: int):
+        for bit in self._probes(key):
+            self._array[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def __contains__(self, key: int) -> bool:
+        return all(self._array[bit >> 3] & (1 << (bit & 7)) for bit in self._probes(key))
+
+    @property
+    def full(self) -> bool:
+        return self.count > self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._array)
+
+class HistoryStore:
+    """
+    Read state + title history in one SQLite file. Thread-safe (one connection behind a lock).
+    Every write takes an optional `device` id so a device's own changes aren't echoed back by sync.
+    """
+
+    def __init__(self, path: str, read_retention_days: float = READ_RETENTION_DAYS,
+                 title_retention_days: float = TITLE_RETENTION_DAYS, min_reads: int = MIN_READS_KEPT):
+        self.path = path
+        self.read_retention = read_retention_days * 86400
+        self.title_retention = title_retention_days * 86400
+        self.min_reads = min_reads
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._last_compact = time.time()
+        self.compactions = 0
+        with self._lock:
+            self._db.execute("PRAGMA auto_vacuum=INCREMENTAL") # Only takes effect on a new file
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS reads (
+                    key INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    read INTEGER NOT NULL,
+                    changed_at REAL NOT NULL,
+                    seq INTEGER NOT NULL,
+                    device TEXT
+                )""")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS titles (
+                    key INTEGER PRIMARY KEY,
+                    source TEXT,
+                    title TEXT NOT NULL,
+                    link TEXT,
+                    date TEXT,
+                    seen_at REAL NOT NULL,
+                    seq INTEGER NOT NULL,
+                    device TEXT
+                )""")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_reads_seq ON reads(seq)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_reads_changed ON reads(read, changed_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_titles_seq ON titles(seq)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_titles_seen ON titles(seen_at)")
+            self.epoch = self._meta("epoch") or self._set_meta("epoch", uuid.uuid4().hex[:8])
+            self._floor = int(self._meta("floor") or 0) # Cursors below this may have missed a purged tombstone
+            self._seq = max(self._floor, *(self._db.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {t}").fetchone()[0]
+                                           for t in ("reads", "titles")))
+            self._rebuild_bloom()
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE name=?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name: str, value: str) -> str:
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+        return value
+
+    def _rebuild_bloom(self):
+        """Caller holds the lock. Sized for twice the current read count, so it rarely regrows."""
+        keys = [row[0] for row in self._db.execute("SELECT key FROM reads WHERE read=1")]
+        self._bloom = BloomFilter(2 * len(keys))
+        for key in keys:
+            self._bloom.add(key)
+
+    @property
+    def cursor(self) -> str:
+        return f"{self.epoch}-{self._seq}"
+
+    # ---- Read state ----
+    def mark(self, entries: list[tuple[str, bool, float]], device: Optional[str] = None) -> int:
+        """
+        (url, read, changed_at) per entry; the newest change to a URL wins, so replaying
+        an old import or a late sync can't undo a newer mark. Returns rows changed.
+        """
+        changed = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for url, read, at in entries:
+                    key = url_key(url)
+                    row = self._db.execute("SELECT read, changed_at FROM reads WHERE key=?", (key,)).fetchone()
+                    if row is not None and (row[1] > at or bool(row[0]) == read):
+                        continue
+                    self._seq += 1
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO reads (key, url, read, changed_at, seq, device) VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, url, int(read), at, self._seq, device))
+                    if read:
+                        self._bloom.add(key)
+                    changed += 1
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            if self._bloom.full:
+                self._rebuild_bloom()
+        self._maybe_compact()
+        return changed
+
+    def mark_read(self, urls: list[str], read: bool = True, device: Optional[str] = None) -> int:
+        now = time.time()
+        return self.mark([(url, read, now) for url in urls], device)
+
+    def read_urls(self, urls: list[str]) -> list[str]:
+        """The subset of `urls` marked read. The Bloom filter settles most unread ones."""
+        keys = {}
+        for url in urls:
+            key = url_key(url)
+            if key in self._bloom:
+                keys.setdefault(key, []).append(url)
+        found = set()
+        with self._lock:
+            candidates = list(keys)
+            for i in range(0, len(candidates), QUERY_PAGE):
+                page = candidates[i:i + QUERY_PAGE]
+                rows = self._db.execute(
+                    f"SELECT key FROM reads WHERE read=1 AND key IN ({','.join('?' * len(page))})", page)
+                found.update(row[0] for row in rows)
+        return [url for key in found for url in keys[key]]
+
+    def is_read(self, url: str) -> bool:
+        return bool(self.read_urls([url]))
+
+    # ---- Titles ----
+    def add_titles(self, rows: list[dict], device: Optional[str] = None) -> int:
+        """Rows of {source, title, link, date}. Headlines already stored are skipped. Returns rows added."""
+        added = 0
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for row in rows:
+                    if not row.get("title"): continue
+                    self._seq += 1
+                    cur = self._db.execute(
+                        "INSERT OR IGNORE INTO titles (key, source, title, link, date, seen_at, seq, device) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (title_key(row), row.get("source"), row["title"], row.get("link"), row.get("date"),
+                         min(now, parse_date(row.get("date", "")) or now), self._seq, device))
+                    if cur.rowcount:
+                        added += 1
+                    else:
+                        self._seq -= 1
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        self._maybe_compact()
+        return added
+
+    def has_title(self, row: dict) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM titles WHERE key=?", (title_key(row),)).fetchone() is not None
+
+    # ---- Sync ----
+    def changes_since(self, cursor: Optional[str], limit: int, device: Optional[str] = None) -> dict:
+        """
+        One page of changes after `cursor`, oldest first, leaving out `device`'s own writes.
+        An unusable cursor restarts from zero with "full": true: every live row, and the
+        client replaces its local state. Call again with the returned cursor while
+        "more" is true.
+        """
+        epoch, _, seq = (cursor or "").partition("-")
+        with self._lock:
+            full = epoch != self.epoch or not seq.isdigit() or int(seq) < self._floor or int(seq) > self._seq
+            since = 0 if full else int(seq)
+            head = self._seq
+            own = "" if full else " AND (device IS NULL OR device != ?)"
+            args = (since, head) if full else (since, head, device or "")
+            live = " AND read=1" if full else ""
+            reads = self._db.execute(
+                f"SELECT seq, url, read, changed_at FROM reads WHERE seq > ? AND seq <= ?{live}{own} "
+                "ORDER BY seq LIMIT ?", args + (limit,)).fetchall()
+            titles = self._db.execute(
+                f"SELECT seq, source, title, link, date FROM titles WHERE seq > ? AND seq <= ?{own} "
+                "ORDER BY seq LIMIT ?", args + (limit,)).fetchall()
+        merged = sorted([("read", row) for row in reads] + [("title", row) for row in titles], key=lambda e: e[1][0])
+        more = len(reads) == limit or len(titles) == limit or len(merged) > limit
+        merged = merged[:limit]
+        page = {"cursor": f"{self.epoch}-{merged[-1][1][0] if more else head}", "full": full, "more": more,
+                "reads": [], "titles": []}
+        for kind, row in merged:
+            if kind == "read":
+                page["reads"].append({"url": row[1], "read": bool(row[2]), "at": row[3]})
+            else:
+                page["titles"].append({"source": row[1], "title": row[2], "link": row[3], "date": row[4]})
+        return page
+
+    # ---- Maintenance ----
+    def _maybe_compact(self):
+        if time.time() - self._last_compact >= COMPACT_INTERVAL:
+            self.compact()
+
+    def compact(self, now: Optional[float] = None) -> dict:
+        """
+        Retention: read marks past READ_RETENTION (keeping the newest min_reads), tombstones
+        past TOMBSTONE_RETENTION, headlines past TITLE_RETENTION. Then the Bloom filter is
+        rebuilt (it can't forget keys) and freed pages go back to the filesystem.
+        """
+        now = now if now is not None else time.time()
+        self._last_compact = now
+        with self._lock:
+            reads = self._db.execute(
+                "DELETE FROM reads WHERE read=1 AND changed_at < ? AND key NOT IN "
+                "(SELECT key FROM reads WHERE read=1 ORDER BY changed_at DESC LIMIT ?)",
+                (now - self.read_retention, self.min_reads)).rowcount
+            cutoff = now - TOMBSTONE_RETENTION_DAYS * 86400
+            purged_seq = self._db.execute(
+                "SELECT MAX(seq) FROM reads WHERE read=0 AND changed_at < ?", (cutoff,)).fetchone()[0]
+            tombstones = self._db.execute("DELETE FROM reads WHERE read=0 AND changed_at < ?", (cutoff,)).rowcount
+            if purged_seq is not None and purged_seq > self._floor:
+                self._floor = purged_seq
+                self._set_meta("floor", str(purged_seq))
+            titles = self._db.execute("DELETE FROM titles WHERE seen_at < ?", (now - self.title_retention,)).rowcount
+            self._rebuild_bloom()
+            self._db.execute("PRAGMA incremental_vacuum")
+            self.compactions += 1
+        return {"reads": reads, "tombstones": tombstones, "titles": titles}
+
+    def import_files(self, history_path: Optional[str], titles_path: Optional[str]) -> dict:
+        """
+        Loads read_history.json and master_titles.txt. Safe to repeat: the history file
+        carries no timestamps, so its entries are dated by file mtime (oldest first) and
+        lose to any newer mark already stored.
+        """
+        counts = {"reads": 0, "titles": 0}
+        if history_path and os.path.exists(history_path):
+            with open(history_path, "r", encoding="utf-8") as f:
+                urls = [u for u in json.load(f) if isinstance(u, str) and u.strip()]
+            mtime = os.path.getmtime(history_path)
+            counts["reads"] = self.mark([(url, True, mtime - (len(urls) - i) * 1e-3) for i, url in enumerate(urls)])
+        if titles_path and os.path.exists(titles_path):
+            counts["titles"] = self.add_titles(read_master_titles(titles_path))
+        return counts
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM reads WHERE read=1").fetchone()[0]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reads = dict(self._db.execute("SELECT read, COUNT(*) FROM reads GROUP BY read").fetchall())
+            titles = self._db.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+            pages = self._db.execute("PRAGMA page_count").fetchone()[0] * self._db.execute("PRAGMA page_size").fetchone()[0]
+            return {
+                "reads": reads.get(1, 0),
+                "tombstones": reads.get(0, 0),
+                "titles": titles,
+                "seq": self._seq,
+                "bloom_bytes": self._bloom.nbytes,
+                "bloom_keys": self._bloom.count,
+                "db_bytes": pages,
+                "compactions": self.compactions,
+            }
@@ -0,0 +1,234 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+import torch
+import torch.multiprocessing as mp
+
+from metrics import log_event
+
+# ==========================================
+# 🧵 MULTI-PROCESS INFERENCE (Shared Weights)
+# ==========================================
+# Optional (INFERENCE_PROCESSES=N): generate() runs in N worker processes instead of
+# the API process. The chunk batcher still forms the batches; the pool hands each one
+# to an idle worker over its task queue, and all workers answer on one result queue.
+#
+# The weights exist once:
+#   fork  - workers are forked after the model is loaded, so they share its pages
+#           copy-on-write (nothing writes to weights at inference). The parent must
+#           not have run a multi-threaded torch op first: libgomp's thread pool does
+#           not survive fork() and the child hangs in its first parallel region. The
+#           API process never generates once the pool exists, so it stays at one
+#           torch thread (set before loading) and each worker warms itself up.
+#   spawn - eager weights are moved to shared memory (model.share_memory()) and sent
+#           to fresh interpreters as shared-memory handles. Needs a /dev/shm large
+#           enough for the model; int8/onnx/compile engines can't travel this way,
+#           so with spawn those workers load their own copy.
+# Each worker runs with a fixed torch thread count, pinned to its own CPUs when the
+# machine has enough of them, so N articles decode in parallel without the workers
+# fighting over cores.
+
+START_METHODS = ("fork", "spawn")
+WORKER_START_TIMEOUT = 600 # Seconds for every worker to load (spawn + non-eager engines) and warm up
+
+def plan_cpus(processes: int, threads: int) -> list[Optional[list[int]]]:
+    """Disjoint CPU sets per worker, or None per worker if the machine can't pin them all."""
+    if not hasattr(os, "sched_getaffinity"):
+        return [None] * processes
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < processes * threads:
+        return [None] * processes
+    return [cpus[i * threads:(i + 1) * threads] for i in range(processes)]
+
+def worker_main(index: int, model, model_name: str, engine: str, threads: int, cpus: Optional[list[int]],
+                warm_ids: list[int], tasks, results):
+    """Worker process loop: one batch at a time from its own task queue."""
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    torch.set_num_threads(threads)
+    try:
+        if model is None:
+            from engines import load_engine
+            model = load_engine(engine, model_name)
+        with torch.no_grad(): # First call pays this process's allocation cost
+            model.generate(torch.tensor([warm_ids]), max_length=8, num_beams=1)
+    except Exception as e:
+        results.put(("failed", index, f"{type(e).__name__}: {e}"))
+        return
+    results.put(("ready", index, os.getpid()))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        task_id, input_ids, attention_mask, gen_kwargs = task
+        try:
+            t0 = time.perf_counter()
+            with torch.no_grad():
+                summary_ids = model.generate(torch.tensor(input_ids), attention_mask=torch.tensor(attention_mask),
+                                             **gen_kwargs)
+            results.put(("done", task_id, summary_ids.tolist(), time.perf_counter() - t0))
+        except Exception as e:
+            results.put(("error", task_id, f"{type(e).__name__}: {e}", 0.0))
+
+class InferencePool:
+    """
+    N worker processes behind submit(). submit() blocks until a worker is idle and
+    returns a Future resolving to (token rows, generate seconds). A worker that dies
+    fails its in-flight batch and is replaced.
+    """
+
+    def __init__(self, model, model_name: str, engine: str, processes: int, threads: int = 0,
+                 start_method: str = "fork", warm_ids: Optional[list[int]] = None):
+        if start_method not in START_METHODS:
+            raise ValueError(f"Unknown INFERENCE_START_METHOD '{start_method}'. Choose from: {', '.join(START_METHODS)}")
+        if start_method == "fork" and torch.get_num_threads() > 1:
+            raise RuntimeError("fork needs a single-threaded parent (torch.set_num_threads(1) before any torch op); "
+                               "forked workers hang on an inherited OpenMP pool")
+        self.processes = processes
+        self.threads = threads or max(1, (os.cpu_count() or 1) // processes)
+        self.start_method = start_method
+        self.model_name = model_name
+        self.engine = engine
+        self.warm_ids = warm_ids or [0, 2]
+        if start_method == "fork":
+            self._model = model
+        elif engine == "eager":
+            model.share_memory()
+            self._model = model
+        else:
+            self._model = None # Each spawned worker loads its own
+        self._ctx = mp.get_context(start_method)
+        self._results = self._ctx.Queue()
+        self._cpus = plan_cpus(processes, self.threads)
+        self._workers = [None] * processes # index -> {"process", "tasks", "pid", "task_id"}
+        self._idle = []
+        self._futures = {} # task_id -> (Future, worker index)
+        self._ids = itertools.count()
+        self._cond = threading.Condition()
+        self._failed = None
+        self._closed = False
+        self.restarts = 0
+        for index in range(processes):
+            self._start_worker(index)
+        threading.Thread(target=self._collect, name="inference-pool-results", daemon=True).start()
+        self._wait_ready()
+
+    def _start_worker(self, index: int):
+        tasks = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=worker_main, name=f"inference-process-{index}", daemon=True,
+            args=(index, self._model, self.model_name, self.engine, self.threads, self._cpus[index],
+                  self.warm_ids, tasks, self._results))
+        process.start()
+        self._workers[index] = {"process": process, "tasks": tasks, "pid": process.pid, "task_id": None, "ready": False}
+
+    def _wait_ready(self):
+        deadline = time.monotonic() + WORKER_START_TIMEOUT
+        with self._cond:
+            while len(self._idle) < self.processes and self._failed is None:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    self._failed = "timed out waiting for inference workers"
+                    break
+                self._cond.wait(min(left, 1.0))
+        if self._failed is not None:
+            self.close()
+            raise RuntimeError(f"Inference pool failed to start: {self._failed}")
+        log_event("inference_pool_ready", processes=self.processes, threads=self.threads, start_method=self.start_method,
+                  pinned=self._cpus[0] is not None, pids=[w["pid"] for w in self._workers])
+
+    def submit(self, input_ids: list[list[int]], attention_mask: list[list[int]], gen_kwargs: dict) -> Future:
+        future = Future()
+        with self._cond:
+            while not self._idle:
+                self._cond.wait()
+            index = self._idle.pop()
+            task_id = next(self._ids)
+            self._futures[task_id] = (future, index)
+            self._workers[index]["task_id"] = task_id
+            self._workers[index]["tasks"].put((task_id, input_ids, attention_mask, gen_kwargs))
+        return future
+
+    def _collect(self):
+        """Result channel reader: resolves futures and frees workers."""
+        last_check = time.monotonic()
+        while True:
+            if time.monotonic() - last_check >= 1.0:
+                self._check_workers()
+                last_check = time.monotonic()
+            try:
+                message = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            kind = message[0]
+            if kind == "ready":
+                with self._cond:
+                    self._workers[message[1]]["ready"] = True
+                    self._idle.append(message[1])
+                    self._cond.notify_all()
+                continue
+            if kind == "failed":
+                log_event("inference_worker_failed", worker=message[1], error=message[2])
+                with self._cond:
+                    self._failed = message[2]
+                    self._cond.notify_all()
+                continue
+            _, task_id, payload, seconds = message
+            with self._cond:
+                future, index = self._futures.pop(task_id, (None, None))
+                if index is not None:
+                    self._workers[index]["task_id"] = None
+                    self._idle.append(index)
+                    self._cond.notify_all()
+            if future is None:
+                continue
+            if kind == "done":
+                future.set_result((payload, seconds))
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _check_workers(self):
+        """Replaces dead workers (OOM kill, segfault) and fails the batch they held."""
+        if self._closed:
+            return
+        for index, worker in enumerate(self._workers):
+            if worker is None or worker["process"].is_alive():
+                continue
+            with self._cond:
+                task_id = worker["task_id"]
+                future = self._futures.pop(task_id, (None, None))[0] if task_id is not None else None
+                if index in self._idle: self._idle.remove(index)
+            log_event("inference_worker_died", worker=index, pid=worker["pid"], exitcode=worker["process"].exitcode)
+            if future is not None:
+                future.set_exception(RuntimeError(f"Inference worker {index} died (exit code {worker['process'].exitcode})"))
+            if not worker["ready"]: # Died while starting: restarting would just loop
+                with self._cond:
+                    self._workers[index] = None
+                    self._failed = self._failed or f"worker {index} exited during startup"
+                    self._cond.notify_all()
+                continue
+            self.restarts += 1
+            self._start_worker(index)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {"processes": self.processes, "threads_per_process": self.threads, "idle": len(self._idle),
+                    "restarts": self.restarts}
+
+    def close(self):
+        self._closed = True
+        for worker in self._workers:
+            if worker is None: continue
+            try:
+                worker["tasks"].put(None)
+            except (OSError, ValueError):
+                pass
+            worker["process"].join(timeout=5)
+            if worker["process"].is_alive():
+                worker["process"].terminate()
@@ -0,0 +1,325 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Callable, Optional
+
+# ==========================================
+# 🗃️ JOB STORE (Memory / SQLite)
+# ==========================================
+# Every endpoint talks to jobs through this interface, never a raw dict:
+#   create / get / update / delete / completed / get_many / changes_since / __contains__ / __len__
+# Finished jobs (done/error) are evicted after `ttl_seconds` or once more than
+# `max_finished` of them exist (oldest first).
+#
+# Change feed: every job entering or leaving the completed set (status "done") gets
+# a sequence number. Cursors are "<epoch>-<seq>"; the epoch is new per process, so a
+# cursor from before a restart (or older than the retained log) means "resync".
+
+FINISHED = ("done", "error")
+CHANGE_LOG_MAX = 10000 # Completed-set changes kept for delta polling
+
+class JobStore:
+    """Base class: eviction throttling and the completed-set change feed shared by all backends."""
+
+    EVICT_INTERVAL = 60 # Seconds between eviction sweeps
+
+    def __init__(self, ttl_seconds: float, max_finished: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self._last_evict = 0.0
+        self.epoch = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._changes = deque(maxlen=CHANGE_LOG_MAX) # (seq, "add" | "remove", job_id)
+        self._change_lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def cursor(self) -> str:
+        return f"{self.epoch}-{self._seq}"
+
+    def add_listener(self, fn: Callable[[str], None]):
+        """fn(cursor) runs after every completed-set change (on the writer's thread: keep it cheap)."""
+        self._listeners.append(fn)
+
+    def _record_changes(self, changes: list[tuple[str, str]]):
+        """Backends call this with their own lock held, so sequence order = commit order."""
+        if not changes:
+            return
+        with self._change_lock:
+            for op, job_id in changes:
+                self._seq += 1
+                self._changes.append((self._seq, op, job_id))
+        cursor = self.cursor
+        for fn in self._listeners:
+            fn(cursor)
+
+    def _done_transition(self, job_id: str, was_done: bool, is_done: bool):
+        if was_done != is_done:
+            self._record_changes([("add" if is_done else "remove", job_id)])
+
+    def changes_since(self, cursor: str) -> Optional[dict[str, str]]:
+        """
+        job_id -> last op ("add" / "remove") since `cursor`, or None if the cursor is
+        unknown (other epoch, malformed, or older than the retained log).
+        """
+        epoch, _, seq = cursor.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._change_lock:
+            if seq > self._seq:
+                return None
+            if self._changes and seq < self._changes[0][0] - 1:
+                return None # Trimmed out of the log
+            if not self._changes and seq != self._seq:
+                return None
+            ops = {}
+            for change_seq, op, job_id in reversed(self._changes):
+                if change_seq <= seq: break
+                ops.setdefault(job_id, op) # Newest op wins
+        return ops
+
+    def maybe_evict(self):
+        now = time.time()
+        if now - self._last_evict >= self.EVICT_INTERVAL:
+            self._last_evict = now
+            self.evict(now)
+
+    def _finish_stamp(self, fields: dict):
+        if fields.get("status") in FINISHED and "finished_at" not in fields:
+            fields["finished_at"] = time.time()
+
+    # Backends implement these
+    def create(self, job_id: str, record: dict): raise NotImplementedError
+    def get(self, job_id: str) -> Optional[dict]: raise NotImplementedError
+    def update(self, job_id: str, **fields) -> bool: raise NotImplementedError
+    def delete(self, job_id: str) -> bool: raise NotImplementedError
+    def completed(self) -> list[dict]: raise NotImplementedError
+    def get_many(self, job_ids: list[str]) -> dict[str, dict]: raise NotImplementedError
+    def evict(self, now: float) -> int: raise NotImplementedError
+    def __contains__(self, job_id: str) -> bool: raise NotImplementedError
+    def __len__(self) -> int: raise NotImplementedError
+
+class MemoryJobStore(JobStore):
+    """Process-local dict behind a lock. Fast, but lost on restart."""
+
+    def __init__(self, ttl_seconds: float, max_finished: int):
+        super().__init__(ttl_seconds, max_finished)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, record: dict):
+        record = dict(record)
+        self._finish_stamp(record)
+        with self._lock:
+            old = self._jobs.get(job_id)
+            self._jobs[job_id] = record
+            self._done_transition(job_id, old is not None and old["status"] == "done", record["status"] == "done")
+        self.maybe_evict()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, **fields) -> bool:
+        self._finish_stamp(fields)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            was_done = job["status"] == "done"
+            job.update(fields)
+            self._done_transition(job_id, was_done, job["status"] == "done")
+            return True
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return False
+            self._done_transition(job_id, job["status"] == "done", False)
+            return True
+
+    def completed(self) -> list[dict]:
+        with self._lock:
+            done = [dict(job, id=job_id) for job_id, job in self._jobs.items() if job["status"] == "done"]
+        done.sort(key=lambda job: job.get("created_at", 0))
+        return done
+
+    def get_many(self, job_ids: list[str]) -> dict[str, dict]:
+        with self._lock:
+            return {job_id: dict(self._jobs[job_id]) for job_id in job_ids if job_id in self._jobs}
+
+    def evict(self, now: float) -> int:
+        with self._lock:
+            finished = sorted(
+                (job.get("finished_at", 0), job_id)
+                for job_id, job in self._jobs.items() if job["status"] in FINISHED
+            )
+            expired = [job_id for stamp, job_id in finished if now - stamp > self.ttl_seconds]
+            overflow = len(finished) - len(expired) - self.max_finished
+            if overflow > 0:
+                expired += [job_id for _, job_id in finished[len(expired):len(expired) + overflow]]
+            removed = [("remove", job_id) for job_id in expired if self._jobs.pop(job_id)["status"] == "done"]
+            self._record_changes(removed)
+        return len(expired)
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._jobs
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+class SQLiteJobStore(JobStore):
+    """
+    Durable store (WAL mode) that survives Space restarts.
+    Hot columns are real columns with indexes; anything else rides in a JSON 'extra' column.
+    """
+
+    COLUMNS = ("status", "output", "title", "source", "created_at", "finished_at")
+
+    def __init__(self, path: str, ttl_seconds: float, max_finished: int):
+        super().__init__(ttl_seconds, max_finished)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    output TEXT,
+                    title TEXT,
+                    source TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL,
+                    extra TEXT NOT NULL DEFAULT '{}'
+                )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(finished_at)")
+            # Work in flight when the last process died cannot be resumed (the text lived in memory)
+            self._db.execute(
+                "UPDATE jobs SET status='error', output='Interrupted by server restart', finished_at=? "
+                "WHERE status NOT IN ('done', 'error')", (time.time(),))
+
+    def _split(self, fields: dict) -> tuple[dict, dict]:
+        cols = {k: v for k, v in fields.items() if k in self.COLUMNS}
+        extra = {k: v for k, v in fields.items() if k not in self.COLUMNS}
+        return cols, extra
+
+    def _row_to_job(self, row) -> dict:
+        job = dict(zip(("id",) + self.COLUMNS, row[:7]))
+        job.update(json.loads(row[7]))
+        del job["id"]
+        return job
+
+    def create(self, job_id: str, record: dict):
+        record = dict(record)
+        self._finish_stamp(record)
+        cols, extra = self._split(record)
+        with self._lock:
+            old = self._db.execute("SELECT status FROM jobs WHERE id=?", (job_id,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, output, title, source, created_at, finished_at, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, cols["status"], cols.get("output"), cols.get("title"), cols.get("source"),
+                 cols.get("created_at", time.time()), cols.get("finished_at"), json.dumps(extra)))
+            self._done_transition(job_id, old is not None and old[0] == "done", cols["status"] == "done")
+        self.maybe_evict()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, output, title, source, created_at, finished_at, extra FROM jobs WHERE id=?",
+                (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def update(self, job_id: str, **fields) -> bool:
+        self._finish_stamp(fields)
+        cols, extra = self._split(fields)
+        with self._lock:
+            if extra:
+                row = self._db.execute("SELECT extra FROM jobs WHERE id=?", (job_id,)).fetchone()
+                if row is None:
+                    return False
+                merged = json.loads(row[0])
+                merged.update(extra)
+                cols["extra"] = json.dumps(merged)
+            if not cols:
+                return True
+            old = None
+            if "status" in cols: # Only status changes can move a job in or out of the completed set
+                old = self._db.execute("SELECT status FROM jobs WHERE id=?", (job_id,)).fetchone()
+            assignments = ", ".join(f"{k}=?" for k in cols)
+            cur = self._db.execute(f"UPDATE jobs SET {assignments} WHERE id=?", (*cols.values(), job_id))
+            if old is not None:
+                self._done_transition(job_id, old[0] == "done", cols["status"] == "done")
+            return cur.rowcount > 0
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            old = self._db.execute("SELECT status FROM jobs WHERE id=?", (job_id,)).fetchone()
+            if old is None:
+                return False
+            self._db.execute("DELETE FROM jobs WHERE id=?", (job_id,))
+            self._done_transition(job_id, old[0] == "done", False)
+            return True
+
+    def completed(self) -> list[dict]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, title, source, created_at FROM jobs WHERE status='done' ORDER BY created_at").fetchall()
+        return [{"id": r[0], "title": r[1], "source": r[2], "created_at": r[3]} for r in rows]
+
+    def get_many(self, job_ids: list[str]) -> dict[str, dict]:
+        found = {}
+        for i in range(0, len(job_ids), 500): # Stay under SQLite's bound-parameter limit
+            part = job_ids[i:i + 500]
+            marks = ",".join("?" * len(part))
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT id, status, output, title, source, created_at, finished_at, extra FROM jobs WHERE id IN ({marks})",
+                    part).fetchall()
+            found.update({row[0]: self._row_to_job(row) for row in rows})
+        return found
+
+    def evict(self, now: float) -> int:
+        with self._lock:
+            removed = self._db.execute(
+                "SELECT id, status FROM jobs WHERE status IN ('done', 'error') AND finished_at < ?",
+                (now - self.ttl_seconds,)).fetchall()
+            removed += self._db.execute(
+                "SELECT id, status FROM jobs WHERE status IN ('done', 'error') AND NOT IFNULL(finished_at < ?, 0) "
+                "ORDER BY finished_at DESC LIMIT -1 OFFSET ?",
+                (now - self.ttl_seconds, self.max_finished)).fetchall()
+            for i in range(0, len(removed), 500):
+                part = [job_id for job_id, _ in removed[i:i + 500]]
+                self._db.execute(f"DELETE FROM jobs WHERE id IN ({','.join('?' * len(part))})", part)
+            self._record_changes([("remove", job_id) for job_id, status in removed if status == "done"])
+        return len(removed)
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM jobs WHERE id=?", (job_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+def make_job_store(backend: str, path: str, ttl_seconds: float, max_finished: int) -> JobStore:
+    if backend == "sqlite":
+        return SQLiteJobStore(path, ttl_seconds, max_finished)
+    if backend == "memory":
+        return MemoryJobStore(ttl_seconds, max_finished)
+    raise ValueError(f"Unknown JOB_STORE backend: {backend}")
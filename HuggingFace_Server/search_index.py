@@ -0,0 +1,246 @@
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+# ==========================================
+# 🔎 FULL-TEXT SEARCH (BM25 Inverted Index)
+# ==========================================
+# In-process index over finished summaries and cached articles. Documents get a
+# dense ordinal; each term keeps two parallel compact arrays (doc ordinals as
+# uint32, term frequencies as uint16): 6 bytes per posting instead of a Python
+# object per posting.
+#
+# Updates are incremental: add() appends to the postings of the doc's terms,
+# delete() tombstones the ordinal and only rewrites a term's arrays once more than
+# half of its postings are dead. Re-adding a doc with unchanged text only refreshes
+# its metadata, and once dead ordinals outnumber live ones every array is rewritten
+# against dense new ordinals, so feed refreshes can't grow the index. Scoring runs over the query terms' postings with
+# numpy (BM25, k1/b below), so a query touches only the documents containing
+# one of its terms.
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2           # Title terms count this many times (titles are short and precise)
+COMPACT_MIN_DEAD = 32     # Tombstoned postings a term tolerates before compaction is considered...
+COMPACT_DEAD_RATIO = 0.5  # ...and the dead share that triggers it
+RENUMBER_MIN_DEAD = 1024  # Dead ordinals tolerated before renumbering is considered (then: dead > live)
+MAX_TF = 65535            # uint16 term frequency cap
+SNIPPET_CHARS = 200
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have he her his i in is it its of on or our she that the their
+them they this to was we were will with you your not no so if than then there these those into about
+after over up out more most new says said also just can could would should may might been being do does
+""".split())
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased alphanumeric runs, minus stop words and single letters (digits are kept)."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOP_WORDS and (len(t) > 1 or t.isdigit())]
+
+def snippet(text: str, limit: int = SNIPPET_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "..."
+
+def read_master_titles(path: str) -> list[dict]:
+    """Rows of the client's master_titles.txt (SOURCE|TITLE|LINK|DATE, header first)."""
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        next(f, None)
+        for line in f:
+            parts = line.rstrip("\n").split("|")
+            if len(parts) >= 4 and parts[1]:
+                rows.append({"source": parts[0], "title": parts[1], "link": parts[2], "date": parts[3]})
+    return rows
+
+class SearchIndex:
+    """
+    BM25 index keyed by caller-chosen doc_id strings ("job:<id>", "article:<link>").
+    Re-adding a doc_id replaces it (unchanged text keeps its ordinal). Thread-safe;
+    every method takes the index lock.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._term_ids = {}   # term -> term id
+        self._postings = []   # term id -> array('I') doc ordinals (ascending)
+        self._freqs = []      # term id -> array('H') term frequency, parallel to _postings
+        self._df = array("I") # term id -> live documents containing it
+        self._dead = array("I") # term id -> tombstoned postings still in its arrays
+        self._ordinals = {}   # doc_id -> ordinal
+        self._doc_ids = []    # ordinal -> doc_id (None once deleted)
+        self._doc_terms = []  # ordinal -> array('I') of its term ids (needed to delete it)
+        self._meta = []       # ordinal -> caller metadata returned with hits
+        self._hashes = []     # ordinal -> hash of (title, body), to skip unchanged re-adds
+        self._lengths = array("I")
+        self._live = 0
+        self._total_length = 0
+        self.compactions = 0
+        self.renumbers = 0
+        self.unchanged = 0
+        self._lock = threading.Lock()
+
+    def add(self, doc_id: str, title: str, body: str, meta: Optional[dict] = None):
+        content = hash((title, body))
+        with self._lock:
+            ordinal = self._ordinals.get(doc_id)
+            if ordinal is not None and self._hashes[ordinal] == content:
+                self._meta[ordinal] = meta or {}
+                self.unchanged += 1
+                return
+        counts = Counter(tokenize(title) * TITLE_BOOST + tokenize(body))
+        with self._lock:
+            if doc_id in self._ordinals:
+                self._delete(doc_id)
+            ordinal = len(self._doc_ids)
+            term_ids = array("I")
+            for term, tf in counts.items():
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    term_id = self._term_ids[term] = len(self._postings)
+                    self._postings.append(array("I"))
+                    self._freqs.append(array("H"))
+                    self._df.append(0)
+                    self._dead.append(0)
+                self._postings[term_id].append(ordinal)
+                self._freqs[term_id].append(min(tf, MAX_TF))
+                self._df[term_id] += 1
+                term_ids.append(term_id)
+            length = sum(counts.values())
+            self._ordinals[doc_id] = ordinal
+            self._doc_ids.append(doc_id)
+            self._doc_terms.append(term_ids)
+            self._meta.append(meta or {})
+            self._hashes.append(content)
+            self._lengths.append(length)
+            self._live += 1
+            self._total_length += length
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._delete(doc_id)
+
+    def _delete(self, doc_id: str) -> bool:
+        """Caller holds the lock."""
+        ordinal = self._ordinals.pop(doc_id, None)
+        if ordinal is None:
+            return False
+        for term_id in self._doc_terms[ordinal]:
+            self._df[term_id] -= 1
+            self._dead[term_id] += 1
+            dead = self._dead[term_id]
+            if dead >= COMPACT_MIN_DEAD and dead > COMPACT_DEAD_RATIO * len(self._postings[term_id]):
+                self._compact(term_id)
+        self._total_length -= self._lengths[ordinal]
+        self._live -= 1
+        self._doc_ids[ordinal] = None
+        self._doc_terms[ordinal] = None
+        self._meta[ordinal] = None
+        self._hashes[ordinal] = None
+        self._lengths[ordinal] = 0
+        dead = len(self._doc_ids) - self._live
+        if dead >= RENUMBER_MIN_DEAD and dead > self._live:
+            self._renumber()
+        return True
+
+    def _compact(self, term_id: int):
+        """Caller holds the lock. Drops tombstoned postings from one term."""
+        docs, freqs = self._postings[term_id], self._freqs[term_id]
+        keep = [i for i, ordinal in enumerate(docs) if self._doc_ids[ordinal] is not None]
+        self._postings[term_id] = array("I", (docs[i] for i in keep))
+        self._freqs[term_id] = array("H", (freqs[i] for i in keep))
+        self._dead[term_id] = 0
+        self.compactions += 1
+
+    def _renumber(self):
+        """Caller holds the lock. Drops every dead ordinal; live docs keep their relative order."""
+        live = [ordinal for ordinal, doc_id in enumerate(self._doc_ids) if doc_id is not None]
+        remap = np.full(len(self._doc_ids), -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        for term_id, docs in enumerate(self._postings):
+            if not docs: continue
+            new = remap[np.array(docs, dtype=np.int64)]
+            keep = new >= 0 # Ascending old ordinals map to ascending new ones
+            self._postings[term_id] = array("I", new[keep].astype(np.uint32).tobytes())
+            self._freqs[term_id] = array("H", np.array(self._freqs[term_id], dtype=np.uint16)[keep].tobytes())
+            self._dead[term_id] = 0
+        self._doc_ids = [self._doc_ids[o] for o in live]
+        self._doc_terms = [self._doc_terms[o] for o in live]
+        self._meta = [self._meta[o] for o in live]
+        self._hashes = [self._hashes[o] for o in live]
+        self._lengths = array("I", (self._lengths[o] for o in live))
+        self._ordinals = {doc_id: ordinal for ordinal, doc_id in enumerate(self._doc_ids)}
+        self.renumbers += 1
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> list[tuple[str, float, dict]]:
+        """Top `limit` (doc_id, score, meta), best first. `kind` filters on meta["kind"]."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            term_ids = [self._term_ids[t] for t in terms if t in self._term_ids]
+            term_ids = [t for t in term_ids if self._df[t] > 0]
+            if not term_ids or limit <= 0:
+                return []
+            n = self._live
+            avg_length = self._total_length / n
+            # Copies, not views: a live buffer export would stop the arrays from growing
+            lengths = np.array(self._lengths, dtype=np.float32)
+            all_docs, all_scores = [], []
+            for term_id in term_ids:
+                docs = np.array(self._postings[term_id], dtype=np.int64)
+                tf = np.array(self._freqs[term_id], dtype=np.float32)
+                df = self._df[term_id]
+                idf = np.log1p((n - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / avg_length)
+                all_docs.append(docs)
+                all_scores.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+            docs = np.concatenate(all_docs)
+            scores = np.bincount(docs, weights=np.concatenate(all_scores))
+            candidates = np.flatnonzero(scores) # Every BM25 term contribution is > 0
+
+            # Take the best few, then widen only if tombstones / the kind filter ate too many
+            want = limit * 4 if kind is None else limit * 16
+            hits = []
+            while True:
+                if want < len(candidates):
+                    top = candidates[np.argpartition(-scores[candidates], want)[:want]]
+                else:
+                    top = candidates
+                hits = []
+                for ordinal in top[np.argsort(-scores[top], kind="stable")]:
+                    doc_id = self._doc_ids[ordinal]
+                    if doc_id is None: continue
+                    meta = self._meta[ordinal]
+                    if kind is not None and meta.get("kind") != kind: continue
+                    hits.append((doc_id, float(scores[ordinal]), meta))
+                    if len(hits) == limit: break
+                if len(hits) == limit or len(top) == len(candidates):
+                    return hits
+                want *= 4
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            return doc_id in self._ordinals
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._live
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            postings = sum(len(p) for p in self._postings)
+            return {
+                "documents": self._live,
+                "ordinals": len(self._doc_ids),
+                "terms": sum(1 for df in self._df if df > 0),
+                "postings": postings,
+                "dead_postings": sum(self._dead),
+                "postings_bytes": postings * 6,
+                "compactions": self.compactions,
+                "renumbers": self.renumbers,
+                "unchanged_readds": self.unchanged,
+            }
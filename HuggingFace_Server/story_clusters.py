@@ -0,0 +1,306 @@
+import itertools
+import re
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from typing import Optional
+
+import numpy as np
+
+# ==========================================
+# 🧬 STORY CLUSTERING (MinHash + LSH)
+# ==========================================
+# Assigns each incoming article to a story cluster without comparing it against every
+# stored title. MinHash signatures over the normalized title tokens (and title +
+# description tokens) are split into LSH bands; only articles sharing a band bucket
+# become candidates, and only the strongest few candidates are scored exactly.
+#
+# The exact score is the client's getJaccardSimilarity() (same stop words, token map,
+# entity bonus and thresholds) so server clusters agree with the reader's groupArticles().
+# Those thresholds are for display grouping only: sharing a summary also needs the
+# article bodies to be near-duplicates (MinHash over word shingles, body_signature()).
+
+# Client clustering constants (News Reader (RSS).js)
+BASE_THRESHOLD = 0.28       # Jaccard similarity threshold for standard titles
+SHORT_THRESHOLD = 0.20      # Lower threshold for short titles (<= 5 tokens)
+SAME_SOURCE_THRESHOLD = 0.40 # Same source needs a stronger match
+ENTITY_BONUS = 0.12         # Shared capitalized entity + some overlap
+TIME_WINDOW_SECONDS = 36 * 3600
+
+# Index params
+NUM_PERM = 128              # MinHash permutations per signature
+LSH_BANDS = 64              # 64 bands x 2 rows: ~88% candidate odds at Jaccard 0.18, >99% at 0.28
+MAX_VERIFY = 24             # Exact scoring only for the candidates with the most band collisions
+MAX_BUCKET_SCAN = 256       # Buckets bigger than this (very common tokens) are skipped at lookup
+DESC_TOKENS = 25            # Description words folded into the title + description signature
+PRUNE_INTERVAL_SECONDS = 60
+
+# Near-duplicate params (summary reuse)
+BODY_SHINGLE_WORDS = 5      # Words per body shingle
+BODY_DUPLICATE_THRESHOLD = 0.8 # Estimated body Jaccard needed to share a summary
+BODY_HASH_BLOCK = 4096      # Shingles hashed per pass
+
+HARD_STOP_WORDS = {
+    "breaking", "live", "update", "video", "watch", "photos", "the", "and", "for", "with", "this", "that",
+    "from", "news", "exclusive", "report", "today", "what", "when", "where", "who", "says", "said", "will",
+    "more", "over", "after", "into", "out", "up", "down",
+}
+SOFT_STOP_WORDS = {"review", "guide", "analysis", "opinion", "best", "week", "month", "year", "daily", "recap", "impressions"}
+TOKEN_MAP = {
+    "stocks": "stock", "shares": "stock", "market": "stock",
+    "plunge": "drop", "plunged": "drop", "falls": "drop", "falling": "drop", "slide": "drop", "slump": "drop",
+    "rise": "gains", "rising": "gains", "jump": "gains", "soar": "gains", "surges": "gains",
+    "bill": "law", "legislation": "law", "act": "law",
+    "cops": "police", "officers": "police",
+    "poll": "survey",
+    "talks": "meet", "meeting": "meet", "summit": "meet",
+    "deaths": "dead", "killed": "dead", "dies": "dead", "fatal": "dead",
+    "cuts": "cut", "cutting": "cut",
+}
+_PREFIX = re.compile(r"^(breaking|live|opinion|analysis):\s*", re.I)
+_PUNCT = re.compile(r"[^\w\s]", re.ASCII) # JS \w is ASCII-only
+
+def normalize_title(title: str) -> tuple[frozenset, frozenset]:
+    """Client normalize(): (tokens, capitalized entities), both lowercase."""
+    clean = _PREFIX.sub("", title)
+    entities = set()
+    for w in _PUNCT.sub(" ", clean).split():
+        if len(w) >= 2 and w[0].isupper() and w.lower() not in HARD_STOP_WORDS:
+            entities.add(w.lower())
+
+    tokens = []
+    for w in _PUNCT.sub(" ", clean.lower()).split()[:15]:
+        if len(w) < 2 or w in HARD_STOP_WORDS: continue
+        tokens.append(TOKEN_MAP.get(w, w))
+    # Soft stop words only removed for longer titles (>5 tokens)
+    if len(tokens) > 5:
+        tokens = [w for w in tokens if w not in SOFT_STOP_WORDS]
+    return frozenset(tokens), frozenset(entities)
+
+def normalize_desc(desc: str) -> frozenset:
+    words = _PUNCT.sub(" ", desc.lower()).split()
+    return frozenset(TOKEN_MAP.get(w, w) for w in words[:DESC_TOKENS * 2]
+                     if len(w) >= 2 and w not in HARD_STOP_WORDS and w not in SOFT_STOP_WORDS)
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b: return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+def body_shingles(text: str) -> frozenset:
+    """Overlapping BODY_SHINGLE_WORDS-word shingles of the normalized article body."""
+    words = _PUNCT.sub(" ", text.lower()).split()
+    n = BODY_SHINGLE_WORDS
+    if len(words) <= n:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i:i + n]) for i in range(len(words) - n + 1))
+
+def signature_similarity(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> float:
+    """Estimated Jaccard of the two shingle sets (share of equal MinHash rows)."""
+    if a is None or b is None or a.shape != b.shape: return 0.0
+    return float(np.count_nonzero(a == b)) / len(a)
+
+def near_duplicate(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> bool:
+    return signature_similarity(a, b) >= BODY_DUPLICATE_THRESHOLD
+
+def title_similarity(a: "StoryDoc", b: "StoryDoc") -> float:
+    """getJaccardSimilarity(): token Jaccard plus the entity bonus."""
+    score = jaccard(a.tokens, b.tokens)
+    if score > 0.1 and a.entities & b.entities:
+        score = min(1.0, score + ENTITY_BONUS)
+    return score
+
+class StoryDoc:
+    __slots__ = ("doc_id", "tokens", "entities", "combined", "source", "timestamp", "cluster_id", "added_at")
+
+    def __init__(self, doc_id, tokens, entities, combined, source, timestamp):
+        self.doc_id = doc_id
+        self.tokens = tokens
+        self.entities = entities
+        self.combined = combined
+        self.source = source
+        self.timestamp = timestamp
+        self.cluster_id = None
+        self.added_at = None
+
+class StoryClusterIndex:
+    """
+    Incremental MinHash/LSH index. add() assigns a cluster (joining the best match or
+    founding a new one); query() does the same lookup without storing anything.
+    As in the client's groupArticles(), articles are matched against each cluster's
+    primary (founding) article only, so a cluster can't drift by chaining. Only
+    primaries are kept in the LSH buckets; they are pruned after the time window.
+    """
+
+    PRIME = (1 << 32) + 15 # > every crc32 value
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = LSH_BANDS, max_verify: int = MAX_VERIFY,
+                 max_bucket_scan: int = MAX_BUCKET_SCAN, window_seconds: Optional[float] = TIME_WINDOW_SECONDS,
+                 seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, size=(num_perm, 1), dtype=np.uint64) # a * h stays below 2**63
+        self._b = rng.integers(0, self.PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.bands = bands
+        self._salts = rng.integers(0, 1 << 63, size=2 * bands, dtype=np.uint64) # One per band (title, then title + desc)
+        self.max_verify = max_verify
+        self.max_bucket_scan = max_bucket_scan
+        self.window_seconds = window_seconds
+        self._buckets = {}       # band key -> doc_id, or [doc_id, ...] once shared
+        self._docs = {}          # doc_id -> StoryDoc (cluster primaries)
+        self._order = deque()    # primary doc_ids by arrival, for pruning
+        self._clusters = {}      # cluster_id -> {"size", "title", "source", "created_at"}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._last_prune = time.time()
+
+    # ---- signatures ----
+    def _permuted(self, tokens) -> np.ndarray:
+        """(num_perm, len(tokens)) matrix of permuted token hashes."""
+        hashes = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+        return (self._a * hashes + self._b) % np.uint64(self.PRIME)
+
+    def signature(self, tokens: frozenset) -> np.ndarray:
+        return self._permuted(tokens).min(axis=1)
+
+    def body_signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash of the body shingles (None for an empty body); compare with near_duplicate()."""
+        shingles = list(body_shingles(text))
+        signature = None
+        for i in range(0, len(shingles), BODY_HASH_BLOCK): # Bounded (num_perm, block) matrix for long articles
+            block = self._permuted(shingles[i:i + BODY_HASH_BLOCK]).min(axis=1)
+            signature = block if signature is None else np.minimum(signature, block)
+        return signature
+
+    def _band_keys(self, doc: StoryDoc) -> list[int]:
+        """One 64-bit bucket key per band: that band's rows mixed together, salted by band number."""
+        if not doc.tokens and not doc.combined:
+            return []
+        title_n = len(doc.tokens)
+        ordered = list(doc.tokens) + list(doc.combined - doc.tokens)
+        permuted = self._permuted(ordered) # One pass; title + description MinHash = min over both parts
+        signatures = [(0, permuted[:, :title_n])] if title_n else []
+        if len(ordered) > title_n:
+            signatures.append((self.bands, permuted)) # No description: title bands only
+        keys = []
+        for offset, block in signatures:
+            rows = block.min(axis=1).reshape(self.bands, -1)
+            mixed = rows[:, 0].copy()
+            for r in range(1, rows.shape[1]):
+                mixed = mixed * np.uint64(0x100000001B3) ^ rows[:, r] # Wraps mod 2**64 (FNV-style)
+            keys.extend((mixed ^ self._salts[offset:offset + self.bands]).tolist())
+        return keys
+
+    # ---- lookup ----
+    def _make_doc(self, title: str, desc: str, source: str, timestamp: Optional[float]) -> StoryDoc:
+        tokens, entities = normalize_title(title)
+        combined = tokens | normalize_desc(desc) if desc else tokens
+        return StoryDoc(None, tokens, entities, combined, source, timestamp)
+
+    def _best_match(self, doc: StoryDoc, keys: list) -> Optional[tuple[StoryDoc, float]]:
+        # Oversized buckets come from tokens half the corpus shares; a real match also
+        # collides in the smaller buckets of its rarer tokens.
+        hits = []
+        buckets = self._buckets
+        for key in keys:
+            bucket = buckets.get(key)
+            if bucket is None: continue
+            if type(bucket) is int: hits.append(bucket)
+            elif len(bucket) <= self.max_bucket_scan: hits.extend(bucket)
+        collisions = Counter(hits)
+
+        best, best_score = None, 0.0
+        candidates = collisions if len(collisions) <= self.max_verify else \
+            [doc_id for doc_id, _ in collisions.most_common(self.max_verify)]
+        for doc_id in candidates:
+            other = self._docs.get(doc_id)
+            if other is None: continue # Pruned
+            if (self.window_seconds is not None and doc.timestamp is not None and other.timestamp is not None
+                    and abs(doc.timestamp - other.timestamp) > self.window_seconds):
+                continue
+            score = title_similarity(doc, other)
+            if doc.combined is not doc.tokens or other.combined is not other.tokens:
+                score = max(score, jaccard(doc.combined, other.combined))
+            short = min(len(doc.tokens), len(other.tokens)) <= 5
+            if score < (SHORT_THRESHOLD if short else BASE_THRESHOLD): continue
+            if doc.source and doc.source == other.source and score < SAME_SOURCE_THRESHOLD: continue
+            if score > best_score:
+                best, best_score = other, score
+        return (best, best_score) if best is not None else None
+
+    def query(self, title: str, desc: str = "", source: str = "",
+              timestamp: Optional[float] = None) -> Optional[tuple[str, float]]:
+        """(cluster_id, score) of the best matching story, or None."""
+        doc = self._make_doc(title, desc, source, timestamp)
+        keys = self._band_keys(doc)
+        with self._lock:
+            match = self._best_match(doc, keys)
+        return (match[0].cluster_id, match[1]) if match else None
+
+    def add(self, title: str, desc: str = "", source: str = "", timestamp: Optional[float] = None) -> str:
+        """Indexes the article and returns its cluster_id."""
+        doc = self._make_doc(title, desc, source, timestamp)
+        keys = self._band_keys(doc) # Hashing happens outside the lock
+        with self._lock:
+            self._maybe_prune()
+            match = self._best_match(doc, keys)
+            if match:
+                self._clusters[match[0].cluster_id]["size"] += 1
+                return match[0].cluster_id
+
+            doc.doc_id = next(self._ids)
+            doc.added_at = time.time()
+            doc.cluster_id = f"c{doc.doc_id}"
+            self._clusters[doc.cluster_id] = {"size": 1, "title": title, "source": source, "created_at": doc.added_at}
+            self._docs[doc.doc_id] = doc
+            self._order.append(doc.doc_id)
+            buckets = self._buckets
+            for key in keys:
+                bucket = buckets.get(key)
+                if bucket is None: buckets[key] = doc.doc_id # Most buckets never get a second member
+                elif type(bucket) is int: buckets[key] = [bucket, doc.doc_id]
+                else: bucket.append(doc.doc_id)
+            return doc.cluster_id
+
+    def cluster(self, cluster_id: str) -> Optional[dict]:
+        with self._lock:
+            info = self._clusters.get(cluster_id)
+            return dict(info, cluster_id=cluster_id) if info else None
+
+    # ---- housekeeping ----
+    def _maybe_prune(self):
+        now = time.time()
+        if self.window_seconds is not None and now - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+            self._last_prune = now
+            self._prune(now - self.window_seconds)
+
+    def _prune(self, cutoff: float) -> int:
+        """Retires clusters founded before cutoff, then their bucket entries."""
+        removed = 0
+        while self._order:
+            doc = self._docs[self._order[0]]
+            if doc.added_at >= cutoff: break
+            self._order.popleft()
+            del self._docs[doc.doc_id]
+            del self._clusters[doc.cluster_id]
+            removed += 1
+        if removed:
+            live = {}
+            for key, ids in self._buckets.items():
+                if type(ids) is int:
+                    if ids in self._docs: live[key] = ids
+                    continue
+                ids = [d for d in ids if d in self._docs]
+                if ids: live[key] = ids if len(ids) > 1 else ids[0]
+            self._buckets = live
+        return removed
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"clusters": len(self._clusters), "articles": sum(c["size"] for c in self._clusters.values()),
+                    "buckets": len(self._buckets)}
+
+    def __len__(self):
+        return len(self._clusters)
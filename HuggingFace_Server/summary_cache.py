@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable
+
+from metrics import log_event
+
+# ==========================================
+# 🗄️ CONTENT-ADDRESSED SUMMARY CACHE
+# ==========================================
+# Two tiers:
+#   1. Memory LRU bounded by a byte budget (hot retaps / same wire story).
+#   2. On-disk JSON files keyed by hash (survives Space restarts).
+# Plus a chunk tier (ChunkCache): generate() output per chunk, so a re-submitted
+# article with a few edited paragraphs only regenerates the chunks that changed.
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so trivially re-wrapped copies hash the same."""
+    return re.sub(r"\s+", " ", text).strip()
+
+def make_cache_key(text: str, mode: str, fingerprint: str) -> str:
+    """sha256 over normalized text + mode + model/config fingerprint."""
+    h = hashlib.sha256()
+    h.update(fingerprint.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(mode.encode("utf-8"))
+    h.update(b"\x00")
+    h.update(normalize_text(text).encode("utf-8"))
+    return h.hexdigest()
+
+def make_chunk_key(input_ids: list[int], min_len: int, max_len: int, fingerprint: str) -> bytes:
+    """sha256 over model/generation fingerprint + length targets + the chunk's token IDs."""
+    h = hashlib.sha256()
+    h.update(fingerprint.encode("utf-8"))
+    h.update(f"\x00{min_len}-{max_len}\x00".encode("utf-8"))
+    h.update(array("I", input_ids).tobytes())
+    return h.digest()
+
+class LRUBytesCache:
+    """Thread-safe LRU map that evicts by total value size instead of entry count."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def sizeof(value) -> int:
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        if isinstance(value, str):
+            return len(value.encode("utf-8"))
+        return len(json.dumps(value).encode("utf-8"))
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self.bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def __len__(self):
+        return len(self._data)
+
+class SummaryCache:
+    """Memory LRU in front of a directory of <key>.json files."""
+
+    def __init__(self, directory: str, max_memory_bytes: int, max_disk_bytes: int):
+        self.memory = LRUBytesCache(max_memory_bytes)
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, key: str):
+        """Returns the cached summary or None."""
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        if self.directory:
+            try:
+                with open(self._path(key), encoding="utf-8") as f:
+                    value = json.load(f)["summary"]
+                os.utime(self._path(key)) # Refresh recency for disk pruning
+                self.memory.put(key, value) # Promote
+                self._count("disk_hits")
+                return value
+            except (OSError, ValueError, KeyError):
+                pass
+
+        self._count("misses")
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        """Presence check that leaves the hit/miss counters alone (admission costing)."""
+        return self.memory.get(key) is not None or bool(self.directory) and os.path.exists(self._path(key))
+
+    def put(self, key: str, summary: str):
+        self.memory.put(key, summary)
+        self._count("writes")
+        if not self.directory:
+            return
+        tmp = self._path(key) + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"summary": summary}, f)
+            written = os.path.getsize(tmp)
+            os.replace(tmp, self._path(key)) # Atomic: readers never see half a file
+            with self._lock:
+                self._disk_bytes += written
+                over_budget = self._disk_bytes > self.max_disk_bytes
+            if over_budget:
+                self._prune_disk()
+        except OSError as e:
+            log_event("cache_disk_write_failed", key=key, error=str(e))
+
+    def _disk_entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"): continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _prune_disk(self):
+        """Drops least-recently-used files until the directory is back under 90% of budget."""
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._disk_bytes = total
+
+    def snapshot(self) -> dict:
+        """Operator view: hit/miss counters + tier sizes."""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["memory_bytes"] = self.memory.bytes
+        stats["memory_budget_bytes"] = self.memory.max_bytes
+        return stats
+
+class ChunkCache:
+    """
+    Generated token IDs per chunk key (make_chunk_key), packed as uint32 bytes in a
+    memory LRU. A chunk already being generated for another job is shared through its
+    in-flight Future instead of being queued twice. max_bytes=0 turns both off: every
+    fetch() calls generate().
+    """
+
+    def __init__(self, max_bytes: int):
+        self.memory = LRUBytesCache(max_bytes)
+        self.stats = {"hits": 0, "shared": 0, "misses": 0}
+        self._inflight = {} # key -> Future still being generated
+        self._lock = threading.Lock()
+
+    def fetch(self, key: bytes, generate: Callable[[], Future]) -> tuple[Future, bool]:
+        """
+        (Future of the token IDs, reused). Reused futures are already resolved (cache
+        hit) or belong to another caller (shared); otherwise generate() is called and
+        its result stored once it lands.
+        """
+        if not self.memory.max_bytes:
+            with self._lock:
+                self.stats["misses"] += 1
+            return generate(), False
+        with self._lock:
+            packed = self.memory.get(key)
+            if packed is not None:
+                self.stats["hits"] += 1
+                future = Future()
+                future.set_result(array("I", packed).tolist())
+                return future, True
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["shared"] += 1
+                return future, True
+            self.stats["misses"] += 1
+            future = self._inflight[key] = generate()
+        future.add_done_callback(lambda done: self._landed(key, done))
+        return future, False
+
+    def _landed(self, key: bytes, future: Future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.exception() is None:
+                self.memory.put(key, array("I", future.result()).tobytes())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["inflight"] = len(self._inflight)
+        lookups = stats["hits"] + stats["shared"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["shared"]) / lookups, 3) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["memory_bytes"] = self.memory.bytes
+        stats["memory_budget_bytes"] = self.memory.max_bytes
+        return stats
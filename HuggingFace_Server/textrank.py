@@ -0,0 +1,126 @@
+import re
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+from search_index import tokenize
+
+# ==========================================
+# 🕸️ TEXTRANK (Extractive Salience)
+# ==========================================
+# Sentences are TF-IDF vectors (scipy sparse, rows L2-normalized), so the whole
+# cosine-similarity graph is one sparse product X @ X.T. PageRank runs on it as a
+# plain power iteration over the row-normalized matrix: no graph objects, and a
+# 100-sentence article ranks in a few milliseconds.
+#
+# Two uses:
+#   select_paragraphs()    - keeps the most salient paragraphs of a long article
+#                            within a word/token budget before it is bucketed for
+#                            BART (fewer generate() calls)
+#   extractive_summary()   - the top sentences in article order, no BART at all
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6          # L1 change between iterations that counts as converged
+EXTRACT_RATIO = 0.25      # Share of sentences an extractive summary keeps...
+EXTRACT_MIN_SENTENCES = 3 # ...but never fewer than this
+EXTRACT_MAX_SENTENCES = 12 # ...or more than this
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Z0-9])")
+
+def split_sentences(text: str) -> list[str]:
+    """Splits on . ! ? followed by whitespace and a capital/digit (keeps "U.S. officials" whole)."""
+    sentences = []
+    for paragraph in text.split("\n"):
+        paragraph = paragraph.strip()
+        if paragraph:
+            sentences.extend(s.strip() for s in _SENTENCE_END.split(paragraph) if s.strip())
+    return sentences
+
+def sentence_vectors(sentences: list[str]) -> sparse.csr_matrix:
+    """TF-IDF rows (sublinear tf, smoothed idf), L2-normalized. Empty sentences stay all-zero."""
+    vocab = {}
+    rows, cols, values = [], [], []
+    for i, sentence in enumerate(sentences):
+        for term, tf in Counter(tokenize(sentence)).items():
+            rows.append(i)
+            cols.append(vocab.setdefault(term, len(vocab)))
+            values.append(1.0 + np.log(tf))
+    n = len(sentences)
+    matrix = sparse.csr_matrix((np.array(values, dtype=np.float64), (rows, cols)), shape=(n, len(vocab)))
+    df = np.bincount(matrix.indices, minlength=len(vocab))
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix)
+
+def pagerank(weights: sparse.csr_matrix, damping: float = DAMPING) -> np.ndarray:
+    """Weighted PageRank by power iteration. Rows without edges spread their rank evenly."""
+    n = weights.shape[0]
+    out = np.asarray(weights.sum(axis=1)).ravel()
+    dangling = out == 0
+    out[dangling] = 1.0
+    transition = sparse.csr_matrix(sparse.diags(1.0 / out) @ weights).T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        spread = damping * rank[dangling].sum() / n
+        new = damping * (transition @ rank) + spread + (1.0 - damping) / n
+        converged = np.abs(new - rank).sum() < TOLERANCE
+        rank = new
+        if converged:
+            break
+    return rank
+
+def rank_sentences(sentences: list[str]) -> np.ndarray:
+    """TextRank score per sentence (sums to 1)."""
+    if not sentences:
+        return np.zeros(0)
+    vectors = sentence_vectors(sentences)
+    similarity = sparse.csr_matrix(vectors @ vectors.T)
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return pagerank(similarity)
+
+def select_paragraphs(paragraphs: list[str], budget: float, weights: Optional[list[int]] = None,
+                      strict: bool = False) -> list[int]:
+    """
+    Indices (article order) of the lead paragraph plus the most salient others (mean
+    TextRank of their sentences) until `budget` is reached, counted in `weights`
+    (words per paragraph by default). strict=True never goes over the budget: a
+    paragraph that would overflow it is skipped for a smaller one. The lead paragraph
+    is always kept, even when it alone is over.
+    """
+    if len(paragraphs) < 3:
+        return list(range(len(paragraphs)))
+    sentences, owner = [], []
+    for p, paragraph in enumerate(paragraphs):
+        split = split_sentences(paragraph) or [paragraph]
+        sentences.extend(split)
+        owner.extend([p] * len(split))
+    scores = np.bincount(owner, weights=rank_sentences(sentences), minlength=len(paragraphs))
+    salience = scores / np.maximum(np.bincount(owner, minlength=len(paragraphs)), 1)
+
+    weights = weights if weights is not None else [len(p.split()) for p in paragraphs]
+    keep = {0}
+    kept = weights[0]
+    for p in sorted(range(1, len(paragraphs)), key=lambda p: -salience[p]):
+        if kept >= budget:
+            break
+        if strict and kept + weights[p] > budget:
+            continue
+        keep.add(p)
+        kept += weights[p]
+    return sorted(keep)
+
+def extractive_summary(text: str, ratio: float = EXTRACT_RATIO) -> str:
+    """Top-ranked sentences in article order."""
+    sentences = split_sentences(text)
+    if len(sentences) <= EXTRACT_MIN_SENTENCES:
+        return " ".join(sentences)
+    count = min(EXTRACT_MAX_SENTENCES, max(EXTRACT_MIN_SENTENCES, round(ratio * len(sentences))))
+    scores = rank_sentences(sentences)
+    top = np.argsort(-scores, kind="stable")[:count]
+    return " ".join(sentences[i] for i in sorted(top))